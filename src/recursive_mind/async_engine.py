@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Protocol
+from urllib.parse import urlsplit
+
+from .engine import RecursiveMindEngine, StepResult
+from .mood import Mood
+from .prompt_engine import SyntheticThinker
+
+
+class AsyncThinker(Protocol):
+    """Anything that can turn a prompt into a thought without blocking the event loop."""
+
+    async def respond(self, prompt: str, mood: Mood) -> str:
+        ...
+
+
+class SyncThinkerAdapter:
+    """Runs an in-process thinker (e.g. :class:`SyntheticThinker`) behind the async protocol."""
+
+    def __init__(self, thinker: Optional[SyntheticThinker] = None) -> None:
+        self.thinker = thinker or SyntheticThinker()
+
+    async def respond(self, prompt: str, mood: Mood) -> str:
+        return self.thinker.respond(prompt, mood)
+
+
+class HTTPThinker:
+    """
+    Posts ``{"prompt": ..., "mood": ...}`` to an inference server and reads ``{"thought": ...}``.
+
+    Uses HTTP/1.1 keep-alive over a small pool of reused connections; at most
+    ``pool_size`` requests are in flight, which doubles as backpressure on callers.
+    A request on a pooled connection that the server has since closed is
+    retried once on a fresh one. Bodies may be sized by ``Content-Length``,
+    sent chunked, or run to the end of a closed connection.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 30.0) -> None:
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError("HTTPThinker only speaks plain http://")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: List[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def respond(self, prompt: str, mood: Mood) -> str:
+        body = json.dumps({"prompt": prompt, "mood": mood.value}).encode("utf-8")
+        async with self._slots:
+            reused = bool(self._idle)
+            reader, writer = self._idle.pop() if reused else await self._connect()
+            try:
+                payload, keep_alive = await asyncio.wait_for(self._exchange(reader, writer, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # The server dropped the idle connection; retry once on a fresh one.
+                reader, writer = await self._connect()
+                try:
+                    payload, keep_alive = await asyncio.wait_for(self._exchange(reader, writer, body), self.timeout)
+                except BaseException:
+                    writer.close()
+                    raise
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+        return json.loads(payload)["thought"]
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def _exchange(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, body: bytes
+    ) -> tuple[bytes, bool]:
+        """Send one request; return the response body and whether the connection can be reused."""
+        writer.write(
+            (
+                f"POST {self.path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n"
+            ).encode("ascii")
+            + body
+        )
+        await writer.drain()
+        status, headers = await _read_head(reader)
+        payload, keep_alive = await _read_body(reader, headers)
+        if not 200 <= status < 300:
+            raise RuntimeError(f"Inference server answered {status}: {payload[:200]!r}")
+        return payload, keep_alive
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[int, dict[str, str]]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before a response arrived")
+    status = int(status_line.split()[1])
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return status, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> tuple[bytes, bool]:
+    keep_alive = headers.get("connection", "").lower() != "close"
+    encoding = headers.get("transfer-encoding", "").lower()
+    if encoding:
+        if encoding.split(",")[-1].strip() != "chunked":
+            raise ValueError(f"Unsupported Transfer-Encoding {encoding!r}")
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip(), 16)
+            if not size:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                return b"".join(chunks), keep_alive
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"])), keep_alive
+    return await reader.read(), False  # no length: the body runs until the server closes
+
+
+@dataclass
+class AsyncRecursiveMindEngine:
+    """
+    Async twin of :class:`RecursiveMindEngine` for thinkers that wait on I/O.
+
+    State handling, distortions and interrupts are delegated to the wrapped
+    synchronous engine; only the synthesis call is awaited. Without a thinker
+    the engine's own synthesizer is used, which keeps seeded runs identical to
+    the synchronous loop.
+    """
+
+    thinker: Optional[AsyncThinker] = None
+    engine: RecursiveMindEngine = field(default_factory=RecursiveMindEngine)
+
+    def __post_init__(self) -> None:
+        if self.thinker is None:
+            self.thinker = SyncThinkerAdapter(self.engine.synthesizer)
+
+    def stream(
+        self,
+        initial_thought: str,
+        steps: Optional[int] = 8,
+        allow_interrupts: bool = True,
+        starting_mood: Optional[Mood] = None,
+        bias_overrides: Optional[dict[str, float]] = None,
+    ) -> AsyncIterator[StepResult]:
+        self.engine.begin(initial_thought, starting_mood=starting_mood, bias_overrides=bias_overrides)
+        return self.advance(steps, allow_interrupts)
+
+    async def advance(self, steps: Optional[int] = 8, allow_interrupts: bool = True) -> AsyncIterator[StepResult]:
+        """Continue the loop from the wrapped engine's current state without resetting it."""
+        remaining = steps
+        while remaining is None or remaining > 0:
+            pending = self.engine.prepare_step(allow_interrupts)
+            metrics = self.engine.metrics
+            mark = metrics.clock() if metrics else 0
+            response = await self.thinker.respond(pending.prompt, pending.mood)
+            if metrics:
+                metrics.lap("respond", mark)
+            yield self.engine.complete_step(pending, response)
+            if remaining is not None:
+                remaining -= 1
+
+    async def run(self, initial_thought: str, steps: int = 8, **options) -> List[StepResult]:
+        return [step async for step in self.stream(initial_thought, steps=steps, **options)]
+
+
+@dataclass
+class SessionRequest:
+    """One independent mind to run to completion."""
+
+    prompt: str
+    steps: int = 8
+    seed: Optional[int] = None
+    allow_interrupts: bool = True
+    starting_mood: Optional[Mood] = None
+    bias_overrides: Optional[dict[str, float]] = None
+    session_id: Optional[str] = None
+
+
+@dataclass
+class SessionResult:
+    request: SessionRequest
+    steps: List[StepResult] = field(default_factory=list)
+    error: Optional[BaseException] = None
+
+
+class SessionScheduler:
+    """
+    Keeps many minds in flight against one async thinker.
+
+    ``concurrency`` workers each drive one session at a time, so up to that
+    many thinker calls overlap. Requests and results both pass through bounded
+    queues, so neither a fast producer nor a slow consumer piles up sessions;
+    results are yielded as they finish.
+    """
+
+    def __init__(
+        self,
+        thinker: AsyncThinker,
+        concurrency: int = 16,
+        backlog: int = 64,
+        engine_factory: Callable[[Optional[int]], RecursiveMindEngine] = lambda seed: RecursiveMindEngine(seed=seed),
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.thinker = thinker
+        self.concurrency = concurrency
+        self.backlog = backlog
+        self.engine_factory = engine_factory
+
+    async def run(self, requests: Iterable[SessionRequest]) -> AsyncIterator[SessionResult]:
+        pending: asyncio.Queue[Optional[SessionRequest]] = asyncio.Queue(maxsize=self.backlog)
+        finished: asyncio.Queue[Optional[SessionResult]] = asyncio.Queue(maxsize=self.backlog)
+
+        async def feed() -> None:
+            for request in requests:
+                await pending.put(request)
+            for _ in range(self.concurrency):
+                await pending.put(None)
+
+        async def work() -> None:
+            while (request := await pending.get()) is not None:
+                await finished.put(await self._run_session(request))
+            await finished.put(None)
+
+        tasks = [asyncio.create_task(feed())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        try:
+            active = self.concurrency
+            while active:
+                result = await finished.get()
+                if result is None:
+                    active -= 1
+                    continue
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def map(self, requests: Iterable[SessionRequest]) -> List[SessionResult]:
+        return [result async for result in self.run(requests)]
+
+    async def _run_session(self, request: SessionRequest) -> SessionResult:
+        mind = AsyncRecursiveMindEngine(thinker=self.thinker, engine=self.engine_factory(request.seed))
+        result = SessionResult(request=request)
+        try:
+            async for step in mind.stream(
+                request.prompt,
+                steps=request.steps,
+                allow_interrupts=request.allow_interrupts,
+                starting_mood=request.starting_mood,
+                bias_overrides=request.bias_overrides,
+            ):
+                result.steps.append(step)
+        except Exception as exc:  # one failing session must not sink the rest
+            result.error = exc
+        return result
+
+
+async def start_stub_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> asyncio.AbstractServer:
+    """
+    Serve the :class:`HTTPThinker` protocol locally with a :class:`SyntheticThinker`.
+
+    ``latency`` simulates inference time per request. Useful for exercising the
+    async pipeline without a real model.
+    """
+    thinker = SyntheticThinker()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                request = json.loads(await reader.readexactly(int(headers.get("content-length", "0"))))
+                if latency:
+                    await asyncio.sleep(latency)
+                body = json.dumps({"thought": thinker.respond(request["prompt"], Mood(request["mood"]))}).encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+from .distortions import DistortionEngine
+from .interrupts import DEFAULT_EVENTS
+from .mood import MOOD_CODES, MOODS, TRANSITIONS, Mood, MoodTransitions, stimulus_bias
+from .prompt_engine import SyntheticThinker
+
+try:  # NumPy is optional; only the batch engine needs it.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Stimulus class 0 is "no keyword"; class k >= 1 biases towards STIMULUS_KEYWORDS[k - 1].
+STIMULUS_CLASSES: tuple[Optional[Mood], ...] = MoodTransitions.biases
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The batch engine requires NumPy (pip install numpy).")
+
+
+def transition_matrix(bias: Optional[Mood] = None) -> "np.ndarray":
+    """Row-stochastic mood transition matrix indexed by mood codes."""
+    _require_numpy()
+    return np.array(TRANSITIONS.matrix(bias))
+
+
+def stimulus_class(text: Optional[str]) -> int:
+    return STIMULUS_CLASSES.index(stimulus_bias(text))
+
+
+@dataclass
+class BatchResult:
+    """
+    Trajectories for a batch of minds.
+
+    ``moods[t, i]`` is the mood code of mind ``i`` after step ``t + 1`` and
+    ``interrupts[t, i]`` is the index of the fired event (``-1`` for none).
+    ``thoughts`` is only populated when text synthesis was requested.
+    """
+
+    moods: "np.ndarray"
+    interrupts: "np.ndarray"
+    events: tuple[str, ...]
+    thoughts: Optional[list[list[str]]] = None
+
+    def mood_occupancy(self) -> dict[Mood, float]:
+        counts = np.bincount(self.moods.ravel(), minlength=len(MOODS))
+        return {mood: float(count) / max(1, self.moods.size) for mood, count in zip(MOODS, counts)}
+
+    def interrupt_rate(self) -> float:
+        return float((self.interrupts >= 0).mean()) if self.interrupts.size else 0.0
+
+
+class BatchMindEngine:
+    """
+    Advances many independent minds in lockstep with NumPy arrays.
+
+    Only the mood chain and interrupt timing are simulated: each step draws one
+    uniform per mind for the mood transition (sampled from cumulative
+    transition tables) and one for the Bernoulli interrupt, with a vector of
+    cooldown counters. The stimulus bias comes from each mind's initial prompt
+    and stays fixed for the run.
+
+    This is an approximation of :class:`RecursiveMindEngine`, not a vectorised
+    copy of it. In the full engine, later thoughts pick up new keywords from
+    mood suffixes, interrupts and synthesised directions, so the stimulus
+    drifts from step to step and mood occupancy differs by a few points.
+    Use the full engine (or ``synthesize=True``) where exact dynamics matter.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        seed: Optional[int] = None,
+        probability: float = 0.25,
+        cooldown: int = 2,
+        events: Sequence[str] = DEFAULT_EVENTS,
+    ) -> None:
+        _require_numpy()
+        self.size = size
+        self.probability = probability
+        self.cooldown = cooldown
+        self.events = tuple(events)
+        self.rng = np.random.default_rng(seed)
+        # cumulative[k, m] is the CDF row for stimulus class k from mood code m.
+        self.cumulative = np.stack([np.cumsum(transition_matrix(bias), axis=1) for bias in STIMULUS_CLASSES])
+        # Column-major view over flattened (class, mood) rows; the last CDF column is always 1.
+        flat = self.cumulative.reshape(-1, len(MOODS))
+        self._cdf_columns = [np.ascontiguousarray(flat[:, column]) for column in range(len(MOODS) - 1)]
+
+    def run(
+        self,
+        steps: int,
+        prompts: Union[str, Sequence[str], None] = None,
+        starting_mood: Union[Mood, Sequence[Mood], None] = None,
+        allow_interrupts: bool = True,
+        synthesize: bool = False,
+    ) -> BatchResult:
+        """
+        Simulate ``steps`` iterations for every mind.
+
+        ``synthesize=True`` additionally renders a bare thought per mind and step
+        with :class:`SyntheticThinker` (no distortions) and re-derives each mind's
+        stimulus from it. That path loops in Python and is meant for spot checks.
+        """
+        size = self.size
+        if prompts is None or isinstance(prompts, str):
+            prompts = [prompts or ""] * size
+        if len(prompts) != size:
+            raise ValueError("prompts must match the batch size")
+        stimuli = np.array([stimulus_class(prompt) for prompt in prompts], dtype=np.intp) * len(MOODS)
+
+        if starting_mood is None or isinstance(starting_mood, Mood):
+            moods = np.full(size, MOOD_CODES[starting_mood or Mood.CALM], dtype=np.intp)
+        else:
+            moods = np.array([MOOD_CODES[mood] for mood in starting_mood], dtype=np.intp)
+
+        mood_history = np.empty((steps, size), dtype=np.int8)
+        event_dtype = np.int8 if len(self.events) <= np.iinfo(np.int8).max else np.int32
+        interrupt_history = np.full((steps, size), -1, dtype=event_dtype)
+        counters = np.zeros(size, dtype=np.int64)
+
+        thoughts: Optional[list[list[str]]] = None
+        if synthesize:
+            thoughts = [[] for _ in range(size)]
+            current = list(prompts)
+            thinker = SyntheticThinker(rng=random.Random(int(self.rng.integers(2**63))))
+            tinter = DistortionEngine(rng=thinker.rng)
+
+        for step in range(steps):
+            # Inverse-CDF sampling: the next mood is the number of CDF entries below the draw.
+            draws = self.rng.random(size)
+            rows = stimuli + moods
+            moods = np.zeros(size, dtype=np.intp)
+            for column in self._cdf_columns:
+                moods += column[rows] < draws
+            mood_history[step] = moods
+
+            if allow_interrupts:
+                cooling = counters > 0
+                counters -= cooling
+                fired = ~cooling & (self.rng.random(size) < self.probability)
+                counters[fired] = self.cooldown
+                interrupt_history[step, fired] = self.rng.integers(0, len(self.events), int(fired.sum()))
+
+            if thoughts is not None:
+                for index in range(size):
+                    mood = MOODS[moods[index]]
+                    prompt = tinter._apply_mood(current[index] or "...", mood)
+                    current[index] = thinker.respond(prompt, mood)
+                    thoughts[index].append(current[index])
+                stimuli = np.array([stimulus_class(text) for text in current], dtype=np.intp) * len(MOODS)
+
+        return BatchResult(moods=mood_history, interrupts=interrupt_history, events=self.events, thoughts=thoughts)
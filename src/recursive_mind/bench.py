@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .distortions import DistortionContext
+from .engine import RecursiveMindEngine
+from .mood import MOODS, Mood, MoodState
+from .prompt_engine import SyntheticThinker
+from .state import Thought, ThoughtMemory
+
+FORMAT_VERSION = 1
+PROMPT = "What is the safest path forward? I fear the risk, yet hope and memory keep me in the loop."
+SAMPLE_PROMPT = (
+    f"{PROMPT} I'm uneasy about where this leads.\n"
+    "Memory echo: keep me in the loop\n"
+    "Paranoia whispers (0.45): What if everyone is hiding something?\n"
+    "Am I circling the same conclusion again?"
+)
+
+Operation = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class BenchConfig:
+    """Sweep axes. Each benchmark varies the axis that drives its cost."""
+
+    steps: Sequence[int] = (100, 1_000, 3_000)
+    maxlen: Sequence[int] = (12, 1_000, 100_000)
+    triggers: Sequence[int] = (4, 64, 1_024)
+    operations: int = 2_000
+    seed: int = 0
+
+
+QUICK = BenchConfig(steps=(100, 1_000), maxlen=(12, 1_000), triggers=(4, 64), operations=500)
+
+
+@dataclass
+class BenchResult:
+    name: str
+    params: Dict[str, int]
+    operations: int
+    seconds: float
+    throughput: float  # operations per second
+    p50_us: float
+    p99_us: float
+    peak_kib: float  # tracemalloc peak above the prepared baseline
+
+    @property
+    def key(self) -> str:
+        return self.name + "".join(f" {name}={value}" for name, value in sorted(self.params.items()))
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else float("inf")
+
+
+@dataclass
+class Benchmark:
+    """A named hot path: ``cases(config)`` yields (params, prepare, operations)."""
+
+    name: str
+    cases: Callable[[BenchConfig], Iterator[tuple[Dict[str, int], Callable[[], Operation], int]]]
+    description: str = ""
+
+
+def _percentile(ordered: Sequence[int], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1_000
+
+
+def measure(name: str, params: Dict[str, int], prepare: Callable[[], Operation], operations: int) -> BenchResult:
+    """
+    Time ``operations`` calls of a freshly prepared operation, then repeat them under tracemalloc.
+
+    Timing and allocation tracking run in separate passes so tracemalloc's
+    overhead never leaks into the latencies.
+    """
+    clock = time.perf_counter_ns
+    operation = prepare()
+    timings = [0] * operations
+    started = clock()
+    for index in range(operations):
+        before = clock()
+        operation()
+        timings[index] = clock() - before
+    elapsed = (clock() - started) / 1e9
+
+    operation = prepare()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(operations):
+            operation()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return BenchResult(
+        name=name,
+        params=params,
+        operations=operations,
+        seconds=elapsed,
+        throughput=operations / max(elapsed, 1e-12),
+        p50_us=_percentile(timings, 0.50),
+        p99_us=_percentile(timings, 0.99),
+        peak_kib=max(peak, 0) / 1024,
+    )
+
+
+def _engine_cases(config: BenchConfig):
+    for steps in config.steps:
+        def prepare(steps=steps) -> Operation:
+            return RecursiveMindEngine(seed=config.seed).stream(PROMPT, steps=steps).__next__
+
+        yield {"steps": steps}, prepare, steps
+
+
+def _thought_pool(rng: random.Random, size: int = 256) -> List[Thought]:
+    words = PROMPT.split()
+    return [
+        Thought(" ".join(rng.sample(words, k=8)), iteration, rng.choice(MOODS), weight=rng.random())
+        for iteration in range(size)
+    ]
+
+
+def _filled_memory(maxlen: int, seed: int) -> tuple[ThoughtMemory, List[Thought]]:
+    rng = random.Random(seed)
+    pool = _thought_pool(rng)
+    memory = ThoughtMemory(maxlen=maxlen, rng=rng)
+    for index in range(maxlen):
+        memory.add(pool[index % len(pool)])
+    return memory, pool
+
+
+def _memory_add_cases(config: BenchConfig):
+    for maxlen in config.maxlen:
+        def prepare(maxlen=maxlen) -> Operation:
+            memory, pool = _filled_memory(maxlen, config.seed)
+            thoughts = iter(pool * (config.operations // len(pool) + 1))
+            return lambda: memory.add(next(thoughts))
+
+        yield {"maxlen": maxlen}, prepare, config.operations
+
+
+def _memory_recall_cases(config: BenchConfig):
+    for maxlen in config.maxlen:
+        def prepare(maxlen=maxlen) -> Operation:
+            return _filled_memory(maxlen, config.seed)[0].recall_fragment
+
+        yield {"maxlen": maxlen}, prepare, config.operations
+
+
+def _distort_cases(config: BenchConfig):
+    for triggers in config.triggers:
+        def prepare(triggers=triggers) -> Operation:
+            engine = RecursiveMindEngine(seed=config.seed)
+            distortions = engine.distortions
+            for index in range(max(0, triggers - len(distortions.intrusive_triggers))):
+                distortions.intrusive_triggers[(f"signal{index}", f"omen{index}")] = f"Synthetic trigger {index}."
+            engine.run(PROMPT, steps=20)
+            state = engine.state
+            prompt = f"{PROMPT} signal{triggers // 2} omen{triggers - 1}"
+            context = DistortionContext(last_thought=state.memory.latest(), state=state)
+            distortions.refresh_keywords()  # compile outside the timed region
+            return lambda: distortions.distort(prompt, context)
+
+        yield {"triggers": triggers}, prepare, config.operations
+
+
+def _mood_cases(config: BenchConfig):
+    def prepare() -> Operation:
+        mood = MoodState(rng=random.Random(config.seed))
+        return lambda: mood.mutate(PROMPT)
+
+    yield {}, prepare, config.operations
+
+
+def _thinker_cases(config: BenchConfig):
+    def prepare() -> Operation:
+        thinker = SyntheticThinker(rng=random.Random(config.seed))
+        return lambda: thinker.respond(SAMPLE_PROMPT, Mood.ANXIOUS)
+
+    yield {}, prepare, config.operations
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    benchmark.name: benchmark
+    for benchmark in (
+        Benchmark("engine.step", _engine_cases, "RecursiveMindEngine step latency over a run of N steps"),
+        Benchmark("memory.add", _memory_add_cases, "ThoughtMemory.add on a full memory"),
+        Benchmark("memory.recall", _memory_recall_cases, "ThoughtMemory.recall_fragment on a full memory"),
+        Benchmark("distortions.distort", _distort_cases, "DistortionEngine.distort incl. keyword scan"),
+        Benchmark("mood.mutate", _mood_cases, "MoodState.mutate from raw stimulus text"),
+        Benchmark("thinker.respond", _thinker_cases, "SyntheticThinker.respond on a distorted prompt"),
+    )
+}
+
+
+def run_benchmarks(config: BenchConfig = BenchConfig(), only: Optional[Iterable[str]] = None) -> Iterator[BenchResult]:
+    """Run the selected benchmarks (all by default), yielding one result per sweep point."""
+    names = list(only) if only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"Unknown benchmark(s): {', '.join(unknown)}")
+    for name in names:
+        for params, prepare, operations in BENCHMARKS[name].cases(config):
+            yield measure(name, params, prepare, operations)
+
+
+def to_report(results: Iterable[BenchResult], config: BenchConfig) -> dict:
+    return {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def load_report(path: str) -> List[BenchResult]:
+    with open(path, "r", encoding="utf-8") as handle:
+        report = json.load(handle)
+    if report.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark report version {report.get('version')!r}")
+    return [BenchResult(**entry) for entry in report["results"]]
+
+
+def compare(
+    baseline: Iterable[BenchResult], current: Iterable[BenchResult], tolerance: float = 0.25
+) -> List[Regression]:
+    """
+    Flag sweep points that got slower or hungrier than ``baseline`` by more than ``tolerance``.
+
+    Throughput regresses when it drops; p99 latency and peak allocation
+    regress when they grow. Points missing from either side are ignored.
+    """
+    reference = {result.key: result for result in baseline}
+    regressions = []
+    for result in current:
+        before = reference.get(result.key)
+        if before is None:
+            continue
+        if result.throughput < before.throughput * (1 - tolerance):
+            regressions.append(Regression(result.key, "throughput", before.throughput, result.throughput))
+        if result.p99_us > before.p99_us * (1 + tolerance):
+            regressions.append(Regression(result.key, "p99_us", before.p99_us, result.p99_us))
+        # Tiny absolute allocations jitter by a few hundred bytes; only flag real growth.
+        if result.peak_kib > before.peak_kib * (1 + tolerance) + 1:
+            regressions.append(Regression(result.key, "peak_kib", before.peak_kib, result.peak_kib))
+    return regressions
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import marshal
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from .engine import RecursiveMindEngine, StepResult
+from .mood import MOOD_CODES, MOODS
+from .tiers import memory_from_state
+
+MAGIC = b"RMCK"
+FORMAT_VERSION = 1
+# magic, format version, marshal version, completed steps
+_HEADER = struct.Struct("<4sHHq")
+_FILE_PATTERN = re.compile(r"step-(\d+)\.rmck$")
+
+PathLike = Union[str, os.PathLike]
+
+
+class CheckpointError(ValueError):
+    """Raised when checkpoint bytes cannot be restored."""
+
+
+@dataclass
+class CheckpointInfo:
+    step: int
+    allow_interrupts: bool
+
+
+def capture(engine: RecursiveMindEngine, allow_interrupts: bool = True) -> bytes:
+    """
+    Serialise everything a run needs to continue bit-for-bit.
+
+    The payload is the memory buffer, mood, biases, intrusive budget, interrupt
+    cooldown and RNG state as builtins, encoded with ``marshal`` and
+    compressed with zlib behind a small fixed header.
+    """
+    state = engine.state
+    version, internal, gauss = engine.rng.getstate()
+    payload = {
+        "iteration": state.iteration,
+        "mood": MOOD_CODES[state.mood_state.mood],
+        "biases": dict(state.biases.traits),
+        "intrusive_budget": state.intrusive_budget,
+        "cooldown": engine.interrupts._cooldown_counter,
+        "pending_events": list(engine.interrupts._pending),
+        "allow_interrupts": allow_interrupts,
+        "rng": (version, internal, gauss),
+        "memory": state.memory.export_state(),
+    }
+    body = zlib.compress(marshal.dumps(payload))
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, completed_steps(engine)) + body
+
+
+def restore(engine: RecursiveMindEngine, data: bytes) -> CheckpointInfo:
+    """Load checkpoint bytes into ``engine``, replacing its state and RNG position."""
+    if len(data) < _HEADER.size:
+        raise CheckpointError("Checkpoint is truncated")
+    magic, version, marshal_version, step = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise CheckpointError("Not a recursive_mind checkpoint (or an unsupported version)")
+    if marshal_version != marshal.version:
+        raise CheckpointError("Checkpoint was written by an incompatible Python version")
+    payload = marshal.loads(zlib.decompress(data[_HEADER.size:]))
+
+    engine.rng.setstate(payload["rng"])
+    state = engine._new_state()
+    state.memory = memory_from_state(payload["memory"])
+    state.bind_rng(engine.rng)
+    state.iteration = payload["iteration"]
+    state.mood_state.mood = MOODS[payload["mood"]]
+    state.biases.traits = dict(payload["biases"])
+    state.intrusive_budget = payload["intrusive_budget"]
+    engine.state = state
+    engine.interrupts._cooldown_counter = payload["cooldown"]
+    engine.interrupts._pending.clear()
+    engine.interrupts._pending.extend(payload["pending_events"])
+    return CheckpointInfo(step=step, allow_interrupts=payload["allow_interrupts"])
+
+
+def completed_steps(engine: RecursiveMindEngine) -> int:
+    # The initial thought is registered as iteration 1, so step k leaves iteration k + 1.
+    return max(0, engine.state.iteration - 1)
+
+
+def save_checkpoint(engine: RecursiveMindEngine, path: PathLike, allow_interrupts: bool = True) -> Path:
+    path = Path(path)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    temporary.write_bytes(capture(engine, allow_interrupts))
+    os.replace(temporary, path)  # never leave a half-written checkpoint behind
+    return path
+
+
+def load_checkpoint(engine: RecursiveMindEngine, path: PathLike) -> CheckpointInfo:
+    return restore(engine, Path(path).read_bytes())
+
+
+def checkpoint_path(directory: PathLike, step: int) -> Path:
+    return Path(directory) / f"step-{step:012d}.rmck"
+
+
+def nearest_checkpoint(directory: PathLike, step: int) -> Optional[Path]:
+    """Latest checkpoint in ``directory`` taken at or before ``step`` completed steps."""
+    best: Optional[tuple[int, Path]] = None
+    for entry in Path(directory).iterdir():
+        match = _FILE_PATTERN.match(entry.name)
+        if match and int(match.group(1)) <= step and (best is None or int(match.group(1)) > best[0]):
+            best = (int(match.group(1)), entry)
+    return best[1] if best else None
+
+
+def with_checkpoints(
+    engine: RecursiveMindEngine,
+    steps: Iterator[StepResult],
+    directory: PathLike,
+    every: int,
+    allow_interrupts: bool = True,
+) -> Iterator[StepResult]:
+    """Pass steps through, writing a checkpoint after every ``every`` completed steps."""
+    if every < 1:
+        raise ValueError("checkpoint interval must be at least 1")
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for step in steps:
+        yield step
+        done = completed_steps(engine)
+        if done % every == 0:
+            save_checkpoint(engine, checkpoint_path(directory, done), allow_interrupts)
+
+
+def resume(engine: RecursiveMindEngine, path: PathLike, steps: Optional[int] = 8) -> Iterator[StepResult]:
+    """Restore ``path`` into ``engine`` and continue for ``steps`` more iterations."""
+    info = load_checkpoint(engine, path)
+    return engine.advance(steps, allow_interrupts=info.allow_interrupts)
+
+
+def seek(engine: RecursiveMindEngine, directory: PathLike, step: int) -> tuple[StepResult, CheckpointInfo]:
+    """
+    Reproduce step ``step`` of a checkpointed run.
+
+    Only the steps after the nearest earlier checkpoint are replayed; the
+    engine is left positioned just after ``step``. The checkpoint's info is
+    returned alongside, so callers continue with the run's own settings.
+    """
+    if step < 1:
+        raise ValueError("steps are numbered from 1")
+    path = nearest_checkpoint(directory, step - 1)
+    if path is None:
+        raise CheckpointError(f"No checkpoint at or before step {step - 1} in {directory}")
+    info = load_checkpoint(engine, path)
+    result = None
+    for result in engine.advance(step - info.step, allow_interrupts=info.allow_interrupts):
+        pass
+    return result, info
@@ -1,22 +1,36 @@
 from __future__ import annotations
 
 import argparse
-from typing import Dict
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterator, Optional
 
-from .engine import RecursiveMindEngine
-from .mood import Mood
+from . import bench, checkpoint, jobs, server, sweep
+from .cycles import stop_on_cycle
+from .distortions import SEGMENT_KINDS
+from .engine import RecursiveMindEngine, StepResult
+from .ensemble import EnsembleConfig, iter_ensemble
+from .metrics import Metrics
+from .mood import MOODS, Mood
+from .runlog import RunLogReader, RunLogWriter
+from .sources import POLICIES, EventFeed, FifoSource, FileTailSource, UnixSocketSource
+from .state import RECALL_MODES
+from .stats import RunStatistics
 
 
-def parse_bias_overrides(bias_args: list[str]) -> Dict[str, float]:
+def parse_bias_overrides(bias_args: list[str], what: str = "bias") -> Dict[str, float]:
     overrides: dict[str, float] = {}
     for item in bias_args:
         if "=" not in item:
-            raise argparse.ArgumentTypeError(f"Bias override '{item}' must look like name=value")
+            raise argparse.ArgumentTypeError(f"{what.capitalize()} override '{item}' must look like name=value")
         name, value = item.split("=", 1)
         try:
             overrides[name.strip()] = float(value)
         except ValueError as exc:  # pragma: no cover - defensive
-            raise argparse.ArgumentTypeError(f"Could not parse bias value '{value}'") from exc
+            raise argparse.ArgumentTypeError(f"Could not parse {what} value '{value}'") from exc
     return overrides
 
 
@@ -24,7 +38,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Simulate a recursive AI mind that mutates its own prompts."
     )
-    parser.add_argument("prompt", help="Initial thought to seed the recursive loop.")
+    parser.add_argument("prompt", nargs="?", help="Initial thought to seed the recursive loop.")
     parser.add_argument("--steps", type=int, default=8, help="Number of recursive iterations to run.")
     parser.add_argument(
         "--no-interrupts",
@@ -48,38 +62,571 @@ def build_parser() -> argparse.ArgumentParser:
         metavar="NAME=WEIGHT",
         help="Override a bias weight, e.g. --bias paranoia=0.4 (can repeat).",
     )
+    parser.add_argument(
+        "--strategy",
+        action="append",
+        default=[],
+        metavar="NAME=PROBABILITY",
+        help=(
+            f"Set how often a distortion strategy fires; 0 disables it (can repeat). Strategies: "
+            f"{', '.join(SEGMENT_KINDS)}."
+        ),
+    )
+    parser.add_argument(
+        "--prompt-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Fold carried-over thoughts to about this many tokens to keep long runs bounded.",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        metavar="DIR",
+        help="Write periodic checkpoints here (also where --jump-to looks).",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="Steps between checkpoints when --checkpoint-dir is set (default: 1000).",
+    )
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument(
+        "--resume",
+        metavar="PATH",
+        help="Continue a run from a checkpoint file for --steps more iterations.",
+    )
+    resume_group.add_argument(
+        "--jump-to",
+        type=int,
+        metavar="STEP",
+        help="Replay from the nearest checkpoint in --checkpoint-dir and print from STEP on.",
+    )
+    parser.add_argument(
+        "--log",
+        metavar="PATH",
+        help="Append every step to the run log at PATH (PATH.idx + PATH.heap).",
+    )
+    parser.add_argument(
+        "--run-id",
+        type=int,
+        help="Run id recorded with --log (default: one past the last run in the log).",
+    )
+    parser.add_argument(
+        "--memory-size",
+        type=int,
+        default=12,
+        metavar="N",
+        help="Thoughts kept in working memory (default: 12).",
+    )
+    parser.add_argument(
+        "--recall",
+        choices=RECALL_MODES,
+        default="decay",
+        help="Pick memory echoes by decayed weight alone, or weighted by word overlap with the last thought.",
+    )
+    parser.add_argument(
+        "--consolidate-every",
+        type=int,
+        metavar="K",
+        help="Keep evicted thoughts in bounded warm/cold long-term tiers, consolidating every K steps.",
+    )
+    parser.add_argument(
+        "--stop-on-cycle",
+        action="store_true",
+        help="Stop early once thoughts repeat (exactly or nearly) at a fixed period and report the cycle.",
+    )
+    parser.add_argument(
+        "--events-file",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Tail this file for live interrupt events, one per line (can repeat).",
+    )
+    parser.add_argument(
+        "--events-fifo",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Read live events from this named pipe, creating it if needed (can repeat).",
+    )
+    parser.add_argument(
+        "--events-socket",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Listen on this Unix socket for newline-separated live events (can repeat).",
+    )
+    parser.add_argument(
+        "--event-buffer",
+        type=int,
+        default=32,
+        metavar="N",
+        help="Live events buffered per feed before the overflow policy applies (default: 32).",
+    )
+    parser.add_argument(
+        "--event-policy",
+        choices=POLICIES,
+        default="drop_oldest",
+        help="What to do with bursts that overflow the buffer (default: drop_oldest).",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Time each stage and write Prometheus text metrics to PATH when the run ends.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Record per-stage spans and write them to PATH as a Chrome trace.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print streaming run statistics (moods, transitions, length quantiles, strategy rates) at the end.",
+    )
+    parser.add_argument(
+        "--stats-file",
+        metavar="PATH",
+        help="Merge this run's statistics into PATH (created if missing), accumulating across runs.",
+    )
+    return parser
+
+
+def build_ensemble_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind ensemble",
+        description="Run many seeded simulations per prompt across a process pool.",
+    )
+    parser.add_argument("prompts", nargs="+", help="One or more initial thoughts.")
+    parser.add_argument("--runs", type=int, default=100, help="Seeded runs per prompt.")
+    parser.add_argument("--seed-start", type=int, default=0, help="First seed; runs use consecutive seeds.")
+    parser.add_argument("--steps", type=int, default=8, help="Number of recursive iterations per run.")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Runs shipped to a worker at a time.")
+    parser.add_argument("--no-interrupts", action="store_true", help="Disable environmental interrupts.")
+    parser.add_argument(
+        "--mood",
+        choices=[mood.value for mood in Mood],
+        help="Force the starting mood of every run.",
+    )
+    parser.add_argument(
+        "--bias",
+        action="append",
+        default=[],
+        metavar="NAME=WEIGHT",
+        help="Override a bias weight for every run (can repeat).",
+    )
+    parser.add_argument(
+        "--prompt-budget",
+        type=int,
+        metavar="TOKENS",
+        help="Fold carried-over thoughts to about this many tokens.",
+    )
+    return parser
+
+
+def ensemble_main(argv: list[str]) -> None:
+    args = build_ensemble_parser().parse_args(argv)
+    config = EnsembleConfig(
+        steps=args.steps,
+        allow_interrupts=not args.no_interrupts,
+        starting_mood=Mood(args.mood) if args.mood else None,
+        bias_overrides=parse_bias_overrides(args.bias) or None,
+        prompt_budget=args.prompt_budget,
+    )
+    seeds = range(args.seed_start, args.seed_start + args.runs)
+
+    started = time.perf_counter()
+    counts = [[0] * len(MOODS) for _ in args.prompts]
+    runs = steps = 0
+    for chunk in iter_ensemble(args.prompts, seeds, config, workers=args.jobs, chunk_size=args.chunk_size):
+        for run in range(chunk.run_count):
+            tally = counts[chunk.prompt_index[run]]
+            for code in chunk.moods[chunk.run_offsets[run]:chunk.run_offsets[run + 1]]:
+                tally[code] += 1
+        runs += chunk.run_count
+        steps += chunk.step_count
+    elapsed = time.perf_counter() - started
+
+    print(f"{runs} runs / {steps} steps in {elapsed:.2f}s ({steps / max(elapsed, 1e-9):.0f} steps/s)")
+    for prompt, tally in zip(args.prompts, counts):
+        total = sum(tally) or 1
+        occupancy = ", ".join(f"{mood.value}={count / total:.3f}" for mood, count in zip(MOODS, tally))
+        print(f"{prompt!r}: {occupancy}")
+
+
+def build_log_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind log",
+        description="Query a run log written with --log.",
+    )
+    parser.add_argument("path", help="Run log path given to --log.")
+    parser.add_argument("--run-id", type=int, help="Only steps from this run.")
+    parser.add_argument(
+        "--mood",
+        action="append",
+        choices=[mood.value for mood in Mood],
+        help="Only steps in this mood (can repeat).",
+    )
+    parser.add_argument("--from", dest="start", type=int, metavar="ITER", help="First iteration to include.")
+    parser.add_argument("--to", dest="stop", type=int, metavar="ITER", help="Iteration to stop before.")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matching steps.")
+    return parser
+
+
+def log_main(argv: list[str]) -> None:
+    args = build_log_parser().parse_args(argv)
+    moods = [Mood(value) for value in args.mood] if args.mood else None
+    with RunLogReader(args.path) as reader:
+        matches = reader.query(run_id=args.run_id, mood=moods, start=args.start, stop=args.stop)
+        if args.count:
+            print(len(matches) if hasattr(matches, "__len__") else sum(1 for _ in matches))
+            return
+        for index in matches:
+            record = reader.record(index)
+            print(f"run={record.run_id} [{record.iteration:02d}] mood={record.mood.value}")
+            print("  thought -> " + reader.thought(index))
+
+
+def _int_list(value: str) -> tuple[int, ...]:
+    try:
+        return tuple(int(item) for item in value.split(","))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated integers, got '{value}'") from exc
+
+
+def build_bench_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind bench",
+        description="Time the engine hot paths and report throughput, latency and peak allocation as JSON.",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(bench.BENCHMARKS),
+        help="Run just this benchmark (can repeat).",
+    )
+    parser.add_argument("--quick", action="store_true", help="Use a smaller sweep for a fast smoke run.")
+    parser.add_argument("--steps", type=_int_list, metavar="N,N,...", help="Run lengths for engine.step.")
+    parser.add_argument("--maxlen", type=_int_list, metavar="N,N,...", help="Memory sizes for memory.*.")
+    parser.add_argument("--triggers", type=_int_list, metavar="N,N,...", help="Trigger-table sizes for distortions.")
+    parser.add_argument("--ops", type=int, help="Timed operations per micro-benchmark point.")
+    parser.add_argument("--out", metavar="PATH", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Flag regressions against a stored report.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slack before a change counts as a regression (default: 0.25).",
+    )
+    return parser
+
+
+def bench_main(argv: list[str]) -> None:
+    args = build_bench_parser().parse_args(argv)
+    config = bench.QUICK if args.quick else bench.BenchConfig()
+    overrides = {"steps": args.steps, "maxlen": args.maxlen, "triggers": args.triggers, "operations": args.ops}
+    config = bench.BenchConfig(**{**vars(config), **{k: v for k, v in overrides.items() if v is not None}})
+
+    results = []
+    for result in bench.run_benchmarks(config, args.only):
+        results.append(result)
+        print(
+            f"{result.key}: {result.throughput:,.0f} ops/s  p50={result.p50_us:.1f}us  "
+            f"p99={result.p99_us:.1f}us  peak={result.peak_kib:.1f}KiB",
+            file=sys.stderr,
+        )
+    report = json.dumps(bench.to_report(results, config), indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+
+    if args.compare:
+        regressions = bench.compare(bench.load_report(args.compare), results, args.tolerance)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.key} {regression.metric}: "
+                f"{regression.baseline:.2f} -> {regression.current:.2f} ({regression.change:+.1%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+def build_batch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind batch",
+        description=(
+            "Run many prompts in one process pool and stream JSON lines. Input lines are prompts, "
+            'or JSON objects like {"prompt": ..., "id": ..., "seed": ..., "steps": ..., "mood": ..., "bias": {...}}.'
+        ),
+    )
+    parser.add_argument("input", nargs="?", default="-", help="Prompts file (default: stdin).")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--steps", type=int, default=8, help="Iterations per prompt unless overridden.")
+    parser.add_argument("--seed", type=int, help="Base seed; prompt i without its own seed uses SEED + i.")
+    parser.add_argument("--no-interrupts", action="store_true", help="Disable environmental interrupts.")
+    parser.add_argument(
+        "--mood",
+        choices=[mood.value for mood in Mood],
+        help="Default starting mood.",
+    )
+    parser.add_argument(
+        "--bias",
+        action="append",
+        default=[],
+        metavar="NAME=WEIGHT",
+        help="Default bias override (can repeat); per-prompt biases are merged on top.",
+    )
+    parser.add_argument("--prompt-budget", type=int, metavar="TOKENS", help="Fold carried-over thoughts.")
+    parser.add_argument(
+        "--per-run",
+        action="store_true",
+        help="Emit one object per prompt with a list of steps instead of one object per step.",
+    )
+    parser.add_argument("--omit-prompts", action="store_true", help="Leave the mutated prompts out of the output.")
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Emit runs as they finish; records carry their input index either way.",
+    )
     return parser
 
 
-def main() -> None:
+def batch_main(argv: list[str]) -> None:
+    args = build_batch_parser().parse_args(argv)
+    defaults = jobs.JobDefaults(
+        steps=args.steps,
+        seed=args.seed,
+        allow_interrupts=not args.no_interrupts,
+        mood=Mood(args.mood) if args.mood else None,
+        bias_overrides=parse_bias_overrides(args.bias) or None,
+        prompt_budget=args.prompt_budget,
+        per_step=not args.per_run,
+        include_prompts=not args.omit_prompts,
+    )
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    try:
+        output = jobs.run_jobs(jobs.read_jobs(source), defaults, workers=args.jobs, ordered=not args.unordered)
+        jobs.write_jobs(output, sys.stdout)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def build_sweep_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind sweep",
+        description=(
+            "Run a grid or random search over starting mood, biases, interrupt settings and memory decay, "
+            'streaming one JSON line of aggregates per cell. SPEC is a JSON file like {"params": {"mood": '
+            '["calm", "anxious"], "probability": [0.1, 0.5], "bias.catastrophizing": [0.2, 0.8]}, "steps": 50}.'
+        ),
+    )
+    parser.add_argument("spec", help="Sweep specification (JSON).")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--memo", metavar="DIR", help="Keep finished cells here and skip them when rerun.")
+    parser.add_argument(
+        "--rank",
+        metavar="METRIC",
+        help="After the sweep, print the top cells by this field (e.g. interrupt_rate) to stderr.",
+    )
+    parser.add_argument("--top", type=int, default=5, help="How many cells --rank lists.")
+    return parser
+
+
+def sweep_main(argv: list[str]) -> None:
+    args = build_sweep_parser().parse_args(argv)
+    spec = sweep.load_spec(args.spec)
+    memo = sweep.SweepMemo(args.memo) if args.memo else None
+    results = []
+    for result in sweep.run_sweep(spec, workers=args.jobs, memo=memo):
+        print(json.dumps(result.to_dict()), flush=True)
+        if args.rank:
+            results.append(result)
+    if args.rank:
+        for result in sweep.best_cells(results, args.rank, args.top):
+            print(f"{result.metrics.summary()[args.rank]}  {json.dumps(result.cell)}", file=sys.stderr)
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="recursive_mind serve",
+        description="Host many persistent minds behind a local HTTP/JSON interface.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765).")
+    parser.add_argument("--max-live", type=int, default=1024, help="Sessions kept in memory before LRU spilling.")
+    parser.add_argument(
+        "--spill-dir",
+        metavar="DIR",
+        help="Where idle sessions, and all sessions on shutdown, are checkpointed; sessions found here are served again (default: a temp dir, removed on exit).",
+    )
+    parser.add_argument("--batch-size", type=int, default=256, help="Most requests executed per worker batch.")
+    parser.add_argument("--max-steps", type=int, default=1000, help="Most steps one advance request may ask for.")
+    parser.add_argument("--prompt-budget", type=int, metavar="TOKENS", help="Fold carried-over thoughts.")
+    parser.add_argument("--memory-size", type=int, default=12, metavar="N", help="Thoughts kept in working memory.")
+    return parser
+
+
+def serve_main(argv: list[str]) -> None:
+    args = build_serve_parser().parse_args(argv)
+    store = server.SessionStore(
+        lambda: RecursiveMindEngine(prompt_budget=args.prompt_budget, memory_size=args.memory_size),
+        max_live=args.max_live,
+        spill_dir=args.spill_dir,
+        max_steps=args.max_steps,
+    )
+    mind_server = server.MindServer(store, args.host, args.port, batch_size=args.batch_size)
+    host, port = mind_server.address
+    print(f"Serving {len(store)} session(s) on http://{host}:{port} (spill dir: {store.spill_dir})", file=sys.stderr)
+    try:
+        mind_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+SUBCOMMANDS: dict[str, Callable[[list[str]], None]] = {
+    "ensemble": ensemble_main,
+    "log": log_main,
+    "bench": bench_main,
+    "batch": batch_main,
+    "sweep": sweep_main,
+    "serve": serve_main,
+}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        SUBCOMMANDS[argv[0]](argv[1:])
+        return
+
     parser = build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.prompt is None and not (args.resume or args.jump_to is not None):
+        parser.error("a prompt is required unless --resume or --jump-to is given")
+    if args.jump_to is not None and not args.checkpoint_dir:
+        parser.error("--jump-to needs --checkpoint-dir")
 
     starting_mood = Mood(args.mood) if args.mood else None
     bias_overrides = parse_bias_overrides(args.bias) if args.bias else {}
 
-    engine = RecursiveMindEngine(seed=args.seed)
-    results = engine.run(
-        initial_thought=args.prompt,
-        steps=args.steps,
-        allow_interrupts=not args.no_interrupts,
-        starting_mood=starting_mood,
-        bias_overrides=bias_overrides or None,
+    try:
+        strategies = parse_bias_overrides(args.strategy, "strategy")
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    metrics = Metrics(trace=bool(args.trace)) if args.metrics or args.trace else None
+    stats = RunStatistics() if args.stats or args.stats_file else None
+    engine = RecursiveMindEngine(
+        seed=args.seed,
+        prompt_budget=args.prompt_budget,
+        metrics=metrics,
+        stats=stats,
+        detect_cycles=args.stop_on_cycle,
+        memory_size=args.memory_size,
+        recall_mode=args.recall,
+        consolidate_every=args.consolidate_every,
+    )
+    try:
+        engine.distortions.configure_many(strategies)
+    except (KeyError, ValueError) as exc:
+        parser.error(str(exc.args[0]))
+    allow_interrupts = not args.no_interrupts
+    sources = (
+        [FileTailSource(path) for path in args.events_file]
+        + [FifoSource(path) for path in args.events_fifo]
+        + [UnixSocketSource(path) for path in args.events_socket]
     )
+    engine.interrupts.feeds = [EventFeed(source, args.event_buffer, args.event_policy) for source in sources]
+    results: Iterator[StepResult]
+    if args.resume:
+        info = checkpoint.load_checkpoint(engine, args.resume)
+        allow_interrupts = info.allow_interrupts
+        results = engine.advance(args.steps, allow_interrupts=allow_interrupts)
+        origin = f"checkpoint {args.resume} (after step {info.step})"
+    elif args.jump_to is not None:
+        try:
+            target, info = checkpoint.seek(engine, args.checkpoint_dir, args.jump_to)
+        except ValueError as exc:
+            parser.error(f"--jump-to: {exc}")
+        allow_interrupts = info.allow_interrupts
+        results = itertools.chain([target], engine.advance(args.steps - 1, allow_interrupts=allow_interrupts))
+        origin = f"step {args.jump_to} replayed from {args.checkpoint_dir}"
+    else:
+        results = engine.stream(
+            initial_thought=args.prompt,
+            steps=args.steps,
+            allow_interrupts=allow_interrupts,
+            starting_mood=starting_mood,
+            bias_overrides=bias_overrides or None,
+        )
+        origin = None
+    if args.checkpoint_dir and args.jump_to is None:
+        results = checkpoint.with_checkpoints(
+            engine, results, args.checkpoint_dir, args.checkpoint_every, allow_interrupts
+        )
+    if args.stop_on_cycle:
+        if engine.state.memory.cycles is None:
+            engine.state.memory.track_cycles()
+        results = _until_cycle(engine, results)
+    log = RunLogWriter(args.log) if args.log else None
+    if log:
+        run_id = args.run_id if args.run_id is not None else log.next_run_id()
+        results = log.extend(run_id, results)
 
     print("=" * 72)
-    print(f"Initial prompt: {args.prompt}")
-    print(f"Starting mood: {(starting_mood.value if starting_mood else 'auto')}")
-    print(f"Bias overrides: {bias_overrides or 'default profile'}")
+    if origin:
+        print(f"Resumed from {origin}")
+    else:
+        print(f"Initial prompt: {args.prompt}")
+        print(f"Starting mood: {(starting_mood.value if starting_mood else 'auto')}")
+        print(f"Bias overrides: {bias_overrides or 'default profile'}")
     print("=" * 72)
 
+    try:
+        for step in results:
+            print(f"[{step.iteration:02d}] mood={step.mood.value}")
+            if step.external:
+                print(f"  external -> {step.external}")
+            print("  prompt  -> " + step.prompt.replace("\n", "\n              "))
+            print("  thought -> " + step.thought)
+            print("-" * 72)
+    finally:
+        if log:
+            log.close()
+        if metrics and args.metrics:
+            metrics.write_prometheus(args.metrics)
+        if metrics and args.trace:
+            metrics.write_chrome_trace(args.trace)
+        for feed in engine.interrupts.feeds:
+            feed.close()
+        if stats and args.stats_file:
+            if os.path.exists(args.stats_file):
+                stored = RunStatistics.load(args.stats_file)
+                stored.merge(stats)
+            else:
+                stored = stats
+            stored.save(args.stats_file)
+    if stats and args.stats:
+        print(json.dumps(stats.summary(), indent=2))
+    if args.stop_on_cycle and stop_on_cycle(engine.state):
+        cycle = engine.state.memory.cycles.cycle
+        kind = "exact" if cycle.exact else f"near-duplicate, similarity >= {cycle.similarity:.2f}"
+        print(
+            f"Cycle detected: period {cycle.period} ({kind}) starting at step {cycle.onset - 1}, "
+            f"confirmed at step {cycle.detected_at - 1}; stopped."
+        )
+
+
+def _until_cycle(engine: RecursiveMindEngine, results: Iterator[StepResult]) -> Iterator[StepResult]:
     for step in results:
-        print(f"[{step.iteration:02d}] mood={step.mood.value}")
-        if step.external:
-            print(f"  external -> {step.external}")
-        print("  prompt  -> " + step.prompt.replace("\n", "\n              "))
-        print("  thought -> " + step.thought)
-        print("-" * 72)
+        yield step
+        if stop_on_cycle(engine.state):
+            return
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from .state import Thought, ThoughtState
+
+_MERSENNE = (1 << 61) - 1
+_ROLL_BASE = 1_000_003
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+_EMPTY = _MASK
+
+
+@dataclass(frozen=True)
+class CycleReport:
+    """
+    A confirmed cycle. Positions are ``Thought.iteration`` values: the seed
+    thought is 1 and the thought produced by step ``k`` is ``k + 1``.
+    """
+
+    period: int  # 1 is a fixed point
+    onset: int  # iteration of the first thought inside the repeating segment
+    detected_at: int  # iteration at which the cycle was confirmed
+    similarity: float  # lowest estimated similarity between repeats along the cycle
+    exact: bool  # every repeat was a verbatim copy
+
+
+@dataclass
+class _Entry:
+    iteration: int
+    fingerprint: bytes
+    signature: List[int]
+    bands: List[int]
+
+
+class CycleDetector:
+    """
+    Spots thoughts that repeat, verbatim or nearly, at a fixed period.
+
+    Each thought gets a blake2b fingerprint for exact repeats and a
+    one-permutation MinHash signature over rolling hashes of word shingles for
+    near repeats. Signatures are split into LSH bands whose buckets map to the
+    latest iteration that produced them, so finding earlier look-alikes costs a
+    handful of dictionary lookups regardless of ``window``. A cycle of period
+    ``p`` is confirmed once ``max(min_repeats, p)`` consecutive thoughts each
+    resemble the thought ``p`` steps before them.
+    """
+
+    def __init__(
+        self,
+        window: int = 64,
+        threshold: float = 0.8,
+        bands: int = 8,
+        rows: int = 4,
+        shingle: int = 3,
+        min_repeats: int = 3,
+    ) -> None:
+        self.window = window
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle = shingle
+        self.min_repeats = min_repeats
+        self.cycle: Optional[CycleReport] = None
+        self._recent: Deque[_Entry] = deque()
+        self._by_iteration: Dict[int, _Entry] = {}
+        self._exact: Dict[bytes, int] = {}
+        self._buckets: Dict[int, int] = {}
+        self._period: Optional[int] = None
+        self._streak = 0
+        self._streak_similarity = 1.0
+        self._streak_exact = True
+
+    @property
+    def width(self) -> int:
+        return self.bands * self.rows
+
+    def signature(self, words: Sequence[str]) -> List[int]:
+        """MinHash with one hash per shingle, binned into ``width`` slots."""
+        width = self.width
+        signature = [_EMPTY] * width
+        size = self.shingle
+        if not words:
+            return signature
+        hashes = [zlib.crc32(word.encode("utf-8")) for word in words]
+        top = pow(_ROLL_BASE, min(size, len(hashes)) - 1, _MERSENNE)
+        rolling = 0
+        for index, value in enumerate(hashes):
+            if index >= size:
+                rolling = (rolling - hashes[index - size] * top) % _MERSENNE
+            rolling = (rolling * _ROLL_BASE + value) % _MERSENNE
+            if index < min(size, len(hashes)) - 1:
+                continue
+            mixed = (rolling * _MIX) & _MASK
+            slot = mixed % width
+            if mixed < signature[slot]:
+                signature[slot] = mixed
+        return signature
+
+    def similarity(self, left: Sequence[int], right: Sequence[int]) -> float:
+        filled = equal = 0
+        for a, b in zip(left, right):
+            if a == _EMPTY and b == _EMPTY:
+                continue
+            filled += 1
+            equal += a == b
+        return equal / filled if filled else 1.0
+
+    def observe(self, thought: "Thought") -> Optional[CycleReport]:
+        """Feed the next thought; returns the active cycle, if any."""
+        iteration = thought.iteration
+        fingerprint = hashlib.blake2b(thought.text.encode("utf-8"), digest_size=16).digest()
+        signature = self.signature(thought.words)
+        rows = self.rows
+        bands = [hash((band, *signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+        matches: Dict[int, tuple[float, bool]] = {}
+        earlier = self._exact.get(fingerprint)
+        if earlier is not None:
+            matches[iteration - earlier] = (1.0, True)
+        for key in bands:
+            candidate = self._buckets.get(key)
+            if candidate is None or iteration - candidate in matches:
+                continue
+            entry = self._by_iteration.get(candidate)
+            if entry is None:
+                continue
+            score = self.similarity(signature, entry.signature)
+            if score >= self.threshold:
+                matches[iteration - candidate] = (score, entry.fingerprint == fingerprint)
+
+        self._track(iteration, matches)
+        self._remember(_Entry(iteration, fingerprint, signature, bands))
+        return self.cycle
+
+    def _track(self, iteration: int, matches: Dict[int, tuple[float, bool]]) -> None:
+        if self._period is not None and self._period in matches:
+            score, exact = matches[self._period]
+            self._streak += 1
+            self._streak_similarity = min(self._streak_similarity, score)
+            self._streak_exact = self._streak_exact and exact
+        elif matches:
+            self._period = min(matches)
+            self._streak_similarity, self._streak_exact = matches[self._period]
+            self._streak = 1
+            self.cycle = None
+        else:
+            self._period = None
+            self._streak = 0
+            self.cycle = None
+            return
+        period = self._period
+        if self._streak >= max(self.min_repeats, period):
+            onset = iteration - self._streak - period + 1
+            if self.cycle is None:
+                self.cycle = CycleReport(period, onset, iteration, self._streak_similarity, self._streak_exact)
+            else:
+                self.cycle = CycleReport(
+                    period, onset, self.cycle.detected_at, self._streak_similarity, self._streak_exact
+                )
+
+    def _remember(self, entry: _Entry) -> None:
+        self._recent.append(entry)
+        self._by_iteration[entry.iteration] = entry
+        self._exact[entry.fingerprint] = entry.iteration
+        for key in entry.bands:
+            self._buckets[key] = entry.iteration
+        while len(self._recent) > self.window:
+            old = self._recent.popleft()
+            del self._by_iteration[old.iteration]
+            if self._exact.get(old.fingerprint) == old.iteration:
+                del self._exact[old.fingerprint]
+            for key in old.bands:
+                if self._buckets.get(key) == old.iteration:
+                    del self._buckets[key]
+
+    def copy(self) -> "CycleDetector":
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._recent = deque(self._recent)
+        clone._by_iteration = dict(self._by_iteration)
+        clone._exact = dict(self._exact)
+        clone._buckets = dict(self._buckets)
+        return clone
+
+    def export_state(self) -> dict:
+        cycle = self.cycle
+        return {
+            "config": [self.window, self.threshold, self.bands, self.rows, self.shingle, self.min_repeats],
+            "recent": [(entry.iteration, entry.fingerprint, entry.signature) for entry in self._recent],
+            "period": self._period,
+            "streak": [self._streak, self._streak_similarity, self._streak_exact],
+            "cycle": None if cycle is None else [cycle.period, cycle.onset, cycle.detected_at, cycle.similarity, cycle.exact],
+        }
+
+    @classmethod
+    def from_state(cls, data: dict) -> "CycleDetector":
+        detector = cls(*data["config"])
+        rows = detector.rows
+        for iteration, fingerprint, signature in data["recent"]:
+            signature = list(signature)
+            bands = [hash((band, *signature[band * rows:(band + 1) * rows])) for band in range(detector.bands)]
+            detector._remember(_Entry(iteration, bytes(fingerprint), signature, bands))
+        detector._period = data["period"]
+        detector._streak, detector._streak_similarity, detector._streak_exact = data["streak"]
+        detector.cycle = None if data["cycle"] is None else CycleReport(*data["cycle"])
+        return detector
+
+
+def stop_on_cycle(state: "ThoughtState") -> bool:
+    """``iterate_until`` predicate: stop once the memory's detector has confirmed a cycle."""
+    cycles = state.memory.cycles
+    return cycles is not None and cycles.cycle is not None
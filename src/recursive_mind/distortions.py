@@ -1,17 +1,17 @@
 from __future__ import annotations
 
 import random
-import re
+from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
 
+from .keywords import KeywordIndex, KeywordMatches
 from .mood import Mood
 from .state import Thought, ThoughtState
 
-
-def _contains_any(text: str, keywords: tuple[str, ...]) -> bool:
-    lowered = text.lower()
-    return any(keyword in lowered for keyword in keywords)
+if TYPE_CHECKING:
+    from .metrics import Metrics
 
 
 @dataclass
@@ -19,12 +19,14 @@ class DistortionContext:
     last_thought: Optional[Thought]
     state: ThoughtState
     external: Optional[str] = None
+    matches: Optional[KeywordMatches] = None  # keyword scan of the prompt text, if already done
 
 
 class DistortionEngine:
     """Combines multiple distortion strategies into a single prompt mutation."""
 
-    def __init__(self) -> None:
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng or random.Random()
         self.intrusive_triggers: dict[tuple[str, ...], str] = {
             ("safety", "danger", "risk"): "What if I'm missing the obvious risk?",
             ("loop", "repeat", "stuck"): "I'm spiraling — is this a dead end?",
@@ -46,114 +48,327 @@ class DistortionEngine:
             "Have I already solved this and forgotten?",
             "Does this contradiction matter right now?",
         ]
+        self._keywords: Optional[KeywordIndex] = None
+        self._keyword_signature: tuple[int, int] = (-1, -1)
+        self.metrics: Optional[Metrics] = None
+        self.fired: List[str] = []  # names of the strategies that added a line in the last distort()
+        self.pipeline: List[Strategy] = default_pipeline()
+        self.compile()
 
-    def distort(self, prompt: str, context: DistortionContext) -> str:
-        state = context.state
-        mood = state.mood_state.mood
+    def strategy(self, name: str) -> "Strategy":
+        for strategy in self.pipeline:
+            if strategy.name == name:
+                return strategy
+        raise KeyError(f"No distortion strategy named {name!r}; choose from {[s.name for s in self.pipeline]}")
 
-        segments: list[str] = []
-        segments.append(self._apply_mood(prompt, mood))
+    def configure(self, name: str, enabled: Optional[bool] = None, probability: Optional[float] = None) -> None:
+        """Switch a strategy on or off or change how often it fires, then recompile."""
+        strategy = self.strategy(name)
+        if enabled is not None:
+            strategy.enabled = enabled
+        if probability is not None:
+            if not 0.0 <= probability <= 1.0:
+                raise ValueError(f"Probability for {name!r} must lie in [0, 1]")
+            strategy.probability = probability
+        self.compile()
 
-        if context.external:
-            segments.append(f"Interrupt: {context.external.strip()}")
+    def configure_many(self, settings: Mapping[str, float]) -> None:
+        """Apply ``{name: probability}``; a probability of 0 disables the strategy."""
+        for name, probability in settings.items():
+            self.configure(name, enabled=probability > 0, probability=probability)
 
-        memory_fragment = state.memory.recall_fragment()
-        if memory_fragment and random.random() < 0.7:
-            segments.append(f"Memory echo: {memory_fragment}")
+    def compile(self) -> None:
+        """
+        Precompute each strategy's tables and keep only the ones that can fire.
 
-        bias_influence = self._bias_overlay(prompt, state)
-        if bias_influence:
-            segments.append(bias_influence)
+        Call again after editing ``pipeline`` directly. Forked engines share the
+        pipeline, like the other distortion tables.
+        """
+        for strategy in self.pipeline:
+            strategy.compile(self)
+        self._active = tuple(
+            strategy for strategy in self.pipeline if strategy.required or (strategy.enabled and strategy.probability > 0)
+        )
+        self._scan = any(strategy.needs_matches for strategy in self._active)
 
-        intrusive = self._intrusive_injection(prompt, state)
-        if intrusive:
-            segments.append(intrusive)
+    @property
+    def keywords(self) -> KeywordIndex:
+        """
+        Compiled scanner over triggers, associations and mood stimuli.
 
-        if random.random() < 0.4 and context.last_thought:
-            associative = self._associative_jump(context.last_thought.text)
-            if associative:
-                segments.append(f"Tangential drift: {associative}")
+        Rebuilt automatically when triggers or associations are added or removed;
+        call :meth:`refresh_keywords` after replacing keys in place.
+        """
+        signature = (len(self.intrusive_triggers), len(self.association_map))
+        if self._keywords is None or signature != self._keyword_signature:
+            self.refresh_keywords()
+        return self._keywords
 
-        if random.random() < 0.25 and len(state.memory) > 3:
-            segments.append(f"Overload: {state.memory.overload()}")
+    def refresh_keywords(self) -> None:
+        self._keywords = KeywordIndex(self.intrusive_triggers, self.association_map)
+        self._keyword_signature = (len(self.intrusive_triggers), len(self.association_map))
+        self.compile()  # trigger texts are cached by the intrusive strategy
 
-        if random.random() < 0.3:
-            segments.append(random.choice(self.self_doubt_templates))
+    def distort(self, prompt: str, context: DistortionContext) -> str:
+        matches = context.matches
+        if matches is None and self._scan:
+            matches = self.keywords.scan(prompt)
+        metrics = self.metrics
+        segments: list[str] = []
+        fired = self.fired = []
+        if not metrics:
+            for strategy in self._active:
+                segment = strategy.apply(self, prompt, context, matches)
+                if segment:
+                    segments.append(segment)
+                    fired.append(strategy.name)
+            return "\n".join(segments)
 
-        return "\n".join(segment for segment in segments if segment)
+        mark = metrics.clock()
+        for strategy in self._active:
+            segment = strategy.apply(self, prompt, context, matches)
+            if segment:
+                segments.append(segment)
+                fired.append(strategy.name)
+            mark = metrics.lap(strategy.stage, mark, hit=bool(segment))
+        return "\n".join(segments)
 
     def _apply_mood(self, prompt: str, mood: Mood) -> str:
-        mood_filters = {
-            Mood.CALM: lambda text: text,
-            Mood.CURIOUS: lambda text: text + " What if there's a hidden angle?",
-            Mood.ANXIOUS: lambda text: f"{text} I'm uneasy about where this leads.",
-            Mood.MELANCHOLIC: lambda text: f"{text} Everything feels slightly faded.",
-            Mood.IRRITATED: lambda text: f"{text} Why am I repeating myself?",
-            Mood.INSPIRED: lambda text: f"{text} There's a pulse of possibility here.",
+        return prompt.strip() + MOOD_SUFFIXES[mood]
+
+    def _associative_jump(self, source: Thought) -> Optional[str]:
+        tokens = list(source.words)
+        self.rng.shuffle(tokens)
+        matches = source.matches if source.matches is not None else self.keywords.scan(source.text)
+        associations = matches.associations
+        if associations:
+            # Only texts that contain an association key need the per-token lookup.
+            for token in tokens:
+                if token in associations:
+                    return self.rng.choice(self.association_map[token])
+        if tokens:
+            token = self.rng.choice(tokens[:3])
+            return f"{token} -> {token[::-1]}"
+        return None
+
+
+MOOD_SUFFIXES: Dict[Mood, str] = {
+    Mood.CALM: "",
+    Mood.CURIOUS: " What if there's a hidden angle?",
+    Mood.ANXIOUS: " I'm uneasy about where this leads.",
+    Mood.MELANCHOLIC: " Everything feels slightly faded.",
+    Mood.IRRITATED: " Why am I repeating myself?",
+    Mood.INSPIRED: " There's a pulse of possibility here.",
+}
+BIAS_OVERLAYS: Dict[str, tuple[str, str]] = {
+    "paranoia": ("Paranoia", "double-checking motives."),
+    "hope": ("Hope", "maybe there's a breakthrough close by."),
+    "self_doubt": ("Self-doubt", "am I fabricating clarity?"),
+    "nostalgia": ("Nostalgia", "echoing something I nearly remembered."),
+}
+STRENGTH_THRESHOLDS = (0.15, 0.4, 0.7)
+STRENGTH_LABELS = ("", " (persistent)", " (insistent)", " (overpowering)")
+
+
+def x_strength(value: float) -> str:
+    return STRENGTH_LABELS[bisect_right(STRENGTH_THRESHOLDS, abs(value))]
+
+
+class Strategy(ABC):
+    """
+    One step of the distortion pipeline: returns a prompt line, or ``None`` when it does not fire.
+
+    A strategy with ``probability`` below 1 draws once from the engine RNG to
+    decide; at 1 it draws nothing. Disabled strategies, and those with
+    probability 0, are left out of the compiled pipeline entirely.
+    """
+
+    name = ""
+    required = False  # runs even when disabled
+    needs_matches = False  # reads the keyword scan of the prompt
+
+    def __init__(self, probability: float = 1.0, enabled: bool = True) -> None:
+        self.probability = probability
+        self.enabled = enabled
+        self.stage = f"distort.{self.name}"
+
+    def fires(self, rng: random.Random) -> bool:
+        return self.probability >= 1.0 or rng.random() < self.probability
+
+    def compile(self, engine: DistortionEngine) -> None:
+        pass
+
+    @abstractmethod
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        ...
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(probability={self.probability}, enabled={self.enabled})"
+
+
+class MoodColouring(Strategy):
+    """Carries the prompt text itself, with a mood-specific suffix unless disabled."""
+
+    name = "mood"
+    required = True
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        text = prompt.strip()
+        if self.enabled and self.fires(engine.rng):
+            return text + MOOD_SUFFIXES[context.state.mood_state.mood]
+        return text
+
+
+class InterruptLine(Strategy):
+    name = "interrupt"
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        if context.external and self.fires(engine.rng):
+            return f"Interrupt: {context.external.strip()}"
+        return None
+
+
+class MemoryEcho(Strategy):
+    name = "memory_echo"
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        fragment = context.state.memory.recall_fragment()
+        if fragment and self.fires(engine.rng):
+            return f"Memory echo: {fragment}"
+        return None
+
+
+class BiasOverlay(Strategy):
+    """Looks up one precomputed line per (trait, strength bucket); unknown traits are ignored."""
+
+    name = "bias_overlay"
+
+    def compile(self, engine: DistortionEngine) -> None:
+        self._lines = {
+            trait: tuple(f"{label}{strength}: {text}" for strength in STRENGTH_LABELS)
+            for trait, (label, text) in BIAS_OVERLAYS.items()
         }
-        return mood_filters[mood](prompt.strip())
 
-    def _bias_overlay(self, prompt: str, state: ThoughtState) -> Optional[str]:
-        if not state.biases.traits:
-            return None
-        overlays = []
-        for bias, strength in state.biases.traits.items():
-            if strength == 0:
-                continue
-            if bias == "paranoia":
-                overlays.append(self._paranoia_overlay(prompt, strength))
-            elif bias == "hope":
-                overlays.append(self._hope_overlay(prompt, strength))
-            elif bias == "self_doubt":
-                overlays.append(self._self_doubt_overlay(prompt, strength))
-            elif bias == "nostalgia":
-                overlays.append(self._nostalgia_overlay(prompt, strength))
-        overlays = [item for item in overlays if item]
-        if not overlays:
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        traits = context.state.biases.traits
+        if not traits or not self.fires(engine.rng):
             return None
-        return "Bias drift: " + " ".join(overlays)
+        lines = self._lines
+        overlays = [
+            lines[trait][bisect_right(STRENGTH_THRESHOLDS, abs(strength))]
+            for trait, strength in traits.items()
+            if strength and trait in lines
+        ]
+        return "Bias drift: " + " ".join(overlays) if overlays else None
 
-    def _paranoia_overlay(self, prompt: str, strength: float) -> str:
-        return f"Paranoia{x_strength(strength)}: double-checking motives."
 
-    def _hope_overlay(self, prompt: str, strength: float) -> str:
-        return f"Hope{x_strength(strength)}: maybe there's a breakthrough close by."
+class IntrusiveThought(Strategy):
+    """Fires on a trigger keyword, then leaves a residue of random trigger texts for a couple of steps."""
 
-    def _self_doubt_overlay(self, prompt: str, strength: float) -> str:
-        return f"Self-doubt{x_strength(strength)}: am I fabricating clarity?"
+    name = "intrusive"
+    needs_matches = True
 
-    def _nostalgia_overlay(self, prompt: str, strength: float) -> str:
-        return f"Nostalgia{x_strength(strength)}: echoing something I nearly remembered."
+    def compile(self, engine: DistortionEngine) -> None:
+        self._texts = tuple(engine.intrusive_triggers.values())
 
-    def _intrusive_injection(self, prompt: str, state: ThoughtState) -> Optional[str]:
-        lowered = prompt.lower()
-        for keywords, message in self.intrusive_triggers.items():
-            if _contains_any(lowered, keywords):
-                state.intrusive_budget = max(state.intrusive_budget, 2)
-                return f"Intrusive thought: {message}"
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        state = context.state
+        if matches.trigger is not None:
+            if not self.fires(engine.rng):
+                return None
+            state.intrusive_budget = max(state.intrusive_budget, 2)
+            return f"Intrusive thought: {engine.intrusive_triggers[matches.trigger]}"
         if state.intrusive_budget > 0:
             state.intrusive_budget -= 1
-            return f"Intrusive residue: {random.choice(list(self.intrusive_triggers.values()))}"
+            texts = self._texts
+            if len(texts) != len(engine.intrusive_triggers):
+                texts = self._texts = tuple(engine.intrusive_triggers.values())
+            return f"Intrusive residue: {engine.rng.choice(texts)}"
         return None
 
-    def _associative_jump(self, source_text: str) -> Optional[str]:
-        tokens = re.findall(r"[a-zA-Z']{4,}", source_text.lower())
-        random.shuffle(tokens)
-        for token in tokens:
-            if token in self.association_map:
-                return random.choice(self.association_map[token])
-        if tokens:
-            token = random.choice(tokens[:3])
-            return f"{token} -> {token[::-1]}"
+
+class AssociativeJump(Strategy):
+    name = "associative"
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        if self.fires(engine.rng) and context.last_thought:
+            associative = engine._associative_jump(context.last_thought)
+            if associative:
+                return f"Tangential drift: {associative}"
         return None
 
 
-def x_strength(value: float) -> str:
-    magnitude = abs(value)
-    if magnitude < 0.15:
-        return ""
-    if magnitude < 0.4:
-        return " (persistent)"
-    if magnitude < 0.7:
-        return " (insistent)"
-    return " (overpowering)"
+class Overload(Strategy):
+    name = "overload"
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        memory = context.state.memory
+        if self.fires(engine.rng) and len(memory) > 3:
+            return f"Overload: {memory.overload()}"
+        return None
+
+
+class SelfDoubt(Strategy):
+    name = "self_doubt"
+
+    def apply(
+        self, engine: DistortionEngine, prompt: str, context: DistortionContext, matches: Optional[KeywordMatches]
+    ) -> Optional[str]:
+        if self.fires(engine.rng):
+            return engine.rng.choice(engine.self_doubt_templates)
+        return None
+
+
+def default_pipeline() -> List[Strategy]:
+    """The stock pipeline; its order and probabilities define the seeded output."""
+    return [
+        MoodColouring(),
+        InterruptLine(),
+        MemoryEcho(0.7),
+        BiasOverlay(),
+        IntrusiveThought(),
+        AssociativeJump(0.4),
+        Overload(0.25),
+        SelfDoubt(0.3),
+    ]
+
+
+SEGMENT_PREFIXES = {
+    "Interrupt:": "interrupt",
+    "Memory echo:": "memory_echo",
+    "Bias drift:": "bias_overlay",
+    "Intrusive thought:": "intrusive",
+    "Intrusive residue:": "intrusive",
+    "Tangential drift:": "associative",
+    "Overload:": "overload",
+}
+SEGMENT_KINDS = ("mood", "interrupt", "memory_echo", "bias_overlay", "intrusive", "associative", "overload", "self_doubt")
+
+
+def segment_kinds(prompt: str) -> list[str]:
+    """
+    Name the strategy behind each line of a distorted prompt.
+
+    The first line is always the mood-coloured text; unprefixed later lines
+    are self-doubt templates.
+    """
+    kinds = ["mood"]
+    for line in prompt.split("\n")[1:]:
+        kinds.append(next((kind for prefix, kind in SEGMENT_PREFIXES.items() if line.startswith(prefix)), "self_doubt"))
+    return kinds
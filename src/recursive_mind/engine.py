@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import copy
 import random
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
+from .cycles import CycleDetector, stop_on_cycle
 from .distortions import DistortionEngine
 from .interrupts import InterruptHandler
+from .metrics import Metrics
 from .mood import Mood
 from .prompt_engine import PromptEngine, SyntheticThinker
-from .state import ThoughtState
+from .state import ThoughtMemory, ThoughtState
+from .stats import RunStatistics
+from .tiers import TieredMemory
 
 
 @dataclass
@@ -20,6 +25,17 @@ class StepResult:
     external: Optional[str] = None
 
 
+@dataclass
+class PendingStep:
+    """A step whose prompt is built but whose thought has not been synthesised yet."""
+
+    iteration: int
+    mood: Mood
+    prompt: str
+    external: Optional[str] = None
+    strategies: List[str] = field(default_factory=list)  # distortion strategies that added a line
+
+
 @dataclass
 class RecursiveMindEngine:
     """
@@ -31,14 +47,79 @@ class RecursiveMindEngine:
     interrupts: InterruptHandler = field(default_factory=InterruptHandler)
     synthesizer: SyntheticThinker = field(default_factory=SyntheticThinker)
     seed: Optional[int] = None
+    prompt_budget: Optional[int] = None
+    rng: Optional[random.Random] = field(default=None, repr=False, compare=False)
+    metrics: Optional[Metrics] = field(default=None, repr=False, compare=False)
+    stats: Optional[RunStatistics] = field(default=None, repr=False, compare=False)
+    detect_cycles: bool = False
+    memory_size: int = 12
+    recall_mode: str = "decay"
+    consolidate_every: Optional[int] = None  # enables tiered long-term memory
 
     def __post_init__(self) -> None:
-        if self.seed is not None:
-            random.seed(self.seed)
-        self.prompt_engine = PromptEngine(self.distortions)
+        # Each engine owns its generator so seeded runs stay isolated from other engines.
+        self.attach(self.state, self.rng if self.rng is not None else random.Random(self.seed))
+        self.distortions.metrics = self.metrics
+        self.prompt_engine = PromptEngine(self.distortions, max_tokens=self.prompt_budget)
+
+    def fork(self, seed: Optional[int] = None) -> "RecursiveMindEngine":
+        """
+        Branch the engine from its current position.
+
+        The new engine shares the distortion tables and, copy-on-write, the
+        memory history; mood, biases, interrupt cooldown, statistics and the
+        RNG are branched. With ``seed`` the branch draws from a fresh generator instead
+        of continuing this engine's random stream.
+        """
+        if seed is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        else:
+            rng = random.Random(seed)
+        return RecursiveMindEngine(
+            state=self.state.fork(rng),
+            distortions=copy.copy(self.distortions),
+            interrupts=self.interrupts.fork(),
+            synthesizer=copy.copy(self.synthesizer),
+            seed=self.seed if seed is None else seed,
+            prompt_budget=self.prompt_budget,
+            rng=rng,
+            metrics=self.metrics,
+            stats=None if self.stats is None else self.stats.branch(),
+            detect_cycles=self.detect_cycles,
+            memory_size=self.memory_size,
+            recall_mode=self.recall_mode,
+            consolidate_every=self.consolidate_every,
+        )
+
+    def attach(self, state: ThoughtState, rng: random.Random) -> None:
+        """
+        Swap in another mind's state and generator.
+
+        Distortion tables and the prompt engine stay as they are, which lets one
+        engine serve many sessions in turn.
+        """
+        self.rng = rng
+        self.distortions.rng = rng
+        self.interrupts.rng = rng
+        self.synthesizer.rng = rng
+        self.state = state
+        state.bind_rng(rng)
+
+    def _new_state(self) -> ThoughtState:
+        options = dict(
+            maxlen=self.memory_size,
+            cycles=CycleDetector() if self.detect_cycles else None,
+            recall_mode=self.recall_mode,
+        )
+        if self.consolidate_every:
+            memory = TieredMemory(consolidate_every=self.consolidate_every, **options)
+        else:
+            memory = ThoughtMemory(**options)
+        return ThoughtState(memory=memory, rng=self.rng)
 
     def reset(self) -> None:
-        self.state = ThoughtState()
+        self.state = self._new_state()
 
     def run(
         self,
@@ -51,41 +132,138 @@ class RecursiveMindEngine:
         """
         Execute the recursive loop for a fixed number of iterations.
         """
-        self.state = ThoughtState()  # fresh state per run
+        return list(
+            self.stream(
+                initial_thought,
+                steps=steps,
+                allow_interrupts=allow_interrupts,
+                starting_mood=starting_mood,
+                bias_overrides=bias_overrides,
+            )
+        )
+
+    def stream(
+        self,
+        initial_thought: str,
+        steps: Optional[int] = 8,
+        allow_interrupts: bool = True,
+        starting_mood: Optional[Mood] = None,
+        bias_overrides: Optional[dict[str, float]] = None,
+    ) -> Iterator[StepResult]:
+        """
+        Lazily execute the recursive loop, yielding each step as soon as it exists.
+
+        Passing ``steps=None`` keeps the loop running until the consumer stops.
+        """
+        self.begin(initial_thought, starting_mood=starting_mood, bias_overrides=bias_overrides)
+        return self.advance(steps, allow_interrupts)
+
+    def begin(
+        self,
+        initial_thought: str,
+        starting_mood: Optional[Mood] = None,
+        bias_overrides: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Reset to a fresh state seeded with ``initial_thought``."""
+        self.state = self._new_state()  # fresh state per run
+        if self.stats:
+            self.stats.start_run()
         if starting_mood:
             self.state.mood_state.mood = starting_mood
         if bias_overrides:
             self.state.biases.adjust(bias_overrides)
-        self.state.register(initial_thought)
-        current = initial_thought
-        results: list[StepResult] = []
-
-        for step_index in range(1, steps + 1):
-            self.state.drift_mood(current)
-            external = self.interrupts.maybe_interrupt(self.state.iteration) if allow_interrupts else None
-            prompt = self.prompt_engine.build_prompt(current, self.state, external=external)
-            mood = self.state.mood_state.mood
-            response = self.synthesizer.respond(prompt, mood)
-            self.state.register(response)
-            results.append(
-                StepResult(
-                    iteration=step_index,
-                    mood=mood,
-                    prompt=prompt,
-                    thought=response,
-                    external=external,
-                )
-            )
-            current = response
+        self.state.register(initial_thought, self.distortions.keywords.scan(initial_thought))
+
+    def prepare_step(self, allow_interrupts: bool = True) -> PendingStep:
+        """Drift mood, poll interrupts and build the next prompt from the latest thought."""
+        metrics = self.metrics
+        mark = metrics.clock() if metrics else 0
+        latest = self.state.memory.latest()
+        current = latest.text if latest else ""
+        step_index = self.state.iteration
+        # The keyword scan taken at registration feeds both mood drift and the distortions.
+        matches = latest.matches if latest and latest.matches is not None else self.distortions.keywords.scan(current)
+        self.state.drift_mood(current, matches)
+        if metrics:
+            mark = metrics.lap("drift_mood", mark)
+        if allow_interrupts:
+            external = self.interrupts.maybe_interrupt(self.state.iteration)
+        else:
+            external = self.interrupts.take_injected()
+        if metrics:
+            mark = metrics.lap("maybe_interrupt", mark)
+        prompt = self.prompt_engine.build_prompt(current, self.state, external=external, matches=matches)
+        if metrics:
+            metrics.lap("build_prompt", mark)
+            metrics.size("prompt", len(prompt.encode("utf-8")))
+        return PendingStep(
+            iteration=step_index,
+            mood=self.state.mood_state.mood,
+            prompt=prompt,
+            external=external,
+            strategies=self.distortions.fired,
+        )
+
+    def complete_step(self, pending: PendingStep, response: str) -> StepResult:
+        """Register the synthesised thought and close the step."""
+        metrics = self.metrics
+        mark = metrics.clock() if metrics else 0
+        self.state.register(response, self.distortions.keywords.scan(response))
+        if metrics:
+            metrics.lap("register", mark)
+            metrics.size("thought", len(response.encode("utf-8")))
+            memory = self.state.memory
+            metrics.gauge("memory_thoughts", len(memory))
+            metrics.gauge("memory_occupancy_ratio", len(memory) / memory.maxlen)
+            metrics.steps += 1
+        result = StepResult(
+            iteration=pending.iteration,
+            mood=pending.mood,
+            prompt=pending.prompt,
+            thought=response,
+            external=pending.external,
+        )
+        if self.stats:
+            self.stats.record(result, pending.strategies)
+        return result
+
+    def advance(self, steps: Optional[int] = 8, allow_interrupts: bool = True) -> Iterator[StepResult]:
+        """
+        Continue the loop from the current state without resetting it.
 
-        return results
+        Used after :meth:`begin`, or after restoring a checkpoint or a fork.
+        """
+        remaining = steps
+        while remaining is None or remaining > 0:
+            pending = self.prepare_step(allow_interrupts)
+            metrics = self.metrics
+            mark = metrics.clock() if metrics else 0
+            response = self.synthesizer.respond(pending.prompt, pending.mood)
+            if metrics:
+                metrics.lap("respond", mark)
+            yield self.complete_step(pending, response)
+            if remaining is not None:
+                remaining -= 1
 
-    def iterate_until(self, initial_thought: str, predicate, max_steps: int = 20) -> List[StepResult]:
+    def iterate_until(
+        self,
+        initial_thought: str,
+        predicate: Callable[[ThoughtState], bool] = stop_on_cycle,
+        max_steps: int = 20,
+    ) -> List[StepResult]:
         """
         Run until predicate(state) returns True or max_steps reached.
+
+        By default the run stops once the thoughts settle into a cycle; cycle
+        detection is switched on for the run if the engine does not already
+        track cycles. Steps are pulled from :meth:`stream`, so nothing past the
+        stopping point is computed.
         """
         all_steps: list[StepResult] = []
-        for result in self.run(initial_thought, steps=max_steps):
+        steps = self.stream(initial_thought, steps=max_steps)
+        if predicate is stop_on_cycle and self.state.memory.cycles is None:
+            self.state.memory.track_cycles()
+        for result in steps:
             all_steps.append(result)
             if predicate(self.state):
                 break
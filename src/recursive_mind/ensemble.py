@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .engine import RecursiveMindEngine
+from .mood import MOOD_CODES, MOODS, Mood
+
+
+@dataclass(frozen=True)
+class EnsembleConfig:
+    """Run settings shared by every member of an ensemble."""
+
+    steps: int = 8
+    allow_interrupts: bool = True
+    starting_mood: Optional[Mood] = None
+    bias_overrides: Optional[dict[str, float]] = None
+    include_prompts: bool = False
+    prompt_budget: Optional[int] = None
+
+
+class StringColumn:
+    """Packs strings into one UTF-8 blob addressed by an offsets array."""
+
+    def __init__(self) -> None:
+        self.offsets = array("q", [0])
+        self._parts: list[bytes] = []
+        self._blob: Optional[bytes] = b""
+
+    def append(self, text: str) -> None:
+        encoded = text.encode("utf-8")
+        self._parts.append(encoded)
+        self._blob = None
+        self.offsets.append(self.offsets[-1] + len(encoded))
+
+    def extend(self, other: "StringColumn") -> None:
+        base = self.offsets[-1]
+        self._parts.append(other.blob)
+        self._blob = None
+        self.offsets.extend(base + offset for offset in other.offsets[1:])
+
+    @property
+    def blob(self) -> bytes:
+        if self._blob is None:
+            self._blob = b"".join(self._parts)
+            self._parts = [self._blob]
+        return self._blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.blob[start:end].decode("utf-8")
+
+    def __getstate__(self) -> dict:
+        return {"offsets": self.offsets, "blob": self.blob}
+
+    def __setstate__(self, payload: dict) -> None:
+        self.offsets = payload["offsets"]
+        self._blob = payload["blob"]
+        self._parts = [self._blob]
+
+
+@dataclass
+class EnsembleColumns:
+    """
+    Columnar results for a batch of runs.
+
+    Step ``i`` of run ``r`` lives at flat index ``run_offsets[r] + i`` in every
+    per-step column. Moods are stored as codes into :data:`MOODS` and missing
+    interrupts are flagged in ``has_external``.
+    """
+
+    prompt_index: array = field(default_factory=lambda: array("l"))
+    seeds: array = field(default_factory=lambda: array("q"))
+    run_offsets: array = field(default_factory=lambda: array("q", [0]))
+    moods: array = field(default_factory=lambda: array("b"))
+    has_external: array = field(default_factory=lambda: array("b"))
+    thoughts: StringColumn = field(default_factory=StringColumn)
+    externals: StringColumn = field(default_factory=StringColumn)
+    prompts: Optional[StringColumn] = None
+
+    @property
+    def run_count(self) -> int:
+        return len(self.seeds)
+
+    @property
+    def step_count(self) -> int:
+        return len(self.moods)
+
+    def extend(self, other: "EnsembleColumns") -> None:
+        base = self.run_offsets[-1]
+        self.prompt_index.extend(other.prompt_index)
+        self.seeds.extend(other.seeds)
+        self.run_offsets.extend(base + offset for offset in other.run_offsets[1:])
+        self.moods.extend(other.moods)
+        self.has_external.extend(other.has_external)
+        self.thoughts.extend(other.thoughts)
+        self.externals.extend(other.externals)
+        if other.prompts is not None:
+            if self.prompts is None:
+                self.prompts = StringColumn()
+            self.prompts.extend(other.prompts)
+
+    def run_slice(self, run: int) -> range:
+        return range(self.run_offsets[run], self.run_offsets[run + 1])
+
+    def mood_trajectory(self, run: int) -> List[Mood]:
+        return [MOODS[code] for code in self.moods[self.run_offsets[run]:self.run_offsets[run + 1]]]
+
+    def thought(self, run: int, step: int) -> str:
+        return self.thoughts[self.run_offsets[run] + step]
+
+    def external(self, run: int, step: int) -> Optional[str]:
+        index = self.run_offsets[run] + step
+        return self.externals[index] if self.has_external[index] else None
+
+    def mood_occupancy(self) -> dict[Mood, float]:
+        counts = [0] * len(MOODS)
+        for code in self.moods:
+            counts[code] += 1
+        total = len(self.moods) or 1
+        return {mood: counts[code] / total for code, mood in enumerate(MOODS)}
+
+
+def _run_chunk(prompts: Sequence[str], jobs: Sequence[tuple[int, int]], config: EnsembleConfig) -> EnsembleColumns:
+    columns = EnsembleColumns(prompts=StringColumn() if config.include_prompts else None)
+    for prompt_index, seed in jobs:
+        engine = RecursiveMindEngine(seed=seed, prompt_budget=config.prompt_budget)
+        stream = engine.stream(
+            prompts[prompt_index],
+            steps=config.steps,
+            allow_interrupts=config.allow_interrupts,
+            starting_mood=config.starting_mood,
+            bias_overrides=config.bias_overrides,
+        )
+        for step in stream:
+            columns.moods.append(MOOD_CODES[step.mood])
+            columns.thoughts.append(step.thought)
+            columns.has_external.append(step.external is not None)
+            columns.externals.append(step.external or "")
+            if columns.prompts is not None:
+                columns.prompts.append(step.prompt)
+        columns.prompt_index.append(prompt_index)
+        columns.seeds.append(seed)
+        columns.run_offsets.append(len(columns.moods))
+    return columns
+
+
+def _chunked(jobs: Sequence[tuple[int, int]], chunk_size: int) -> Iterator[Sequence[tuple[int, int]]]:
+    for start in range(0, len(jobs), chunk_size):
+        yield jobs[start:start + chunk_size]
+
+
+def iter_ensemble(
+    prompts: Sequence[str],
+    seeds: Iterable[int],
+    config: EnsembleConfig = EnsembleConfig(),
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    window: Optional[int] = None,
+) -> Iterator[EnsembleColumns]:
+    """
+    Yield columnar result chunks for every (prompt, seed) pair, in submission order.
+
+    Each worker process handles ``chunk_size`` runs at a time and ships back one
+    :class:`EnsembleColumns`, so the transport cost is a handful of flat buffers
+    per chunk instead of a pickled object graph per step. At most ``window``
+    chunks (default: two per worker) are in flight or waiting to be yielded.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    prompts = list(prompts)
+    seeds = list(seeds)
+    jobs = [(prompt_index, seed) for prompt_index in range(len(prompts)) for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunked(jobs, chunk_size):
+            yield _run_chunk(prompts, chunk, config)
+        return
+    window = window or workers * 2
+    chunks = _chunked(jobs, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Dict[Future, int] = {}
+        done: Dict[int, EnsembleColumns] = {}
+        next_index = 0
+        submitted = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) + len(done) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(_run_chunk, prompts, chunk, config)] = submitted
+                submitted += 1
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[in_flight.pop(future)] = future.result()
+            while next_index in done:
+                yield done.pop(next_index)
+                next_index += 1
+
+
+def run_ensemble(
+    prompts: Sequence[str],
+    seeds: Iterable[int],
+    config: EnsembleConfig = EnsembleConfig(),
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+) -> EnsembleColumns:
+    """
+    Run every prompt once per seed across a process pool and merge the columns.
+    """
+    merged = EnsembleColumns(prompts=StringColumn() if config.include_prompts else None)
+    for chunk in iter_ensemble(prompts, seeds, config, workers=workers, chunk_size=chunk_size):
+        merged.extend(chunk)
+    return merged
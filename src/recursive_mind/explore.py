@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from .engine import RecursiveMindEngine, StepResult
+from .mood import Mood
+
+
+@dataclass
+class Branch:
+    """
+    One node of a what-if tree: run ``steps`` more iterations after the parent.
+
+    Overrides are applied when the branch starts: ``bias_overrides`` nudge the
+    bias profile, ``mood`` forces the current mood, ``external`` is injected as
+    the first step's interrupt and ``seed`` gives the branch its own random
+    stream (otherwise it continues the parent's).
+    """
+
+    steps: int
+    label: str = ""
+    bias_overrides: Optional[dict[str, float]] = None
+    mood: Optional[Mood] = None
+    external: Optional[str] = None
+    seed: Optional[int] = None
+    children: List["Branch"] = field(default_factory=list)
+
+
+@dataclass
+class ExplorationNode:
+    branch: Branch
+    path: tuple[str, ...]
+    steps: List[StepResult]
+    children: List["ExplorationNode"] = field(default_factory=list)
+
+    def walk(self) -> Iterator["ExplorationNode"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def leaves(self) -> Iterator["ExplorationNode"]:
+        return (node for node in self.walk() if not node.children)
+
+    def trajectory(self, node: "ExplorationNode") -> List[StepResult]:
+        """All steps from the root down to ``node`` (which must be in this tree)."""
+        path = self._path_to(node)
+        if path is None:
+            raise ValueError("node is not part of this tree")
+        return [step for part in path for step in part.steps]
+
+    def _path_to(self, target: "ExplorationNode") -> Optional[List["ExplorationNode"]]:
+        if self is target:
+            return [self]
+        for child in self.children:
+            path = child._path_to(target)
+            if path is not None:
+                return [self] + path
+        return None
+
+
+def explore(
+    engine: RecursiveMindEngine,
+    initial_thought: str,
+    root: Branch,
+    allow_interrupts: bool = True,
+) -> ExplorationNode:
+    """
+    Run a tree of branches, computing every shared prefix exactly once.
+
+    The root branch runs from ``initial_thought``; each child forks the engine
+    at the end of its parent and only simulates its own steps, so total work is
+    the sum of the nodes' steps rather than branches times depth. A root
+    ``seed`` reseeds ``engine`` before the run starts.
+    """
+    if root.seed is not None:
+        engine.attach(engine.state, random.Random(root.seed))
+    engine.begin(initial_thought, starting_mood=root.mood, bias_overrides=root.bias_overrides)
+    if root.external:
+        engine.interrupts.inject(root.external)
+    return _run_branch(engine, root, (root.label or "root",), allow_interrupts)
+
+
+def _run_branch(
+    engine: RecursiveMindEngine,
+    branch: Branch,
+    path: tuple[str, ...],
+    allow_interrupts: bool,
+) -> ExplorationNode:
+    node = ExplorationNode(branch=branch, path=path, steps=list(engine.advance(branch.steps, allow_interrupts)))
+    for index, child in enumerate(branch.children):
+        forked = engine.fork(seed=child.seed)
+        if child.bias_overrides:
+            forked.state.biases.adjust(child.bias_overrides)
+        if child.mood:
+            forked.state.mood_state.mood = child.mood
+        if child.external:
+            forked.interrupts.inject(child.external)
+        node.children.append(_run_branch(forked, child, path + (child.label or str(index),), allow_interrupts))
+    return node
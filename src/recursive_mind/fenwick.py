@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+
+class FenwickTree:
+    """Binary indexed tree over floats: point updates and prefix sums in O(log n)."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._tree = [0.0] * (size + 1)
+
+    @classmethod
+    def from_values(cls, values: Sequence[float]) -> "FenwickTree":
+        tree = cls(len(values))
+        data = tree._tree
+        for index, value in enumerate(values, start=1):
+            data[index] += value
+            parent = index + (index & -index)
+            if parent <= tree.size:
+                data[parent] += data[index]
+        return tree
+
+    def add(self, index: int, delta: float) -> None:
+        """Add ``delta`` to the 0-based position ``index``."""
+        position = index + 1
+        data = self._tree
+        while position <= self.size:
+            data[position] += delta
+            position += position & -position
+
+    def prefix(self, count: int) -> float:
+        """Sum of the first ``count`` positions."""
+        total = 0.0
+        data = self._tree
+        while count > 0:
+            total += data[count]
+            count -= count & -count
+        return total
+
+    @property
+    def total(self) -> float:
+        return self.prefix(self.size)
+
+    def dump(self) -> list[float]:
+        """Raw internal nodes, for exact snapshots."""
+        return list(self._tree)
+
+    @classmethod
+    def load(cls, nodes: Sequence[float]) -> "FenwickTree":
+        tree = cls(len(nodes) - 1)
+        tree._tree = list(nodes)
+        return tree
+
+
+def combined_prefix(trees: Iterable[tuple[FenwickTree, float]], count: int) -> float:
+    """Prefix sum of several equally sized trees, each multiplied by its scale."""
+    return sum(tree.prefix(count) * scale for tree, scale in trees)
+
+
+def search_combined(trees: Sequence[tuple[FenwickTree, float]], target: float) -> int:
+    """
+    Return the smallest 0-based index whose scaled, combined prefix sum reaches ``target``.
+
+    All trees must share one size; because they share a shape the descent can
+    walk them together, which lets a lazily scaled tree be mixed with a
+    constant-weight one without materialising either.
+    """
+    size = trees[0][0].size
+    step = 1 << (size.bit_length() - 1) if size else 0
+    position = 0
+    remaining = target
+    while step:
+        candidate = position + step
+        if candidate <= size:
+            value = sum(tree._tree[candidate] * scale for tree, scale in trees)
+            if value < remaining:
+                position = candidate
+                remaining -= value
+        step >>= 1
+    return position
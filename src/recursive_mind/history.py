@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from .distortions import MOOD_SUFFIXES
+from .engine import StepResult
+from .mood import MOOD_CODES, MOODS, Mood
+from .prompt_engine import FOLD_MARKER, SILENCE, THOUGHT_TEMPLATES
+
+# A piece is an interned string id (int >= 0), a literal (str), a slice of the
+# previous step's thought packed as ~(start << 32 | stop) (int < 0), or, in a
+# thought, None for the step's own first prompt line.
+Piece = Union[int, str, None]
+Pieces = Tuple[Piece, ...]
+
+FOLD = f" {FOLD_MARKER} "
+# Prompt lines that rarely repeat are kept as literals instead of being interned.
+_UNIQUE_PREFIXES = ("Memory echo:", "Tangential drift:", "Overload:")
+_THOUGHT_PARTS: Dict[Mood, Tuple[str, str]] = {
+    mood: tuple(template[len("{primary}"):].split("{direction}"))  # type: ignore[misc]
+    for mood, template in THOUGHT_TEMPLATES.items()
+}
+_STOP = (1 << 32) - 1
+
+
+def _slice(start: int, stop: int) -> int:
+    return ~(start << 32 | stop)
+
+
+def _slices(pieces: Pieces) -> bool:
+    return any(piece.__class__ is int and piece < 0 for piece in pieces)
+
+
+class StepHistory(Sequence[StepResult]):
+    """
+    Compact, append-only record of a run's steps.
+
+    Steps are stored as references instead of rendered text. A prompt's first
+    line becomes the previous thought (or the slices of it that survived
+    folding) plus a mood suffix. The thought becomes that line plus the
+    synthesiser template around its direction. The repeating distortion lines
+    (bias overlays, intrusive thoughts, interrupts, self-doubt templates) are
+    interned once. Anything that does not match these shapes is kept as a
+    literal, so every step renders back exactly.
+
+    Indexing renders a :class:`StepResult` on demand. Rendering a thought walks
+    back through its predecessors only as far as the nearest cached or
+    self-contained one. Every ``keyframe_every`` steps a thought is stored
+    whole to bound that walk, and the last ``cache_size`` rendered thoughts
+    are cached, so sequential access stays linear in the output size.
+    """
+
+    def __init__(self, steps: Iterable[StepResult] = (), cache_size: int = 64, keyframe_every: int = 256) -> None:
+        if keyframe_every < 1:
+            raise ValueError("keyframe_every must be at least 1")
+        self.cache_size = cache_size
+        self.keyframe_every = keyframe_every
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._iterations = array("q")
+        self._moods = bytearray()
+        self._externals: List[Optional[int]] = []
+        self._heads: List[Pieces] = []
+        self._lines: List[Tuple[Union[int, str], ...]] = []
+        self._line_sets: Dict[Tuple[Union[int, str], ...], Tuple[Union[int, str], ...]] = {}
+        self._thoughts: List[Pieces] = []
+        self._chained = bytearray()  # 1 where the thought slices its predecessor
+        self._previous: Optional[str] = None
+        self._cache: "OrderedDict[int, str]" = OrderedDict()
+        for text in (*MOOD_SUFFIXES.values(), *(part for parts in _THOUGHT_PARTS.values() for part in parts), FOLD, SILENCE):
+            self._intern(text)
+        self.extend(steps)
+
+    def __len__(self) -> int:
+        return len(self._thoughts)
+
+    @overload
+    def __getitem__(self, index: int) -> StepResult:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[StepResult]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        position = self._position(index)
+        external = self._externals[position]
+        return StepResult(
+            iteration=self._iterations[position],
+            mood=MOODS[self._moods[position]],
+            prompt=self.prompt(position),
+            thought=self.thought(position),
+            external=None if external is None else self._strings[external],
+        )
+
+    def __iter__(self) -> Iterator[StepResult]:
+        for position in range(len(self)):
+            yield self[position]
+
+    def _position(self, index: int) -> int:
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError("history index out of range")
+        return position
+
+    def _intern(self, text: str) -> int:
+        ident = self._ids.get(text)
+        if ident is None:
+            ident = self._ids[text] = len(self._strings)
+            self._strings.append(text)
+        return ident
+
+    def append(self, step: StepResult) -> None:
+        position = len(self)
+        previous = self._previous
+        lines = step.prompt.split("\n")
+        head = lines[0]
+        head_pieces = self._encode_head(head, previous, step.mood)
+
+        thought = step.thought
+        if position % self.keyframe_every == 0:
+            thought_pieces: Pieces = (self._ids.get(thought, thought),)
+        elif head and head == head.strip() and thought.startswith(head):
+            thought_pieces = (None,) + self._encode_rest(thought[len(head):], step.mood)
+        elif previous and thought.startswith(previous):
+            thought_pieces = (_slice(0, len(previous)), thought[len(previous):])
+        else:
+            thought_pieces = (self._ids.get(thought, thought),)
+
+        self._iterations.append(step.iteration)
+        self._moods.append(MOOD_CODES[step.mood])
+        self._externals.append(None if step.external is None else self._intern(step.external))
+        self._heads.append(head_pieces)
+        rest = tuple(line if line.startswith(_UNIQUE_PREFIXES) else self._intern(line) for line in lines[1:])
+        # Steps whose extra lines are all interned usually repeat an earlier combination; share it.
+        self._lines.append(self._line_sets.setdefault(rest, rest) if not any(line.__class__ is str for line in rest) else rest)
+        self._thoughts.append(thought_pieces)
+        self._chained.append(_slices(thought_pieces) or (thought_pieces[0] is None and _slices(head_pieces)))
+        self._previous = thought
+
+    def extend(self, steps: Iterable[StepResult]) -> None:
+        for step in steps:
+            self.append(step)
+
+    def _encode_head(self, head: str, previous: Optional[str], mood: Mood) -> Pieces:
+        suffix = MOOD_SUFFIXES[mood]
+        if suffix and head.endswith(suffix):
+            core, tail = head[: -len(suffix)], (self._ids[suffix],)
+        else:
+            core, tail = head, ()
+        if not previous:
+            return (head,)
+        if core == previous:
+            return (_slice(0, len(previous)),) + tail
+        # A folded prompt keeps the start of the previous thought, a marker, then its latest clauses.
+        left, marker, right = core.partition(FOLD)
+        if marker and right and previous.startswith(left):
+            start = previous.rfind(right)
+            if start >= 0:
+                return (_slice(0, len(left)), self._ids[FOLD], _slice(start, start + len(right))) + tail
+        return (head,)
+
+    def _encode_rest(self, rest: str, mood: Mood) -> Pieces:
+        opener, closer = _THOUGHT_PARTS[mood]
+        if len(rest) >= len(opener) + len(closer) and rest.startswith(opener) and rest.endswith(closer):
+            return (self._ids[opener], rest[len(opener):len(rest) - len(closer)], self._ids[closer])
+        return (rest,) if rest else ()
+
+    def _join(self, pieces: Pieces, previous: Optional[str], position: int = -1) -> str:
+        strings = self._strings
+        parts = []
+        for piece in pieces:
+            if piece is None:
+                parts.append(self._join(self._heads[position], previous))
+            elif piece.__class__ is not int:
+                parts.append(piece)
+            elif piece >= 0:
+                parts.append(strings[piece])
+            else:
+                packed = ~piece
+                parts.append(previous[packed >> 32:packed & _STOP])
+        return "".join(parts)
+
+    def thought(self, index: int) -> str:
+        position = self._position(index)
+        cache = self._cache
+        text = cache.get(position)
+        if text is not None:
+            cache.move_to_end(position)
+            return text
+        chain = []
+        cursor = position
+        while cursor not in cache:
+            chain.append(cursor)
+            if not self._chained[cursor]:
+                break
+            cursor -= 1
+        text = cache.get(cursor)
+        for cursor in reversed(chain):
+            text = self._join(self._thoughts[cursor], text, cursor)
+            cache[cursor] = text
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return text
+
+    def prompt(self, index: int) -> str:
+        position = self._position(index)
+        pieces = self._heads[position]
+        previous = self.thought(position - 1) if _slices(pieces) else None
+        strings = self._strings
+        lines = [strings[line] if line.__class__ is int else line for line in self._lines[position]]
+        return "\n".join([self._join(pieces, previous), *lines])
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import random
-from dataclasses import dataclass, field
-from typing import Iterable, Optional
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Deque, Iterable, List, Optional
+
+from .sources import EventFeed
 
 
 DEFAULT_EVENTS = (
@@ -19,19 +22,87 @@ DEFAULT_EVENTS = (
 class InterruptHandler:
     """
     Injects occasional external stimuli to simulate environmental noise.
+
+    Live ``feeds`` (see :mod:`recursive_mind.sources`) are drained without
+    blocking on every poll. Their events take precedence over the canned
+    ``events`` but still respect the cooldown; meanwhile they wait in each
+    feed's bounded buffer.
     """
 
     events: Iterable[str] = field(default_factory=lambda: DEFAULT_EVENTS)
     probability: float = 0.25
     cooldown: int = 2
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
     _cooldown_counter: int = field(default=0, init=False)
+    feeds: List[EventFeed] = field(default_factory=list, repr=False, compare=False)
+    _pending: Deque[str] = field(default_factory=deque, init=False, repr=False)
+    _pool: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _pool_signature: tuple[int, int] = field(default=(0, -1), init=False, repr=False, compare=False)
+    _next_feed: int = field(default=0, init=False, repr=False, compare=False)
+
+    def inject(self, event: str) -> None:
+        """Queue an event that fires on the next poll, bypassing probability and cooldown."""
+        self._pending.append(event)
+
+    def take_injected(self) -> Optional[str]:
+        if not self._pending:
+            return None
+        self._cooldown_counter = self.cooldown
+        return self._pending.popleft()
+
+    def fork(self) -> "InterruptHandler":
+        """
+        Independent copy that continues from the same cooldown and queued events.
+
+        Live feeds cannot be duplicated, so the copy shares them with this handler.
+        """
+        clone = replace(self)
+        clone._cooldown_counter = self._cooldown_counter
+        clone._pending = deque(self._pending)
+        return clone
+
+    @property
+    def pool(self) -> tuple[str, ...]:
+        """
+        Canned events as a tuple, built once rather than on every fire.
+
+        Rebuilt when ``events`` is replaced or changes length; re-assign
+        ``events`` after editing entries in place.
+        """
+        events = self.events
+        if not hasattr(events, "__len__"):  # a one-shot iterable: keep the materialised copy
+            self.events = events = tuple(events)
+        signature = (id(events), len(events))
+        if signature != self._pool_signature:
+            self._pool = tuple(events)
+            self._pool_signature = signature
+        return self._pool
+
+    def _live_event(self) -> Optional[str]:
+        feeds = self.feeds
+        for offset in range(len(feeds)):
+            index = (self._next_feed + offset) % len(feeds)
+            event = feeds[index].take()
+            if event is not None:
+                self._next_feed = index + 1
+                return event
+        return None
 
     def maybe_interrupt(self, iteration: int) -> Optional[str]:
+        if self._pending:
+            return self.take_injected()
+        for feed in self.feeds:
+            feed.poll()
         if self._cooldown_counter > 0:
             self._cooldown_counter -= 1
             return None
-        if random.random() < self.probability:
+        if self.feeds:
+            live = self._live_event()
+            if live is not None:
+                self._cooldown_counter = self.cooldown
+                return live
+        if self.rng.random() < self.probability:
             self._cooldown_counter = self.cooldown
-            return random.choice(tuple(self.events))
+            return self.rng.choice(self.pool)
         return None
 
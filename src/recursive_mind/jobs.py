@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+
+from .engine import RecursiveMindEngine
+from .mood import Mood
+
+
+@dataclass(frozen=True)
+class PromptJob:
+    """One prompt to run, with optional per-prompt overrides of the batch defaults."""
+
+    index: int
+    prompt: str
+    id: Optional[str] = None
+    seed: Optional[int] = None
+    steps: Optional[int] = None
+    mood: Optional[Mood] = None
+    bias_overrides: Optional[Dict[str, float]] = None
+    allow_interrupts: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class JobDefaults:
+    steps: int = 8
+    seed: Optional[int] = None  # with a base seed, job ``i`` without its own seed uses ``seed + i``
+    allow_interrupts: bool = True
+    mood: Optional[Mood] = None
+    bias_overrides: Optional[Dict[str, float]] = None
+    prompt_budget: Optional[int] = None
+    per_step: bool = True
+    include_prompts: bool = True
+
+
+def parse_job(index: int, line: str) -> Optional[PromptJob]:
+    """
+    Parse one input line: plain text is the prompt itself, a JSON object may carry
+    ``prompt`` plus ``id``, ``seed``, ``steps``, ``mood``, ``bias`` and ``interrupts``.
+    Blank lines yield ``None``.
+    """
+    text = line.strip()
+    if not text:
+        return None
+    if not text.startswith("{"):
+        return PromptJob(index=index, prompt=text)
+    try:
+        data = json.loads(text)
+        return PromptJob(
+            index=index,
+            prompt=str(data["prompt"]),
+            id=None if data.get("id") is None else str(data["id"]),
+            seed=data.get("seed"),
+            steps=data.get("steps"),
+            mood=Mood(data["mood"]) if data.get("mood") else None,
+            bias_overrides={str(k): float(v) for k, v in data["bias"].items()} if data.get("bias") else None,
+            allow_interrupts=data.get("interrupts"),
+        )
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Line {index + 1}: could not parse job: {exc}") from exc
+
+
+def read_jobs(lines: Iterable[str]) -> Iterator[PromptJob]:
+    """Lazily parse jobs, numbering them by their position among non-blank lines."""
+    index = 0
+    for line in lines:
+        job = parse_job(index, line)
+        if job is not None:
+            yield job
+            index += 1
+
+
+def run_job(job: PromptJob, defaults: JobDefaults) -> str:
+    """Run one job and return its JSONL records (serialised in the worker, so transport is one string)."""
+    seed = job.seed
+    if seed is None and defaults.seed is not None:
+        seed = defaults.seed + job.index
+    bias = dict(defaults.bias_overrides or {})
+    bias.update(job.bias_overrides or {})
+    engine = RecursiveMindEngine(seed=seed, prompt_budget=defaults.prompt_budget)
+    steps = engine.stream(
+        job.prompt,
+        steps=job.steps if job.steps is not None else defaults.steps,
+        allow_interrupts=defaults.allow_interrupts if job.allow_interrupts is None else job.allow_interrupts,
+        starting_mood=job.mood or defaults.mood,
+        bias_overrides=bias or None,
+    )
+    tag = {"index": job.index, "id": job.id, "seed": seed}
+    records = []
+    for step in steps:
+        record = {"iteration": step.iteration, "mood": step.mood.value, "external": step.external}
+        if defaults.include_prompts:
+            record["prompt"] = step.prompt
+        record["thought"] = step.thought
+        records.append(record)
+    if defaults.per_step:
+        return "".join(json.dumps({**tag, **record}, ensure_ascii=False) + "\n" for record in records)
+    return json.dumps({**tag, "prompt": job.prompt, "steps": records}, ensure_ascii=False) + "\n"
+
+
+def run_jobs(
+    jobs: Iterable[PromptJob],
+    defaults: JobDefaults = JobDefaults(),
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    window: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield each job's JSONL output as soon as it may be emitted.
+
+    Jobs are pulled lazily and at most ``window`` (default: four per worker)
+    are in flight, so an unbounded input stream runs in constant memory.
+    ``ordered`` holds finished jobs back until their predecessors are out;
+    otherwise output follows completion order and records rely on their
+    ``index`` tag.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for job in jobs:
+            yield run_job(job, defaults)
+        return
+    window = window or workers * 4
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Dict[Future, int] = {}
+        done: Dict[int, str] = {}
+        next_index = 0
+        submitted = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) + len(done) < window:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(run_job, job, defaults)] = submitted
+                submitted += 1
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                position = in_flight.pop(future)
+                if not ordered:
+                    yield future.result()
+                    continue
+                done[position] = future.result()
+            while next_index in done:
+                yield done.pop(next_index)
+                next_index += 1
+
+
+def write_jobs(output: Iterable[str], stream: TextIO) -> int:
+    """Write job output through the stream's buffer, flushing after each job. Returns jobs written."""
+    count = 0
+    for chunk in output:
+        stream.write(chunk)
+        stream.flush()
+        count += 1
+    return count
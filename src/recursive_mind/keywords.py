@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .mood import STIMULUS_KEYWORDS, Mood
+
+
+@dataclass(frozen=True)
+class KeywordMatches:
+    """Every keyword class found in one text, resolved with the original priority rules."""
+
+    keywords: frozenset[str]
+    mood_bias: Optional[Mood] = None
+    trigger: Optional[tuple[str, ...]] = None
+    associations: frozenset[str] = frozenset()
+
+
+NO_MATCHES = KeywordMatches(keywords=frozenset())
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation factored by common prefixes so each position tries one branch per first letter."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: the longest keyword at a position wins, its prefixes are added later.
+            return "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class KeywordIndex:
+    """
+    One compiled scanner for intrusive triggers, association keys and mood stimuli.
+
+    Matching keeps the substring semantics of the per-class ``in`` checks it
+    replaces: a lookahead over a prefix-factored alternation reports the longest
+    keyword starting at each position, and the shorter keywords that are its
+    prefixes are filled in from a precomputed table. Priorities (first mood
+    class, first trigger in dict order) are resolved through per-keyword ranks,
+    so the cost of a scan depends on the text and the hits, not on the number
+    of configured keywords.
+    """
+
+    def __init__(
+        self,
+        triggers: Iterable[tuple[str, ...]] = (),
+        associations: Iterable[str] = (),
+        stimuli: Iterable[tuple[Mood, tuple[str, ...]]] = STIMULUS_KEYWORDS,
+    ) -> None:
+        self.triggers: tuple[tuple[str, ...], ...] = tuple(triggers)
+        self.associations = frozenset(associations)
+        self.stimuli: tuple[Mood, ...] = ()
+
+        self._trigger_rank: dict[str, int] = {}
+        for rank, keywords in enumerate(self.triggers):
+            for keyword in keywords:
+                self._trigger_rank.setdefault(keyword, rank)
+        self._mood_rank: dict[str, int] = {}
+        for rank, (mood, keywords) in enumerate(stimuli):
+            self.stimuli += (mood,)
+            for keyword in keywords:
+                self._mood_rank.setdefault(keyword, rank)
+
+        vocabulary = set(self._trigger_rank) | set(self._mood_rank) | self.associations
+        # An empty keyword is contained in every text, exactly like ``"" in text``.
+        self._always = frozenset(keyword for keyword in vocabulary if not keyword)
+        words = sorted(keyword for keyword in vocabulary if keyword)
+        self._prefixes = {
+            word: tuple(other for other in words if other != word and word.startswith(other)) for word in words
+        }
+        self._pattern = re.compile("(?=(" + _trie_pattern(words) + "))") if words else None
+
+    def scan(self, text: str) -> KeywordMatches:
+        found = set(self._always)
+        if self._pattern is not None:
+            prefixes = self._prefixes
+            for match in self._pattern.finditer(text.lower()):
+                keyword = match.group(1)
+                found.add(keyword)
+                found.update(prefixes[keyword])
+        if not found:
+            return NO_MATCHES
+
+        mood_ranks = [self._mood_rank[keyword] for keyword in found if keyword in self._mood_rank]
+        trigger_ranks = [self._trigger_rank[keyword] for keyword in found if keyword in self._trigger_rank]
+        return KeywordMatches(
+            keywords=frozenset(found),
+            mood_bias=self.stimuli[min(mood_ranks)] if mood_ranks else None,
+            trigger=self.triggers[min(trigger_ranks)] if trigger_ranks else None,
+            associations=self.associations.intersection(found),
+        )
+
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+
+STAGES = ("drift_mood", "maybe_interrupt", "build_prompt", "respond", "register")
+
+
+class Summary:
+    """Running count, sum and maximum of one series."""
+
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.maximum = 0
+
+    def add(self, value: int) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+
+class Metrics:
+    """
+    Per-stage timings, distortion strategy hits, payload sizes and memory occupancy.
+
+    Instrumented code holds ``metrics`` as ``None`` when disabled and guards
+    every hook with ``if metrics:``, so an uninstrumented run pays one truth
+    test per stage. Timings are laps: :meth:`lap` records the time since the
+    previous mark and returns the new one, so consecutive stages cost a single
+    clock read each. With ``trace=True`` the most recent ``trace_limit``
+    spans are also kept for :meth:`chrome_trace`.
+    """
+
+    def __init__(self, trace: bool = False, trace_limit: int = 1_000_000) -> None:
+        self.clock = time.perf_counter_ns
+        self.stages: Dict[str, Summary] = {}
+        self.sizes: Dict[str, Summary] = {}
+        self.hits: Counter[str] = Counter()
+        self.gauges: Dict[str, float] = {}
+        self.steps = 0
+        self._trace: Optional[Deque[Tuple[str, int, int, int]]] = deque(maxlen=trace_limit) if trace else None
+
+    def lap(self, stage: str, started: int, hit: bool = False) -> int:
+        """Record ``stage`` as having run from ``started`` until now; return now."""
+        now = self.clock()
+        summary = self.stages.get(stage)
+        if summary is None:
+            summary = self.stages[stage] = Summary()
+        summary.add(now - started)
+        if hit:
+            self.hits[stage] += 1
+        if self._trace is not None:
+            self._trace.append((stage, started, now - started, threading.get_ident()))
+        return now
+
+    def size(self, name: str, value: int) -> None:
+        summary = self.sizes.get(name)
+        if summary is None:
+            summary = self.sizes[name] = Summary()
+        summary.add(value)
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.sizes.clear()
+        self.hits.clear()
+        self.gauges.clear()
+        self.steps = 0
+        if self._trace is not None:
+            self._trace.clear()
+
+    def to_prometheus(self, prefix: str = "recursive_mind") -> str:
+        """Render the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_steps_total Completed engine steps.",
+            f"# TYPE {prefix}_steps_total counter",
+            f"{prefix}_steps_total {self.steps}",
+            f"# HELP {prefix}_stage_seconds Time spent per engine stage or distortion strategy.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, summary in sorted(self.stages.items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {summary.total / 1e9:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {summary.count}')
+        lines += [
+            f"# HELP {prefix}_stage_max_seconds Slowest single run of each stage.",
+            f"# TYPE {prefix}_stage_max_seconds gauge",
+        ]
+        for stage, summary in sorted(self.stages.items()):
+            lines.append(f'{prefix}_stage_max_seconds{{stage="{stage}"}} {summary.maximum / 1e9:.9f}')
+        lines += [
+            f"# HELP {prefix}_strategy_hits_total Steps in which a distortion strategy added a segment.",
+            f"# TYPE {prefix}_strategy_hits_total counter",
+        ]
+        for stage, count in sorted(self.hits.items()):
+            lines.append(f'{prefix}_strategy_hits_total{{strategy="{stage}"}} {count}')
+        lines += [
+            f"# HELP {prefix}_payload_bytes UTF-8 size of prompts and thoughts.",
+            f"# TYPE {prefix}_payload_bytes summary",
+        ]
+        for name, summary in sorted(self.sizes.items()):
+            lines.append(f'{prefix}_payload_bytes_sum{{kind="{name}"}} {summary.total}')
+            lines.append(f'{prefix}_payload_bytes_count{{kind="{name}"}} {summary.count}')
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "recursive_mind") -> None:
+        """Write atomically, as the node-exporter textfile collector expects."""
+        _write_atomic(path, self.to_prometheus(prefix))
+
+    def chrome_trace(self) -> dict:
+        """Recorded spans as Chrome trace events (load in chrome://tracing or Perfetto)."""
+        if self._trace is None:
+            raise ValueError("Tracing was not enabled; construct Metrics(trace=True)")
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": stage,
+                    "cat": "distort" if stage.startswith("distort.") else "engine",
+                    "ph": "X",
+                    "ts": started / 1_000,
+                    "dur": duration / 1_000,
+                    "pid": pid,
+                    "tid": thread,
+                }
+                for stage, started, duration, thread in self._trace
+            ],
+            "displayTimeUnit": "ns",
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        _write_atomic(path, json.dumps(self.chrome_trace()))
+
+
+def _write_atomic(path: str, text: str) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(temporary, path)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import random
-from dataclasses import dataclass
+from bisect import bisect_left
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Iterable
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .keywords import KeywordMatches
 
 
 class Mood(Enum):
@@ -27,16 +32,137 @@ class Mood(Enum):
         return hints[self]
 
 
-def _weighted_choice(items: Iterable[tuple[Mood, float]]) -> Mood:
-    moods, weights = zip(*items)
-    total = sum(weights)
-    r = random.uniform(0, total)
-    upto = 0.0
-    for mood, weight in zip(moods, weights):
-        upto += weight
-        if r <= upto:
+# Stable integer codes for compact (columnar / binary) mood storage.
+MOODS: tuple[Mood, ...] = tuple(Mood)
+MOOD_CODES: dict[Mood, int] = {mood: code for code, mood in enumerate(MOODS)}
+
+
+# Base Markov drift between moods; each row lists (next mood, weight).
+DRIFT_TABLE: dict[Mood, tuple[tuple[Mood, float], ...]] = {
+    Mood.CALM: ((Mood.CALM, 0.4), (Mood.CURIOUS, 0.2), (Mood.MELANCHOLIC, 0.15), (Mood.INSPIRED, 0.25)),
+    Mood.CURIOUS: ((Mood.CURIOUS, 0.35), (Mood.INSPIRED, 0.25), (Mood.CALM, 0.2), (Mood.ANXIOUS, 0.2)),
+    Mood.ANXIOUS: ((Mood.ANXIOUS, 0.45), (Mood.IRRITATED, 0.2), (Mood.MELANCHOLIC, 0.2), (Mood.CALM, 0.15)),
+    Mood.MELANCHOLIC: ((Mood.MELANCHOLIC, 0.4), (Mood.CALM, 0.25), (Mood.ANXIOUS, 0.2), (Mood.CURIOUS, 0.15)),
+    Mood.IRRITATED: ((Mood.IRRITATED, 0.4), (Mood.ANXIOUS, 0.2), (Mood.MELANCHOLIC, 0.2), (Mood.CALM, 0.2)),
+    Mood.INSPIRED: ((Mood.INSPIRED, 0.45), (Mood.CURIOUS, 0.2), (Mood.CALM, 0.2), (Mood.IRRITATED, 0.15)),
+}
+
+# Stimulus keywords, checked in order; the first class with a hit biases the drift.
+STIMULUS_KEYWORDS: tuple[tuple[Mood, tuple[str, ...]], ...] = (
+    (Mood.ANXIOUS, ("deadline", "danger", "risk", "threat")),
+    (Mood.INSPIRED, ("sunrise", "hope", "success", "dream")),
+    (Mood.IRRITATED, ("bored", "stuck", "loop", "repeat")),
+    (Mood.MELANCHOLIC, ("loss", "regret", "alone", "memory")),
+)
+STIMULUS_BOOST = 0.25
+
+
+def stimulus_bias(stimulus: str | None) -> Mood | None:
+    """Return the mood a stimulus text pulls towards, if any."""
+    if not stimulus:
+        return None
+    lowered = stimulus.lower()
+    for mood, tokens in STIMULUS_KEYWORDS:
+        if any(token in lowered for token in tokens):
             return mood
-    return moods[-1]
+    return None
+
+
+class MoodTransitions:
+    """
+    Mood drift compiled once into cumulative weight rows.
+
+    Every (stimulus bias, current mood) pair gets its own precomputed row, so a
+    transition is one uniform draw plus a bisect. The same table also answers
+    exact questions about the chain (k-step and stationary distributions)
+    without any sampling.
+    """
+
+    biases: tuple[Mood | None, ...] = (None,) + tuple(mood for mood, _ in STIMULUS_KEYWORDS)
+
+    def __init__(
+        self,
+        table: dict[Mood, tuple[tuple[Mood, float], ...]] = DRIFT_TABLE,
+        boost: float = STIMULUS_BOOST,
+    ) -> None:
+        self._rows: dict[tuple[Mood | None, Mood], tuple[tuple[Mood, ...], list[float], list[float], float]] = {}
+        for bias in self.biases:
+            for mood, row in table.items():
+                moods = tuple(candidate for candidate, _ in row)
+                weights = [weight + boost if candidate == bias else weight for candidate, weight in row]
+                self._rows[(bias, mood)] = (moods, weights, list(accumulate(weights)), sum(weights))
+
+    def sample(self, mood: Mood, bias: Mood | None, rng: random.Random) -> Mood:
+        moods, _, cumulative, total = self._rows[(bias, mood)]
+        index = bisect_left(cumulative, rng.uniform(0, total))
+        return moods[min(index, len(moods) - 1)]
+
+    def matrix(self, bias: Mood | None = None) -> list[list[float]]:
+        """Row-stochastic transition matrix indexed by mood codes."""
+        matrix = [[0.0] * len(MOODS) for _ in MOODS]
+        for mood in MOODS:
+            moods, weights, _, total = self._rows[(bias, mood)]
+            for candidate, weight in zip(moods, weights):
+                matrix[MOOD_CODES[mood]][MOOD_CODES[candidate]] += weight / total
+        return matrix
+
+    def distribution(self, start: Mood, steps: int, bias: Mood | None = None) -> dict[Mood, float]:
+        """Exact mood distribution after ``steps`` transitions from ``start``."""
+        power = _matrix_power(self.matrix(bias), steps)
+        return dict(zip(MOODS, power[MOOD_CODES[start]]))
+
+    def stationary(self, bias: Mood | None = None) -> dict[Mood, float]:
+        """Long-run fraction of time spent in each mood."""
+        size = len(MOODS)
+        matrix = self.matrix(bias)
+        # Solve pi (P - I) = 0 with the last equation replaced by sum(pi) = 1.
+        system = [[matrix[col][row] - (1.0 if row == col else 0.0) for col in range(size)] + [0.0] for row in range(size)]
+        system[-1] = [1.0] * size + [1.0]
+        return dict(zip(MOODS, _solve(system)))
+
+
+def _matrix_power(matrix: list[list[float]], exponent: int) -> list[list[float]]:
+    size = len(matrix)
+    result = [[1.0 if row == col else 0.0 for col in range(size)] for row in range(size)]
+    while exponent > 0:
+        if exponent & 1:
+            result = _matmul(result, matrix)
+        matrix = _matmul(matrix, matrix)
+        exponent >>= 1
+    return result
+
+
+def _matmul(left: list[list[float]], right: list[list[float]]) -> list[list[float]]:
+    columns = list(zip(*right))
+    return [[sum(a * b for a, b in zip(row, column)) for column in columns] for row in left]
+
+
+def _solve(augmented: list[list[float]]) -> list[float]:
+    """Gauss-Jordan elimination with partial pivoting on an augmented matrix."""
+    size = len(augmented)
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(augmented[row][col]))
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+        lead = augmented[col][col]
+        augmented[col] = [value / lead for value in augmented[col]]
+        for row in range(size):
+            if row != col and augmented[row][col]:
+                factor = augmented[row][col]
+                augmented[row] = [value - factor * pivot_value for value, pivot_value in zip(augmented[row], augmented[col])]
+    return [augmented[row][-1] for row in range(size)]
+
+
+TRANSITIONS = MoodTransitions()
+
+
+def mood_distribution(steps: int, start: Mood = Mood.CALM, bias: Mood | None = None) -> dict[Mood, float]:
+    """Exact k-step mood distribution of the default drift chain."""
+    return TRANSITIONS.distribution(start, steps, bias)
+
+
+def stationary_distribution(bias: Mood | None = None) -> dict[Mood, float]:
+    """Exact long-run mood occupancy of the default drift chain."""
+    return TRANSITIONS.stationary(bias)
 
 
 @dataclass
@@ -44,42 +170,15 @@ class MoodState:
     """Tracks current mood and allows small random drifts."""
 
     mood: Mood = Mood.CALM
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
+    transitions: MoodTransitions = field(default=TRANSITIONS, repr=False, compare=False)
 
-    def mutate(self, stimulus: str | None = None) -> Mood:
+    def mutate(self, stimulus: str | None = None, matches: KeywordMatches | None = None) -> Mood:
         """
         Drift mood in response to stimulus text. Returns the new mood.
         Mood transitions are biased by keywords and a small random walk.
+        Pass ``matches`` when the stimulus has already been scanned.
         """
-        drift = {
-            Mood.CALM: [(Mood.CALM, 0.4), (Mood.CURIOUS, 0.2), (Mood.MELANCHOLIC, 0.15), (Mood.INSPIRED, 0.25)],
-            Mood.CURIOUS: [(Mood.CURIOUS, 0.35), (Mood.INSPIRED, 0.25), (Mood.CALM, 0.2), (Mood.ANXIOUS, 0.2)],
-            Mood.ANXIOUS: [(Mood.ANXIOUS, 0.45), (Mood.IRRITATED, 0.2), (Mood.MELANCHOLIC, 0.2), (Mood.CALM, 0.15)],
-            Mood.MELANCHOLIC: [(Mood.MELANCHOLIC, 0.4), (Mood.CALM, 0.25), (Mood.ANXIOUS, 0.2), (Mood.CURIOUS, 0.15)],
-            Mood.IRRITATED: [(Mood.IRRITATED, 0.4), (Mood.ANXIOUS, 0.2), (Mood.MELANCHOLIC, 0.2), (Mood.CALM, 0.2)],
-            Mood.INSPIRED: [(Mood.INSPIRED, 0.45), (Mood.CURIOUS, 0.2), (Mood.CALM, 0.2), (Mood.IRRITATED, 0.15)],
-        }
-
-        if stimulus:
-            lowered = stimulus.lower()
-            if any(token in lowered for token in ("deadline", "danger", "risk", "threat")):
-                bias = Mood.ANXIOUS
-            elif any(token in lowered for token in ("sunrise", "hope", "success", "dream")):
-                bias = Mood.INSPIRED
-            elif any(token in lowered for token in ("bored", "stuck", "loop", "repeat")):
-                bias = Mood.IRRITATED
-            elif any(token in lowered for token in ("loss", "regret", "alone", "memory")):
-                bias = Mood.MELANCHOLIC
-            else:
-                bias = None
-            if bias:
-                # Increase weight for the biased mood subtly
-                weighted = []
-                for candidate, weight in drift[self.mood]:
-                    if candidate == bias:
-                        weighted.append((candidate, weight + 0.25))
-                    else:
-                        weighted.append((candidate, weight))
-                drift[self.mood] = weighted
-
-        self.mood = _weighted_choice(drift[self.mood])
+        bias = matches.mood_bias if matches is not None else stimulus_bias(stimulus)
+        self.mood = self.transitions.sample(self.mood, bias, self.rng)
         return self.mood
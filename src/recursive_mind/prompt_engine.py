@@ -1,34 +1,92 @@
 from __future__ import annotations
 
 import random
+import re
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
 from .distortions import DistortionContext, DistortionEngine
+from .keywords import KeywordMatches
 from .mood import Mood
 from .state import ThoughtState
 
 
+FOLD_MARKER = "..."
+THOUGHT_TEMPLATES: dict[Mood, str] = {
+    Mood.CALM: "{primary}. Let me quietly trace that to {direction}.",
+    Mood.CURIOUS: "{primary}? Maybe the path forks toward {direction}.",
+    Mood.ANXIOUS: "{primary}. I keep scanning for what collapses next near {direction}.",
+    Mood.MELANCHOLIC: "{primary}. It tastes like memories of {direction}.",
+    Mood.IRRITATED: "{primary}. Why is {direction} still unresolved?",
+    Mood.INSPIRED: "{primary}! I can almost sculpt {direction} out of this momentum.",
+}
+SILENCE = "Silence feels safer than unfinished reasoning."
+_CLAUSE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+def compact_text(text: str, budget: int) -> str:
+    """
+    Fold ``text`` down to roughly ``budget`` whitespace tokens.
+
+    The opening clause (the original intent) is kept, capped at a third of the
+    budget, followed by a fold marker and as many of the most recent clauses as
+    still fit. Re-compacting a compacted text drops the old marker, so repeated
+    folding keeps the size bounded.
+    """
+    if budget < 1:
+        raise ValueError("budget must be at least 1 token")
+    tokens = text.split()
+    if len(tokens) <= budget:
+        return text
+    clauses = [clause for clause in _CLAUSE_BREAK.split(text.strip()) if clause and clause != FOLD_MARKER]
+    head = clauses[0].split()[: max(1, budget // 3)]
+    remaining = budget - len(head) - 1
+    tail: deque[str] = deque()
+    for clause in reversed(clauses[1:]):
+        words = clause.split()
+        if len(words) <= remaining:
+            tail.appendleft(" ".join(words))
+            remaining -= len(words)
+            continue
+        if not tail and remaining > 0:
+            tail.appendleft(" ".join(words[-remaining:]))
+        break
+    return " ".join([" ".join(head), FOLD_MARKER, *tail])
+
+
 @dataclass
 class PromptEngine:
     """
     Transforms the last thought into a new prompt using the distortion engine.
+
+    With ``max_tokens`` set, the carried-over thought is folded by
+    :func:`compact_text` first, so prompt size stays bounded over long runs.
     """
 
     distortion_engine: DistortionEngine
+    max_tokens: Optional[int] = None
 
     def build_prompt(
         self,
         last_output: str,
         state: ThoughtState,
         external: Optional[str] = None,
+        matches: Optional[KeywordMatches] = None,
     ) -> str:
         if not last_output.strip():
             last_output = "..."
+            matches = None
+        elif self.max_tokens is not None:
+            compacted = compact_text(last_output, self.max_tokens)
+            if compacted != last_output:
+                # Matches came from the whole thought; rescan what survived folding.
+                last_output, matches = compacted, None
         context = DistortionContext(
             last_thought=state.memory.latest(),
             state=state,
             external=external,
+            matches=matches,
         )
         distorted = self.distortion_engine.distort(last_output, context)
         return distorted
@@ -39,25 +97,18 @@ class SyntheticThinker:
     A very small thought synthesizer that rewrites prompts into new internal thoughts.
     """
 
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng or random.Random()
+
     def respond(self, prompt: str, mood: Mood) -> str:
         lines = [line.strip() for line in prompt.splitlines() if line.strip()]
         if not lines:
-            return "Silence feels safer than unfinished reasoning."
+            return SILENCE
 
         primary = lines[0]
         supporting = " ".join(lines[1:3])
-
-        templates = {
-            Mood.CALM: "{primary}. Let me quietly trace that to {direction}.",
-            Mood.CURIOUS: "{primary}? Maybe the path forks toward {direction}.",
-            Mood.ANXIOUS: "{primary}. I keep scanning for what collapses next near {direction}.",
-            Mood.MELANCHOLIC: "{primary}. It tastes like memories of {direction}.",
-            Mood.IRRITATED: "{primary}. Why is {direction} still unresolved?",
-            Mood.INSPIRED: "{primary}! I can almost sculpt {direction} out of this momentum.",
-        }
         direction = self._sample_direction(supporting or primary)
-        template = templates[mood]
-        return template.format(primary=primary, direction=direction)
+        return THOUGHT_TEMPLATES[mood].format(primary=primary, direction=direction)
 
     def _sample_direction(self, text: str) -> str:
         tokens = [token.strip(",.?!") for token in text.split() if len(token) > 3]
@@ -65,4 +116,4 @@ class SyntheticThinker:
             return "the unspoken edge"
         if len(tokens) == 1:
             return tokens[0]
-        return " / ".join(random.sample(tokens, k=min(2, len(tokens))))
+        return " / ".join(self.rng.sample(tokens, k=min(2, len(tokens))))
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from .engine import StepResult
+from .mood import MOOD_CODES, MOODS, Mood
+
+try:  # NumPy is optional; it turns queries into vectorised scans of the mapped index.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+MAGIC = b"RMLOG\x00\x01\x00"
+_FILE_HEADER = struct.Struct("<8sII")  # magic, record size, reserved
+# run id, iteration, mood code, flags, prompt/thought/external heap offsets, their lengths.
+RECORD = struct.Struct("<QqBB6xQQQIII4x")
+FLAG_EXTERNAL = 1
+
+PathLike = Union[str, os.PathLike]
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    run_id: int
+    iteration: int
+    mood: Mood
+    has_external: bool
+    prompt_span: tuple[int, int]
+    thought_span: tuple[int, int]
+    external_span: tuple[int, int]
+
+
+def _paths(path: PathLike) -> tuple[Path, Path]:
+    base = Path(path)
+    return base.with_name(base.name + ".idx"), base.with_name(base.name + ".heap")
+
+
+class RunLogWriter:
+    """
+    Appends steps to a log segment: a fixed-width record index plus a string heap.
+
+    Index records are held back and written in batches of ``batch`` (and on
+    :meth:`flush`), each only after the heap has been flushed, so a record
+    never reaches the file before the bytes it points to. ``sync=True`` also
+    fsyncs the heap before each batch and the index after it, which extends
+    that ordering to power loss. A crash can still leave unreferenced heap
+    bytes, a torn trailing record or, without ``sync``, records past the end
+    of the heap. Opening a segment drops those records, so readers only ever
+    see whole records with intact text.
+    """
+
+    def __init__(self, path: PathLike, batch: int = 256, sync: bool = False) -> None:
+        index_path, heap_path = _paths(path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.touch()
+        self._index = open(index_path, "r+b")
+        self._heap = open(heap_path, "ab")
+        size = self._index.seek(0, os.SEEK_END)
+        if size < _FILE_HEADER.size:
+            self._index.seek(0)
+            self._index.truncate()
+            self._index.write(_FILE_HEADER.pack(MAGIC, RECORD.size, 0))
+            size = _FILE_HEADER.size
+        records = (size - _FILE_HEADER.size) // RECORD.size
+        self._index.truncate(_FILE_HEADER.size + records * RECORD.size)
+        self._heap_end = self._heap.tell()
+        self._last_run_id: Optional[int] = None
+        # Spans only grow, so records pointing past the heap can only trail the index.
+        while records:
+            self._index.seek(_FILE_HEADER.size + (records - 1) * RECORD.size)
+            fields = RECORD.unpack(self._index.read(RECORD.size))
+            if max(offset + length for offset, length in zip(fields[4:7], fields[7:10])) <= self._heap_end:
+                self._last_run_id = fields[0]
+                break
+            records -= 1
+        self._index.truncate(_FILE_HEADER.size + records * RECORD.size)
+        self._index.seek(0, os.SEEK_END)
+        self.batch = batch
+        self.sync = sync
+        self._records = bytearray()
+        self._buffered = 0
+
+    def next_run_id(self) -> int:
+        return 0 if self._last_run_id is None else self._last_run_id + 1
+
+    def append(self, run_id: int, step: StepResult) -> None:
+        spans = [self._put(step.prompt), self._put(step.thought), self._put(step.external or "")]
+        self._records += (
+            RECORD.pack(
+                run_id,
+                step.iteration,
+                MOOD_CODES[step.mood],
+                FLAG_EXTERNAL if step.external is not None else 0,
+                spans[0][0],
+                spans[1][0],
+                spans[2][0],
+                spans[0][1],
+                spans[1][1],
+                spans[2][1],
+            )
+        )
+        self._buffered += 1
+        self._last_run_id = run_id
+        if self._buffered >= self.batch:
+            self.flush()
+
+    def extend(self, run_id: int, steps: Iterable[StepResult]) -> Iterator[StepResult]:
+        """Log steps as they pass through, so a stream can be consumed and persisted at once."""
+        for step in steps:
+            self.append(run_id, step)
+            yield step
+
+    def _put(self, text: str) -> tuple[int, int]:
+        data = text.encode("utf-8")
+        offset = self._heap_end
+        self._heap.write(data)
+        self._heap_end += len(data)
+        return offset, len(data)
+
+    def flush(self) -> None:
+        """Make every appended step visible: heap bytes first, then the records pointing at them."""
+        self._heap.flush()
+        if self.sync:
+            os.fsync(self._heap.fileno())
+        if self._records:
+            self._index.write(self._records)
+            self._records.clear()
+            self._buffered = 0
+        self._index.flush()
+        if self.sync:
+            os.fsync(self._index.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        self._heap.close()
+        self._index.close()
+
+    def __enter__(self) -> "RunLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class RunLogReader:
+    """
+    Memory-mapped, zero-copy access to a run log.
+
+    Records are decoded one at a time on demand and strings are only decoded
+    when asked for. :meth:`query` filters on the mapped index directly: with
+    NumPy through a structured view, otherwise through strided memoryviews over
+    the id, iteration and mood columns.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self._paths = _paths(path)
+        self._index: Optional[mmap.mmap] = None
+        self._heap: Optional[mmap.mmap] = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Remap the files to pick up records appended since opening."""
+        self.close()
+        index_path, heap_path = self._paths
+        self._index = _map(index_path)
+        self._heap = _map(heap_path)
+        if self._index is not None:
+            magic, record_size, _ = _FILE_HEADER.unpack_from(self._index)
+            if magic != MAGIC or record_size != RECORD.size:
+                raise ValueError(f"{index_path} is not a recursive_mind run log")
+        self._count = 0 if self._index is None else (len(self._index) - _FILE_HEADER.size) // RECORD.size
+
+    def close(self) -> None:
+        for mapped in (self._index, self._heap):
+            if mapped is not None:
+                mapped.close()
+        self._index = self._heap = None
+
+    def __enter__(self) -> "RunLogReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, index: int) -> LogRecord:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        (run_id, iteration, mood, flags, prompt_off, thought_off, external_off, prompt_len, thought_len,
+         external_len) = RECORD.unpack_from(self._index, _FILE_HEADER.size + index * RECORD.size)
+        return LogRecord(
+            run_id=run_id,
+            iteration=iteration,
+            mood=MOODS[mood],
+            has_external=bool(flags & FLAG_EXTERNAL),
+            prompt_span=(prompt_off, prompt_len),
+            thought_span=(thought_off, thought_len),
+            external_span=(external_off, external_len),
+        )
+
+    def _text(self, span: tuple[int, int]) -> str:
+        offset, length = span
+        if not length:
+            return ""
+        if self._heap is None or offset + length > len(self._heap):
+            raise ValueError(f"Record span {offset}+{length} runs past the end of the heap; the log is damaged")
+        return self._heap[offset:offset + length].decode("utf-8")
+
+    def thought(self, index: int) -> str:
+        return self._text(self.record(index).thought_span)
+
+    def prompt(self, index: int) -> str:
+        return self._text(self.record(index).prompt_span)
+
+    def step(self, index: int) -> StepResult:
+        record = self.record(index)
+        return StepResult(
+            iteration=record.iteration,
+            mood=record.mood,
+            prompt=self._text(record.prompt_span),
+            thought=self._text(record.thought_span),
+            external=self._text(record.external_span) if record.has_external else None,
+        )
+
+    def columns(self):
+        """Structured NumPy view of the whole index (no copy). Requires NumPy."""
+        if np is None:
+            raise ImportError("RunLogReader.columns requires NumPy (pip install numpy).")
+        dtype = np.dtype(
+            [
+                ("run_id", "<u8"), ("iteration", "<i8"), ("mood", "u1"), ("flags", "u1"), ("_pad", "V6"),
+                ("prompt_offset", "<u8"), ("thought_offset", "<u8"), ("external_offset", "<u8"),
+                ("prompt_length", "<u4"), ("thought_length", "<u4"), ("external_length", "<u4"), ("_pad2", "V4"),
+            ]
+        )
+        if self._index is None:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(self._index, dtype=dtype, count=self._count, offset=_FILE_HEADER.size)
+
+    def query(
+        self,
+        run_id: Optional[int] = None,
+        mood: Union[Mood, Sequence[Mood], None] = None,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Union["np.ndarray", Iterator[int]]:
+        """
+        Record indices matching a run, mood(s) and iteration range ``[start, stop)``.
+
+        With NumPy this is an index array; without it, a lazy iterator that
+        walks the mapped columns (consume it before closing the reader).
+        Neither materialises one Python int per match up front.
+        """
+        moods = None if mood is None else {MOOD_CODES[m] for m in ([mood] if isinstance(mood, Mood) else mood)}
+        if np is not None:
+            return self._query_numpy(run_id, moods, start, stop)
+        return self._scan(run_id, moods, start, stop)
+
+    def _scan(self, run_id, moods, start, stop) -> Iterator[int]:
+        if not self._count:
+            return
+        body = memoryview(self._index)[_FILE_HEADER.size:_FILE_HEADER.size + self._count * RECORD.size]
+        words = RECORD.size // 8
+        run_ids = body.cast("Q")[0::words]
+        iterations = body.cast("q")[1::words]
+        mood_codes = body.cast("B")[16::RECORD.size]
+        try:
+            for index in range(self._count):
+                if run_id is not None and run_ids[index] != run_id:
+                    continue
+                if moods is not None and mood_codes[index] not in moods:
+                    continue
+                iteration = iterations[index]
+                if (start is not None and iteration < start) or (stop is not None and iteration >= stop):
+                    continue
+                yield index
+        finally:
+            for view in (run_ids, iterations, mood_codes, body):
+                view.release()
+
+    def _query_numpy(self, run_id, moods, start, stop) -> "np.ndarray":
+        table = self.columns()
+        mask = np.ones(len(table), dtype=bool)
+        if run_id is not None:
+            mask &= table["run_id"] == run_id
+        if moods is not None:
+            mask &= np.isin(table["mood"], list(moods))
+        if start is not None:
+            mask &= table["iteration"] >= start
+        if stop is not None:
+            mask &= table["iteration"] < stop
+        return np.flatnonzero(mask)
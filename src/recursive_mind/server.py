@@ -0,0 +1,486 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import random
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from . import checkpoint
+from .engine import RecursiveMindEngine, StepResult
+from .mood import Mood
+from .state import ThoughtState
+
+_SESSION_FILE = ".rmck"
+_SESSION_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@dataclass
+class Session:
+    """Everything that makes one mind distinct; the engine that steps it is shared."""
+
+    id: str
+    state: ThoughtState
+    rng: random.Random
+    allow_interrupts: bool = True
+    cooldown: int = 0
+    pending: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Operation:
+    """A queued request against the store. ``kind`` is create, advance, inject, describe, delete or stats."""
+
+    kind: str
+    session_id: Optional[str] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class SessionStore:
+    """
+    Many persistent minds stepped by one reusable engine.
+
+    A session holds only its state, generator and interrupt queue. To step
+    one, the store attaches it to the engine, so distortion tables, keyword
+    scanners and the prompt engine are built once and shared. A seeded
+    session reproduces ``RecursiveMindEngine(seed=...).stream(...)``
+    exactly.
+
+    At most ``max_live`` sessions stay in memory. When one more is needed,
+    the least recently used session is written as a checkpoint into
+    ``spill_dir`` and reloaded on its next use. Sessions already in
+    ``spill_dir`` are picked up at startup, and :meth:`close` writes out the
+    live ones, so with a given ``spill_dir`` every session survives a
+    restart. Without one the store uses a temporary directory and removes it
+    on :meth:`close`.
+
+    Because every session runs on the same engine, that engine must not
+    carry ``stats`` or ``metrics``: they would mix every session's steps.
+    Per-session figures can be built by clients from the returned steps.
+
+    The store is not thread-safe. :class:`MindServer` drives it from a
+    single worker thread.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], RecursiveMindEngine] = RecursiveMindEngine,
+        max_live: int = 1024,
+        spill_dir: Optional[Union[str, os.PathLike]] = None,
+        max_steps: int = 1000,
+    ) -> None:
+        if max_live < 1:
+            raise ValueError("max_live must be at least 1")
+        self.engine = engine_factory()
+        if self.engine.stats is not None or self.engine.metrics is not None:
+            raise ValueError("The shared session engine must not carry stats or metrics; they would mix sessions")
+        self.max_live = max_live
+        self.max_steps = max_steps
+        self._owns_spill_dir = spill_dir is None
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else Path(tempfile.mkdtemp(prefix="recursive-mind-"))
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._live: "OrderedDict[str, Session]" = OrderedDict()
+        self._spilled = {path.name[: -len(_SESSION_FILE)] for path in self.spill_dir.glob(f"*{_SESSION_FILE}")}
+        self._active: Optional[Session] = None
+        self.counters = {"batches": 0, "operations": 0, "steps": 0, "spills": 0, "loads": 0}
+
+    def __len__(self) -> int:
+        return len(self._live) + len(self._spilled)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._live or session_id in self._spilled
+
+    def create(
+        self,
+        prompt: str,
+        seed: Optional[int] = None,
+        mood: Optional[Mood] = None,
+        bias_overrides: Optional[Dict[str, float]] = None,
+        allow_interrupts: bool = True,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        if not prompt.strip():
+            raise ValueError("prompt must not be empty")
+        session_id = session_id or secrets.token_hex(8)
+        if not _SESSION_ID.fullmatch(session_id):
+            raise ValueError("session ids may only use letters, digits, '-' and '_' (at most 64)")
+        if session_id in self:
+            raise ValueError(f"Session {session_id!r} already exists")
+        engine = self._detach()
+        engine.attach(engine._new_state(), random.Random(seed))
+        engine.interrupts._cooldown_counter = 0
+        engine.interrupts._pending.clear()
+        engine.begin(prompt, starting_mood=mood, bias_overrides=bias_overrides)
+        session = Session(session_id, engine.state, engine.rng, allow_interrupts)
+        self._active = session
+        self._live[session_id] = session
+        self._evict()
+        return session
+
+    def advance(self, session_id: str, steps: int) -> List[StepResult]:
+        if not 0 < steps <= self.max_steps:
+            raise ValueError(f"steps must lie in 1..{self.max_steps}")
+        session = self._activate(session_id)
+        results = list(self.engine.advance(steps, allow_interrupts=session.allow_interrupts))
+        self.counters["steps"] += len(results)
+        return results
+
+    def inject(self, session_id: str, event: str) -> int:
+        if not event.strip():
+            raise ValueError("event must not be empty")
+        self._activate(session_id)
+        self.engine.interrupts.inject(event.strip())
+        return len(self.engine.interrupts._pending)
+
+    def describe(self, session_id: str) -> Dict[str, Any]:
+        session = self._activate(session_id)
+        state = session.state
+        latest = state.memory.latest()
+        return {
+            "id": session.id,
+            "steps": checkpoint.completed_steps(self.engine),
+            "mood": state.mood_state.mood.value,
+            "biases": dict(state.biases.traits),
+            "thought": latest.text if latest else None,
+            "pending_events": len(self.engine.interrupts._pending),
+            "allow_interrupts": session.allow_interrupts,
+        }
+
+    def delete(self, session_id: str) -> None:
+        if session_id not in self:
+            raise KeyError(session_id)
+        if self._active is not None and self._active.id == session_id:
+            self._active = None
+        self._live.pop(session_id, None)
+        if session_id in self._spilled:
+            self._spilled.discard(session_id)
+            self._path(session_id).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"live": len(self._live), "spilled": len(self._spilled), **self.counters}
+
+    def close(self) -> None:
+        """Spill every live session, or drop them all with the temporary spill directory."""
+        if self._owns_spill_dir:
+            self._active = None
+            self._live.clear()
+            self._spilled.clear()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            return
+        while self._live:
+            self._spill(next(iter(self._live)))
+
+    def execute(
+        self, operations: List[Operation], claim: Optional[Callable[[int], bool]] = None
+    ) -> List[Union[Any, Exception]]:
+        """
+        Run a batch in order, returning one result (or the exception raised) per operation.
+
+        Operations keep their submission order, so a create, delete and
+        create of the same id behave as they would one by one. A run of
+        consecutive operations on one session attaches it, and if spilled
+        reloads it, only once. ``claim(index)`` is asked just before each
+        operation runs; when it returns False the operation is skipped and its
+        result left as ``None``.
+        """
+        self.counters["batches"] += 1
+        self.counters["operations"] += len(operations)
+        results: List[Union[Any, Exception]] = [None] * len(operations)
+        for index, operation in enumerate(operations):
+            if claim is not None and not claim(index):
+                continue
+            try:
+                results[index] = self._run(operation)
+            except Exception as exc:  # one bad request must not fail the batch
+                results[index] = exc
+        return results
+
+    def _run(self, operation: Operation) -> Any:
+        args = operation.args
+        if operation.kind == "create":
+            if not isinstance(args.get("prompt"), str):
+                raise ValueError("prompt (a string) is required")
+            bias = args.get("bias")
+            if bias is not None and not isinstance(bias, dict):
+                raise ValueError("bias must be an object mapping traits to weights")
+            session = self.create(
+                args["prompt"],
+                seed=args.get("seed"),
+                mood=Mood(args["mood"]) if args.get("mood") else None,
+                bias_overrides={str(k): float(v) for k, v in bias.items()} if bias else None,
+                allow_interrupts=bool(args.get("interrupts", True)),
+                session_id=args.get("id"),
+            )
+            return self.describe(session.id)
+        if operation.kind == "stats":
+            return self.stats()
+        session_id = operation.session_id
+        if operation.kind == "advance":
+            steps = self.advance(session_id, int(args.get("steps", 1)))
+            return {"steps": [step_record(step) for step in steps], "state": self.describe(session_id)}
+        if operation.kind == "inject":
+            if not isinstance(args.get("event"), str):
+                raise ValueError("event (a string) is required")
+            return {"pending_events": self.inject(session_id, args["event"])}
+        if operation.kind == "describe":
+            return self.describe(session_id)
+        if operation.kind == "delete":
+            self.delete(session_id)
+            return {"deleted": session_id}
+        raise ValueError(f"Unknown operation {operation.kind!r}")
+
+    def _path(self, session_id: str) -> Path:
+        return self.spill_dir / f"{session_id}{_SESSION_FILE}"
+
+    def _detach(self) -> RecursiveMindEngine:
+        """Park the attached session's interrupt queue back on it and hand over the engine."""
+        session = self._active
+        if session is not None:
+            session.cooldown = self.engine.interrupts._cooldown_counter
+            session.pending = list(self.engine.interrupts._pending)
+            self._active = None
+        return self.engine
+
+    def _activate(self, session_id: str) -> Session:
+        session = self._live.get(session_id)
+        if session is None:
+            if session_id not in self._spilled:
+                raise KeyError(session_id)
+            session = self._load(session_id)
+        else:
+            self._live.move_to_end(session_id)
+        if self._active is not session:
+            engine = self._detach()
+            engine.attach(session.state, session.rng)
+            engine.interrupts._cooldown_counter = session.cooldown
+            engine.interrupts._pending.clear()
+            engine.interrupts._pending.extend(session.pending)
+            self._active = session
+        return session
+
+    def _load(self, session_id: str) -> Session:
+        engine = self._detach()
+        engine.attach(engine._new_state(), random.Random())
+        path = self._path(session_id)
+        info = checkpoint.load_checkpoint(engine, path)
+        session = Session(session_id, engine.state, engine.rng, info.allow_interrupts)
+        self._active = session
+        self._live[session_id] = session
+        self._spilled.discard(session_id)
+        path.unlink()
+        self.counters["loads"] += 1
+        self._evict()
+        return session
+
+    def _evict(self) -> None:
+        while len(self._live) > self.max_live:
+            self._spill(next(iter(self._live)))
+
+    def _spill(self, session_id: str) -> None:
+        session = self._activate(session_id)
+        checkpoint.save_checkpoint(self.engine, self._path(session_id), session.allow_interrupts)
+        self._active = None
+        del self._live[session_id]
+        self._spilled.add(session_id)
+        self.counters["spills"] += 1
+
+
+def step_record(step: StepResult) -> Dict[str, Any]:
+    return {
+        "iteration": step.iteration,
+        "mood": step.mood.value,
+        "external": step.external,
+        "prompt": step.prompt,
+        "thought": step.thought,
+    }
+
+
+class MindServer:
+    """
+    Local HTTP/JSON front end for a :class:`SessionStore`.
+
+    Request threads only enqueue operations. One worker drains the queue in
+    batches of up to ``batch_size`` and runs each batch through
+    :meth:`SessionStore.execute`, so requests from many clients share one
+    engine without locking it. Routes:
+
+    - ``POST /sessions`` with ``{"prompt", "seed"?, "mood"?, "bias"?, "interrupts"?, "id"?}``
+    - ``GET /sessions/<id>``
+    - ``POST /sessions/<id>/advance`` with ``{"steps": n}``
+    - ``POST /sessions/<id>/events`` with ``{"event": text}``
+    - ``DELETE /sessions/<id>``
+    - ``GET /stats``
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        batch_size: int = 256,
+        timeout: float = 60.0,
+    ) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue: "queue.Queue[Optional[Tuple[Operation, Future]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._serving = False
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self.httpd.server_address[:2]
+        return str(host), int(port)
+
+    def submit(self, operation: Operation) -> Future:
+        future: Future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def start(self) -> "MindServer":
+        """Serve from background threads; returns immediately."""
+        self._start_worker()
+        self._serving = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._start_worker()
+        self._serving = True
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop serving, finish queued requests, then close the store."""
+        if self._serving:  # shutdown() would wait forever for a loop that never ran
+            self.httpd.shutdown()
+            self._serving = False
+        self.httpd.server_close()
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        self.store.close()
+
+    def _start_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # finish this batch, then stop
+                    break
+                batch.append(item)
+            # A request whose client already timed out was cancelled; claiming skips it.
+            results = self.store.execute(
+                [operation for operation, _ in batch], claim=lambda index: batch[index][1].set_running_or_notify_cancel()
+            )
+            for (_, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _handler(server: MindServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            parts = self.path.strip("/").split("/")
+            if parts == ["stats"]:
+                self._call(Operation("stats"))
+            elif len(parts) == 2 and parts[0] == "sessions":
+                self._call(Operation("describe", parts[1]))
+            else:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            parts = self.path.strip("/").split("/")
+            try:
+                body = self._body()
+            except ValueError as exc:
+                self._reply(HTTPStatus.BAD_REQUEST, {"error": f"invalid JSON body: {exc}"})
+                return
+            if parts == ["sessions"]:
+                self._call(Operation("create", args=body), HTTPStatus.CREATED)
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] in ("advance", "events"):
+                self._call(Operation("advance" if parts[2] == "advance" else "inject", parts[1], body))
+            else:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+        def do_DELETE(self) -> None:
+            parts = self.path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "sessions":
+                self._call(Operation("delete", parts[1]))
+            else:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+        def _body(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            body = json.loads(self.rfile.read(length))
+            if not isinstance(body, dict):
+                raise ValueError("expected an object")
+            return body
+
+        def _call(self, operation: Operation, status: HTTPStatus = HTTPStatus.OK) -> None:
+            future = server.submit(operation)
+            try:
+                result = future.result(server.timeout)
+            except KeyError:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": f"no session {operation.session_id!r}"})
+            except (ValueError, TypeError) as exc:
+                self._reply(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            except TimeoutError:
+                if future.cancel():
+                    message = f"no result within {server.timeout:g}s; the request was dropped"
+                else:
+                    message = f"no result within {server.timeout:g}s; the request is already running and will take effect"
+                self._reply(HTTPStatus.GATEWAY_TIMEOUT, {"error": message})
+            except Exception as exc:  # e.g. a failed spill write; the client still gets an answer
+                self._reply(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"})
+            else:
+                self._reply(status, result)
+
+        def _reply(self, status: HTTPStatus, payload: Any) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
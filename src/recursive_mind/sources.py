@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import errno
+import os
+import queue
+import selectors
+import socket
+from collections import deque
+from typing import Deque, List, Optional, Protocol, Union
+
+POLICIES = ("drop_oldest", "drop_newest", "merge")
+MAX_LINE = 4096
+
+
+class EventSource(Protocol):
+    """Something that can hand over whatever events are ready right now, without waiting."""
+
+    def read_ready(self, limit: int) -> List[str]:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class _Lines:
+    """Splits a byte stream into stripped, non-empty text lines; overlong lines are cut at ``MAX_LINE``."""
+
+    def __init__(self) -> None:
+        self._partial = b""
+
+    def feed(self, data: bytes) -> List[str]:
+        chunks = (self._partial + data).split(b"\n")
+        self._partial = chunks.pop()[-MAX_LINE:]
+        lines = []
+        for chunk in chunks:
+            text = chunk[:MAX_LINE].decode("utf-8", errors="replace").strip()
+            if text:
+                lines.append(text)
+        return lines
+
+
+class QueueSource:
+    """In-process feed: other threads ``put`` strings, the engine drains them without blocking."""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self.queue: "queue.Queue[str]" = queue.Queue(maxsize)
+
+    def put(self, event: str) -> None:
+        self.queue.put_nowait(event)
+
+    def read_ready(self, limit: int) -> List[str]:
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+class FileTailSource:
+    """
+    Follows a growing text file, like ``tail -F``.
+
+    Starts at the end unless ``from_start``; reopens the file when it is
+    rotated (new inode) or truncated.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], from_start: bool = False, chunk_size: int = 65536) -> None:
+        self.path = os.fspath(path)
+        self.chunk_size = chunk_size
+        self._lines = _Lines()
+        self._ready: Deque[str] = deque()
+        self._handle = None
+        self._inode: Optional[int] = None
+        self._open(seek_end=not from_start)
+
+    def _open(self, seek_end: bool) -> None:
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        if seek_end:
+            handle.seek(0, os.SEEK_END)
+        self._handle = handle
+        self._inode = os.fstat(handle.fileno()).st_ino
+
+    def _check_rotation(self) -> None:
+        try:
+            status = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if self._handle is None:
+            self._open(seek_end=False)
+        elif status.st_ino != self._inode or status.st_size < self._handle.tell():
+            self._handle.close()
+            self._lines = _Lines()
+            self._open(seek_end=False)
+
+    def read_ready(self, limit: int) -> List[str]:
+        self._check_rotation()
+        while self._handle is not None and len(self._ready) < limit:
+            data = self._handle.read(self.chunk_size)
+            if not data:
+                break
+            self._ready.extend(self._lines.feed(data))
+        return [self._ready.popleft() for _ in range(min(limit, len(self._ready)))]
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class FifoSource:
+    """
+    Reads lines from a named pipe opened non-blocking, so a missing or idle writer never stalls.
+
+    The pipe is created if it does not exist. It stays open across writers
+    coming and going.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], chunk_size: int = 65536) -> None:
+        self.path = os.fspath(path)
+        self.chunk_size = chunk_size
+        if not os.path.exists(self.path):
+            os.mkfifo(self.path)
+        self._fd: Optional[int] = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        self._lines = _Lines()
+        self._ready: Deque[str] = deque()
+
+    def read_ready(self, limit: int) -> List[str]:
+        while self._fd is not None and len(self._ready) < limit:
+            try:
+                data = os.read(self._fd, self.chunk_size)
+            except BlockingIOError:
+                break
+            if not data:  # no writer attached right now
+                break
+            self._ready.extend(self._lines.feed(data))
+        return [self._ready.popleft() for _ in range(min(limit, len(self._ready)))]
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class UnixSocketSource:
+    """
+    Listens on a Unix stream socket; any number of writers connect and send newline-separated events.
+
+    Accepting and reading both go through a selector polled with a zero
+    timeout.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], backlog: int = 16, chunk_size: int = 65536) -> None:
+        self.path = os.fspath(path)
+        self.chunk_size = chunk_size
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen(backlog)
+        self._server.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ, None)
+        self._ready: Deque[str] = deque()
+
+    def read_ready(self, limit: int) -> List[str]:
+        while len(self._ready) < limit:
+            events = self._selector.select(timeout=0)
+            if not events:
+                break
+            for key, _ in events:
+                if key.data is None:
+                    self._accept()
+                else:
+                    self._receive(key.fileobj, key.data)
+        return [self._ready.popleft() for _ in range(min(limit, len(self._ready)))]
+
+    def _accept(self) -> None:
+        try:
+            connection, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        connection.setblocking(False)
+        self._selector.register(connection, selectors.EVENT_READ, _Lines())
+
+    def _receive(self, connection: socket.socket, lines: _Lines) -> None:
+        try:
+            data = connection.recv(self.chunk_size)
+        except BlockingIOError:
+            return
+        except OSError as exc:
+            if exc.errno not in (errno.ECONNRESET, errno.EPIPE):
+                raise
+            data = b""
+        if not data:
+            self._selector.unregister(connection)
+            connection.close()
+            data = b"\n"  # flush an unterminated last line
+        self._ready.extend(lines.feed(data))
+
+    def close(self) -> None:
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class EventFeed:
+    """
+    Bounded buffer in front of an :class:`EventSource`.
+
+    Each :meth:`poll` moves at most ``max_poll`` ready events into a buffer of
+    ``capacity`` entries, so one call does bounded work however fast the
+    writer is. When the buffer is full, ``policy`` decides what happens:
+    ``drop_oldest`` evicts the oldest entry, ``drop_newest`` discards the
+    arrival, and ``merge`` folds the arrival into the newest entry. A merged
+    entry is shortened to ``merge_chars`` characters. The ``dropped`` and
+    ``merged`` counters record how often each happened.
+    """
+
+    def __init__(
+        self,
+        source: EventSource,
+        capacity: int = 32,
+        policy: str = "drop_oldest",
+        max_poll: int = 256,
+        merge_chars: int = 280,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, not {policy!r}")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.source = source
+        self.capacity = capacity
+        self.policy = policy
+        self.max_poll = max_poll
+        self.merge_chars = merge_chars
+        self.dropped = 0
+        self.merged = 0
+        self._buffer: Deque[str] = deque()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def poll(self) -> None:
+        for event in self.source.read_ready(self.max_poll):
+            self._push(event)
+
+    def _push(self, event: str) -> None:
+        buffer = self._buffer
+        if len(buffer) < self.capacity:
+            buffer.append(event)
+        elif self.policy == "drop_oldest":
+            buffer.popleft()
+            buffer.append(event)
+            self.dropped += 1
+        elif self.policy == "drop_newest":
+            self.dropped += 1
+        else:
+            combined = f"{buffer[-1]} | {event}"
+            if len(combined) > self.merge_chars:
+                combined = combined[: self.merge_chars - 1] + "…"
+            buffer[-1] = combined
+            self.merged += 1
+
+    def take(self) -> Optional[str]:
+        return self._buffer.popleft() if self._buffer else None
+
+    def close(self) -> None:
+        self.source.close()
@@ -1,29 +1,101 @@
 from __future__ import annotations
 
+import heapq
 import math
 import random
-from collections import deque
+import re
 from dataclasses import dataclass, field
-from typing import Deque, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set
 
-from .mood import Mood, MoodState
+from .cycles import CycleDetector
+from .fenwick import FenwickTree, combined_prefix, search_combined
+from .mood import MOOD_CODES, MOODS, Mood, MoodState
+
+if TYPE_CHECKING:
+    from .keywords import KeywordMatches
+
+
+_WORD = re.compile(r"[a-zA-Z']{4,}")
+RECALL_MODES = ("decay", "relevance")
 
 
-@dataclass
 class Thought:
-    text: str
-    iteration: int
-    mood: Mood
-    weight: float = 1.0
-    tags: tuple[str, ...] = ()
+    """
+    A registered thought with its token views.
+
+    Slotted to keep large histories compact. The whitespace tokens, lowered
+    text and association words are computed on first use and cached, and
+    ``matches`` holds the keyword scan taken when the thought was registered,
+    so consumers never re-split or re-scan the same text.
+    """
+
+    __slots__ = ("text", "iteration", "mood", "weight", "tags", "matches", "_tokens", "_lowered", "_words")
+
+    def __init__(
+        self,
+        text: str,
+        iteration: int,
+        mood: Mood,
+        weight: float = 1.0,
+        tags: tuple[str, ...] = (),
+        matches: Optional[KeywordMatches] = None,
+    ) -> None:
+        self.text = text
+        self.iteration = iteration
+        self.mood = mood
+        self.weight = weight
+        self.tags = tags
+        self.matches = matches
+        self._tokens: Optional[tuple[str, ...]] = None
+        self._lowered: Optional[str] = None
+        self._words: Optional[tuple[str, ...]] = None
+
+    @property
+    def tokens(self) -> tuple[str, ...]:
+        """Whitespace tokens of the text."""
+        if self._tokens is None:
+            self._tokens = tuple(self.text.split())
+        return self._tokens
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    @property
+    def words(self) -> tuple[str, ...]:
+        """Lowercase words of four or more letters, as used for associative jumps."""
+        if self._words is None:
+            self._words = tuple(_WORD.findall(self.lowered))
+        return self._words
+
+    def reweighted(self, weight: float) -> "Thought":
+        """Copy with a different weight that shares the cached token views."""
+        copy = Thought(self.text, self.iteration, self.mood, weight, self.tags, self.matches)
+        copy._tokens, copy._lowered, copy._words = self._tokens, self._lowered, self._words
+        return copy
 
     def decayed_copy(self, decay: float) -> "Thought":
-        return Thought(
-            text=self.text,
-            iteration=self.iteration,
-            mood=self.mood,
-            weight=max(0.01, self.weight * decay),
-            tags=self.tags,
+        return self.reweighted(max(0.01, self.weight * decay))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Thought):
+            return NotImplemented
+        return (self.text, self.iteration, self.mood, self.weight, self.tags) == (
+            other.text,
+            other.iteration,
+            other.mood,
+            other.weight,
+            other.tags,
+        )
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (
+            f"Thought(text={self.text!r}, iteration={self.iteration!r}, mood={self.mood!r}, "
+            f"weight={self.weight!r}, tags={self.tags!r})"
         )
 
 
@@ -49,65 +121,385 @@ class BiasProfile:
 
 
 class ThoughtMemory:
-    """Stores recent thoughts with exponential decay."""
+    """
+    Stores recent thoughts with exponential decay.
+
+    Decay is applied lazily: each slot keeps its insertion weight and clock, and
+    the effective weight is ``max(floor, weight * decay ** age)``. Unclamped
+    weights live in a Fenwick tree scaled by a single shared factor, while
+    thoughts that have decayed to the floor move to a second count tree, so both
+    ``add`` and weighted recall stay logarithmic in ``maxlen``.
+
+    An optional :class:`CycleDetector` in ``cycles`` sees every added thought.
+
+    ``recall_mode="relevance"`` additionally keeps an inverted index from
+    association words to thought ids, so recall can favour thoughts that
+    share words with the latest one at a cost proportional to the matched
+    postings.
+    """
+
+    floor = 0.01
+
+    def __init__(
+        self,
+        maxlen: int = 12,
+        decay: float = 0.82,
+        rng: Optional[random.Random] = None,
+        cycles: Optional[CycleDetector] = None,
+        recall_mode: str = "decay",
+    ) -> None:
+        if maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.maxlen = maxlen
+        self.rng = rng or random.Random()
+        self._decay = decay
+        self._slots: List[Optional[Thought]] = [None] * maxlen
+        self._weights = [0.0] * maxlen
+        self._stamps = [0] * maxlen
+        self._ids = [0] * maxlen
+        self._scaled = [0.0] * maxlen
+        self._clamped = [False] * maxlen
+        self._crossings: List[tuple[int, int, int]] = []
+        self._live = FenwickTree(maxlen)
+        self._floored = FenwickTree(maxlen)
+        self._clock = 0
+        self._base = 0
+        self._count = 0
+        self._shared = False
+        self.cycles = cycles
+        self._postings: Optional[Dict[str, Set[int]]] = None
+        self.recall_mode = recall_mode
 
-    def __init__(self, maxlen: int = 12, decay: float = 0.82) -> None:
-        self._buffer: Deque[Thought] = deque(maxlen=maxlen)
-        self.decay = decay
+    @property
+    def decay(self) -> float:
+        return self._decay
 
-    def __iter__(self) -> Iterable[Thought]:
-        return iter(self._buffer)
+    @decay.setter
+    def decay(self, value: float) -> None:
+        self._own()
+        # A new rate only applies from now on, so fold the old one into the weights first.
+        self._rebase()
+        self._decay = value
+        self._rebase()
+
+    @property
+    def recall_mode(self) -> str:
+        return self._recall_mode
+
+    @recall_mode.setter
+    def recall_mode(self, value: str) -> None:
+        if value not in RECALL_MODES:
+            raise ValueError(f"recall_mode must be one of {RECALL_MODES}, not {value!r}")
+        self._own()
+        self._recall_mode = value
+        self._postings = None
+        if value == "relevance":
+            self._postings = {}
+            for slot in self._ordered_slots():
+                self._index(slot)
+
+    def __iter__(self) -> Iterator[Thought]:
+        for slot in self._ordered_slots():
+            yield self._slots[slot].reweighted(self._effective(slot))
 
     def __len__(self) -> int:
-        return len(self._buffer)
+        return self._count
 
     def add(self, thought: Thought) -> None:
-        decayed: List[Thought] = []
-        for t in self._buffer:
-            decayed.append(t.decayed_copy(self.decay))
-        self._buffer.clear()
-        self._buffer.extend(decayed)
-        self._buffer.append(thought)
+        self._own()
+        now = self._clock
+        self._clock += 1
+        slot = now % self.maxlen
+        if self._slots[slot] is not None:
+            if self._postings is not None:
+                self._unindex(slot)
+            self._release(slot)
+        else:
+            self._count += 1
+        self._slots[slot] = thought
+        self._ids[slot] = now
+        if self._postings is not None:
+            self._index(slot)
+        self._place(slot, thought.weight, now)
+        self._expire(now)
+        if now - self._base >= self._rebase_interval():
+            self._rebase()
+        if self.cycles is not None:
+            self.cycles.observe(thought)
+
+    def track_cycles(self, detector: Optional[CycleDetector] = None) -> CycleDetector:
+        """Attach a cycle detector (a default one if none is given), primed with the stored thoughts."""
+        self._own()
+        self.cycles = detector or CycleDetector()
+        for slot in self._ordered_slots():
+            self.cycles.observe(self._slots[slot])
+        return self.cycles
 
     def latest(self) -> Optional[Thought]:
-        if not self._buffer:
+        if not self._count:
+            return None
+        return self._slots[(self._clock - 1) % self.maxlen]
+
+    def recall_fragment(self, query: Optional[Iterable[str]] = None) -> Optional[str]:
+        """
+        Mutated fragment of a remembered thought, drawn by decayed weight.
+
+        In relevance mode each candidate's weight is also scaled by its
+        IDF-weighted word overlap with ``query`` (default: the latest
+        thought's words, excluding that thought itself); without any overlap
+        the draw falls back to decay alone.
+        """
+        if not self._count:
             return None
-        return self._buffer[-1]
+        if self._postings is not None:
+            slot = self._relevant_slot(query)
+            if slot is not None:
+                return self._mutate_fragment(self._slots[slot])
+        trees = self._trees()
+        total = combined_prefix(trees, self.maxlen)
+        pick = self.rng.uniform(0, total)
+        head = self._head()
+        before = combined_prefix(trees, head) if head else 0.0
+        tail = total - before
+        if pick <= tail:
+            slot = max(head, search_combined(trees, pick + before))
+        else:
+            slot = search_combined(trees, pick - tail)
+        thought = self._slots[slot] if slot < self.maxlen else None
+        return self._mutate_fragment(thought or self.latest())
 
-    def recall_fragment(self) -> Optional[str]:
-        if not self._buffer:
+    def _relevant_slot(self, query: Optional[Iterable[str]]) -> Optional[int]:
+        exclude = None
+        if query is None:
+            exclude = self._clock - 1
+            query = self._slots[exclude % self.maxlen].words
+        scores: Dict[int, float] = {}
+        for token in set(query):
+            ids = self._postings.get(token)
+            if not ids:
+                continue
+            idf = math.log(1 + self._count / len(ids))
+            for ident in ids:
+                scores[ident] = scores.get(ident, 0.0) + idf
+        scores.pop(exclude, None)
+        if not scores:
             return None
-        weights = [max(thought.weight, 0.01) for thought in self._buffer]
-        total = sum(weights)
-        pick = random.uniform(0, total)
-        upto = 0.0
-        for thought, weight in zip(self._buffer, weights):
-            upto += weight
-            if upto >= pick:
-                return self._mutate_fragment(thought)
-        return self._mutate_fragment(self._buffer[-1])
+        # Chronological order keeps draws reproducible however the postings were built.
+        candidates = sorted(scores)
+        weights = [scores[ident] * self._effective(ident % self.maxlen) for ident in candidates]
+        pick = self.rng.uniform(0, sum(weights))
+        for ident, weight in zip(candidates, weights):
+            pick -= weight
+            if pick <= 0:
+                return ident % self.maxlen
+        return candidates[-1] % self.maxlen
+
+    def _index(self, slot: int) -> None:
+        ident = self._ids[slot]
+        for token in set(self._slots[slot].words):
+            self._postings.setdefault(token, set()).add(ident)
+
+    def _unindex(self, slot: int) -> None:
+        ident = self._ids[slot]
+        for token in set(self._slots[slot].words):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(ident)
+                if not ids:
+                    del self._postings[token]
 
     def _mutate_fragment(self, thought: Thought) -> str:
-        tokens = thought.text.split()
+        tokens = thought.tokens
         if len(tokens) <= 5:
             fragment = thought.text
         else:
-            start = random.randint(0, max(0, len(tokens) - 5))
-            end = min(len(tokens), start + random.randint(3, 7))
+            start = self.rng.randint(0, max(0, len(tokens) - 5))
+            end = min(len(tokens), start + self.rng.randint(3, 7))
             fragment = " ".join(tokens[start:end])
 
-        if random.random() < 0.4:
+        if self.rng.random() < 0.4:
             fragment = fragment.capitalize()
-        if random.random() < 0.15:
+        if self.rng.random() < 0.15:
             fragment = fragment[::-1]
         return fragment
 
     def overload(self) -> str:
         snippets = []
-        for thought in random.sample(list(self._buffer), k=min(3, len(self._buffer))):
+        ordered = [self._slots[slot] for slot in self._ordered_slots()]
+        for thought in self.rng.sample(ordered, k=min(3, len(ordered))):
             snippets.append(self._mutate_fragment(thought))
         return " / ".join(snippets)
 
+    def fork(self) -> "ThoughtMemory":
+        """
+        Copy-on-write clone.
+
+        Both memories keep pointing at the same slot arrays, trees and Thought
+        objects until one of them is written to; only then does the writer take
+        a private copy of the arrays. Thoughts themselves are never copied.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        self._shared = clone._shared = True
+        return clone
+
+    def _own(self) -> None:
+        if not self._shared:
+            return
+        self._slots = list(self._slots)
+        self._weights = list(self._weights)
+        self._stamps = list(self._stamps)
+        self._ids = list(self._ids)
+        self._scaled = list(self._scaled)
+        self._clamped = list(self._clamped)
+        self._crossings = list(self._crossings)
+        self._live = FenwickTree.load(self._live.dump())
+        self._floored = FenwickTree.load(self._floored.dump())
+        if self.cycles is not None:
+            self.cycles = self.cycles.copy()
+        if self._postings is not None:
+            self._postings = {token: set(ids) for token, ids in self._postings.items()}
+        self._shared = False
+
+    def export_state(self) -> dict:
+        """
+        Exact snapshot as plain builtins (no Thought objects), for checkpoints.
+
+        Tree nodes and the crossing heap are included verbatim so a restored
+        memory makes bit-identical picks to the one that was saved.
+        """
+        return {
+            "maxlen": self.maxlen,
+            "decay": self._decay,
+            "clock": self._clock,
+            "base": self._base,
+            "count": self._count,
+            "slots": [
+                None if thought is None else (thought.text, thought.iteration, MOOD_CODES[thought.mood], thought.weight, thought.tags)
+                for thought in self._slots
+            ],
+            "weights": list(self._weights),
+            "stamps": list(self._stamps),
+            "ids": list(self._ids),
+            "scaled": list(self._scaled),
+            "clamped": list(self._clamped),
+            "crossings": list(self._crossings),
+            "live": self._live.dump(),
+            "floored": self._floored.dump(),
+            "cycles": None if self.cycles is None else self.cycles.export_state(),
+            "recall_mode": self._recall_mode,
+        }
+
+    @classmethod
+    def from_state(cls, data: dict, rng: Optional[random.Random] = None) -> "ThoughtMemory":
+        memory = cls(maxlen=data["maxlen"], decay=data["decay"], rng=rng)
+        memory._clock = data["clock"]
+        memory._base = data["base"]
+        memory._count = data["count"]
+        memory._slots = [
+            None if entry is None else Thought(entry[0], entry[1], MOODS[entry[2]], entry[3], tuple(entry[4]))
+            for entry in data["slots"]
+        ]
+        memory._weights = list(data["weights"])
+        memory._stamps = list(data["stamps"])
+        memory._ids = list(data["ids"])
+        memory._scaled = list(data["scaled"])
+        memory._clamped = list(data["clamped"])
+        memory._crossings = [tuple(entry) for entry in data["crossings"]]
+        memory._live = FenwickTree.load(data["live"])
+        memory._floored = FenwickTree.load(data["floored"])
+        if data.get("cycles") is not None:
+            memory.cycles = CycleDetector.from_state(data["cycles"])
+        memory.recall_mode = data.get("recall_mode", "decay")  # rebuilds the postings from the slots
+        return memory
+
+    def _head(self) -> int:
+        return self._clock % self.maxlen if self._count == self.maxlen else 0
+
+    def _ordered_slots(self) -> Iterator[int]:
+        head = self._head()
+        for offset in range(self._count):
+            yield (head + offset) % self.maxlen
+
+    def _power(self, exponent: int) -> float:
+        if self._decay <= 0:
+            return 1.0
+        return self._decay ** exponent
+
+    def _trees(self) -> list[tuple[FenwickTree, float]]:
+        return [(self._live, self._power(self._clock - 1 - self._base)), (self._floored, self.floor)]
+
+    def _effective(self, slot: int) -> float:
+        if self._clamped[slot]:
+            return self.floor
+        return self._scaled[slot] * self._power(self._clock - 1 - self._base)
+
+    def _crossing_age(self, weight: float) -> Optional[int]:
+        """Age at which ``weight`` first decays to the floor, or None if it never does."""
+        if weight <= self.floor:
+            return 0
+        if self._decay <= 0:
+            return 1
+        if self._decay >= 1:
+            return None
+        age = max(0, math.ceil(math.log(self.floor / weight) / math.log(self._decay)))
+        while age > 0 and weight * self._decay ** (age - 1) <= self.floor:
+            age -= 1
+        while weight * self._decay ** age > self.floor:
+            age += 1
+        return age
+
+    def _rebase_interval(self) -> float:
+        # Keep the shared scale factor well inside float range.
+        if self._decay <= 0 or self._decay == 1:
+            return math.inf
+        return max(1, int(460 / abs(math.log(self._decay))))
+
+    def _place(self, slot: int, weight: float, stamp: int) -> None:
+        self._weights[slot] = weight
+        self._stamps[slot] = stamp
+        crossing = self._crossing_age(weight)
+        if crossing == 0:
+            self._clamped[slot] = True
+            self._scaled[slot] = 0.0
+            self._floored.add(slot, 1.0)
+            return
+        self._clamped[slot] = False
+        self._scaled[slot] = weight / self._power(stamp - self._base)
+        self._live.add(slot, self._scaled[slot])
+        if crossing is not None:
+            heapq.heappush(self._crossings, (stamp + crossing, self._ids[slot], slot))
+
+    def _release(self, slot: int) -> None:
+        if self._clamped[slot]:
+            self._floored.add(slot, -1.0)
+        else:
+            self._live.add(slot, -self._scaled[slot])
+        self._slots[slot] = None
+
+    def _expire(self, now: int) -> None:
+        crossings = self._crossings
+        while crossings and crossings[0][0] <= now:
+            _, ident, slot = heapq.heappop(crossings)
+            if self._slots[slot] is None or self._ids[slot] != ident or self._clamped[slot]:
+                continue
+            self._live.add(slot, -self._scaled[slot])
+            self._scaled[slot] = 0.0
+            self._clamped[slot] = True
+            self._floored.add(slot, 1.0)
+
+    def _rebase(self) -> None:
+        """Re-anchor every weight at the current clock and rebuild both trees."""
+        now = max(0, self._clock - 1)
+        effective = [self._effective(slot) if self._slots[slot] is not None else 0.0 for slot in range(self.maxlen)]
+        self._base = now
+        self._crossings = []
+        self._live = FenwickTree(self.maxlen)
+        self._floored = FenwickTree(self.maxlen)
+        for slot in range(self.maxlen):
+            if self._slots[slot] is not None:
+                self._place(slot, effective[slot], now)
+
 
 @dataclass
 class ThoughtState:
@@ -116,14 +508,42 @@ class ThoughtState:
     biases: BiasProfile = field(default_factory=BiasProfile)
     iteration: int = 0
     intrusive_budget: int = 0
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.bind_rng(self.rng)
+
+    def bind_rng(self, rng: random.Random) -> None:
+        """Route every stochastic part of the state through a single owned generator."""
+        self.rng = rng
+        self.memory.rng = rng
+        self.mood_state.rng = rng
+
+    def fork(self, rng: Optional[random.Random] = None) -> "ThoughtState":
+        """
+        Branch this state. Memory is shared copy-on-write; mood, biases and
+        counters are small and copied outright. Without ``rng`` the branch gets
+        a generator positioned where this state's generator is.
+        """
+        if rng is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        return ThoughtState(
+            memory=self.memory.fork(),
+            mood_state=MoodState(mood=self.mood_state.mood, transitions=self.mood_state.transitions),
+            biases=BiasProfile(traits=dict(self.biases.traits)),
+            iteration=self.iteration,
+            intrusive_budget=self.intrusive_budget,
+            rng=rng,
+        )
 
-    def register(self, text: str) -> Thought:
+    def register(self, text: str, matches: Optional[KeywordMatches] = None) -> Thought:
         mood = self.mood_state.mood
         self.iteration += 1
         weight = math.exp(-self.iteration / 20)
-        thought = Thought(text=text, iteration=self.iteration, mood=mood, weight=weight)
+        thought = Thought(text=text, iteration=self.iteration, mood=mood, weight=weight, matches=matches)
         self.memory.add(thought)
         return thought
 
-    def drift_mood(self, stimulus: str | None = None) -> Mood:
-        return self.mood_state.mutate(stimulus)
+    def drift_mood(self, stimulus: str | None = None, matches: KeywordMatches | None = None) -> Mood:
+        return self.mood_state.mutate(stimulus, matches)
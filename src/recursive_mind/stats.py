@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from .distortions import SEGMENT_KINDS, segment_kinds
+from .mood import MOOD_CODES, MOODS
+
+if TYPE_CHECKING:
+    from .engine import StepResult
+
+STRATEGIES = tuple(kind for kind in SEGMENT_KINDS if kind != "mood")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles of non-negative values with bounded relative error.
+
+    Values land in logarithmic buckets ``(gamma**(i-1), gamma**i]`` with
+    ``gamma = (1 + accuracy) / (1 - accuracy)``, so any quantile is answered
+    within ``accuracy`` of the true value. Memory grows with the logarithm of
+    the value range, not with the number of values, and two sketches with the
+    same accuracy merge by adding bucket counts.
+    """
+
+    __slots__ = ("accuracy", "count", "zeros", "minimum", "maximum", "buckets", "_log_gamma")
+
+    def __init__(self, accuracy: float = 0.01) -> None:
+        if not 0 < accuracy < 1:
+            raise ValueError("accuracy must lie in (0, 1)")
+        self.accuracy = accuracy
+        self.count = 0
+        self.zeros = 0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.buckets: Dict[int, int] = {}
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Bucket midpoint in relative terms, clamped to what was actually seen.
+                value = 2 * math.exp(index * self._log_gamma) / (1 + math.exp(self._log_gamma))
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.accuracy != self.accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def to_dict(self) -> dict:
+        return {
+            "accuracy": self.accuracy,
+            "count": self.count,
+            "zeros": self.zeros,
+            "min": None if self.minimum == math.inf else self.minimum,
+            "max": self.maximum,
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["accuracy"])
+        sketch.count = data["count"]
+        sketch.zeros = data["zeros"]
+        sketch.minimum = math.inf if data["min"] is None else data["min"]
+        sketch.maximum = data["max"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        return sketch
+
+
+class RunStatistics:
+    """
+    Constant-memory aggregates over any number of steps and runs.
+
+    Keeps mood counts, a mood transition matrix, interrupt counts, how many
+    steps each distortion strategy touched, and quantile sketches of prompt
+    and thought lengths (in characters). Attach one as
+    ``RecursiveMindEngine(stats=...)`` and it is updated as each step
+    completes, with strategy hits taken from the distortion pipeline itself;
+    :meth:`merge` combines sinks from other processes or runs, and
+    :meth:`save`/:meth:`load` move them through JSON.
+    """
+
+    def __init__(self, accuracy: float = 0.01) -> None:
+        self.accuracy = accuracy
+        self.runs = 0
+        self.steps = 0
+        self.interrupts = 0
+        self.moods: List[int] = [0] * len(MOODS)
+        self.transitions: List[List[int]] = [[0] * len(MOODS) for _ in MOODS]
+        self.strategies: Dict[str, int] = dict.fromkeys(STRATEGIES, 0)
+        self.prompt_chars = QuantileSketch(accuracy)
+        self.thought_chars = QuantileSketch(accuracy)
+        self._last: Optional[int] = None
+
+    def start_run(self) -> None:
+        """Mark a run boundary, so no transition is counted across it."""
+        self._last = None
+
+    def record(self, step: "StepResult", strategies: Optional[Iterable[str]] = None) -> None:
+        """
+        Count one step. ``strategies`` names the distortion strategies that
+        fired; without it (steps read back from a log) they are inferred from
+        the prompt's line prefixes, which mistakes unprefixed lines of a
+        multi-line thought for self-doubt.
+        """
+        code = MOOD_CODES[step.mood]
+        if self._last is None:
+            self.runs += 1
+        else:
+            self.transitions[self._last][code] += 1
+        self._last = code
+        self.steps += 1
+        self.moods[code] += 1
+        if step.external is not None:
+            self.interrupts += 1
+        counts = self.strategies
+        for kind in set(segment_kinds(step.prompt) if strategies is None else strategies):
+            if kind in counts:
+                counts[kind] += 1
+        self.prompt_chars.add(len(step.prompt))
+        self.thought_chars.add(len(step.thought))
+
+    def extend(self, steps: Iterable["StepResult"]) -> None:
+        self.start_run()
+        for step in steps:
+            self.record(step)
+
+    def branch(self) -> "RunStatistics":
+        """Empty sink that continues this one's current run; merge it back when done."""
+        branch = RunStatistics(self.accuracy)
+        branch._last = self._last
+        return branch
+
+    def merge(self, other: "RunStatistics") -> None:
+        self.runs += other.runs
+        self.steps += other.steps
+        self.interrupts += other.interrupts
+        self.moods = [a + b for a, b in zip(self.moods, other.moods)]
+        self.transitions = [[a + b for a, b in zip(mine, theirs)] for mine, theirs in zip(self.transitions, other.transitions)]
+        for kind, count in other.strategies.items():
+            self.strategies[kind] = self.strategies.get(kind, 0) + count
+        self.prompt_chars.merge(other.prompt_chars)
+        self.thought_chars.merge(other.thought_chars)
+
+    def summary(self) -> dict:
+        steps = self.steps or 1
+        transitions = {}
+        for mood, row in zip(MOODS, self.transitions):
+            total = sum(row)
+            if total:
+                transitions[mood.value] = {target.value: round(count / total, 4) for target, count in zip(MOODS, row) if count}
+        return {
+            "runs": self.runs,
+            "steps": self.steps,
+            "moods": {mood.value: round(count / steps, 4) for mood, count in zip(MOODS, self.moods)},
+            "transitions": transitions,
+            "interrupt_rate": round(self.interrupts / steps, 4),
+            "strategy_rates": {kind: round(count / steps, 4) for kind, count in self.strategies.items()},
+            "prompt_chars": {f"p{round(q * 100)}": _rounded(self.prompt_chars.quantile(q)) for q in QUANTILES},
+            "thought_chars": {f"p{round(q * 100)}": _rounded(self.thought_chars.quantile(q)) for q in QUANTILES},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "accuracy": self.accuracy,
+            "runs": self.runs,
+            "steps": self.steps,
+            "interrupts": self.interrupts,
+            "moods": {mood.value: count for mood, count in zip(MOODS, self.moods)},
+            "transitions": {mood.value: row for mood, row in zip(MOODS, self.transitions)},
+            "strategies": dict(self.strategies),
+            "prompt_chars": self.prompt_chars.to_dict(),
+            "thought_chars": self.thought_chars.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunStatistics":
+        stats = cls(data["accuracy"])
+        stats.runs = data["runs"]
+        stats.steps = data["steps"]
+        stats.interrupts = data["interrupts"]
+        stats.moods = [data["moods"].get(mood.value, 0) for mood in MOODS]
+        stats.transitions = [list(data["transitions"].get(mood.value, [0] * len(MOODS))) for mood in MOODS]
+        stats.strategies.update(data["strategies"])
+        stats.prompt_chars = QuantileSketch.from_dict(data["prompt_chars"])
+        stats.thought_chars = QuantileSketch.from_dict(data["thought_chars"])
+        return stats
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        temporary = f"{os.fspath(path)}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "RunStatistics":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
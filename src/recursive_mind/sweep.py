@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .engine import RecursiveMindEngine
+from .mood import MOODS, Mood
+
+PARAMETERS = ("mood", "probability", "cooldown", "decay")
+BIAS_PREFIX = "bias."
+# Part of every memo key; bump it when the metrics a cell records change meaning.
+METRICS_VERSION = 2
+Cell = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    """
+    What to sweep and how each cell is run.
+
+    ``params`` maps a parameter to its candidate values: ``mood`` (a mood
+    name or ``None``), ``probability`` and ``cooldown`` of the interrupt
+    handler, memory ``decay``, and ``bias.<trait>`` for an absolute trait
+    weight (clamped to [-1, 1] like :meth:`BiasProfile.adjust`). In ``grid`` mode every combination is a cell. In ``random`` mode
+    ``samples`` cells are drawn, each value taken from a list or from a
+    ``{"uniform": [low, high]}`` range. Every cell runs each prompt once per
+    seed.
+    """
+
+    params: Dict[str, Any]
+    prompts: Sequence[str] = ("What is the safest path forward?",)
+    steps: int = 50
+    seeds: int = 4
+    seed_start: int = 0
+    mode: str = "grid"
+    samples: int = 32
+    random_seed: int = 0
+    allow_interrupts: bool = True
+    prompt_budget: Optional[int] = None
+    track_cycles: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SweepSpec":
+        data = dict(data)
+        if "prompts" in data:
+            data["prompts"] = tuple(data["prompts"])
+        spec = cls(**data)
+        spec.validate()
+        return spec
+
+    def validate(self) -> None:
+        if self.mode not in ("grid", "random"):
+            raise ValueError(f"Unknown sweep mode {self.mode!r}")
+        for name in self.params:
+            if name not in PARAMETERS and not name.startswith(BIAS_PREFIX):
+                raise ValueError(f"Cannot sweep {name!r}; choose from {PARAMETERS} or bias.<trait>")
+
+    def cells(self) -> Iterator[Cell]:
+        """Yield each distinct cell once, in a stable order."""
+        seen = set()
+        for cell in self._raw_cells():
+            key = cell_key(cell)
+            if key not in seen:
+                seen.add(key)
+                yield cell
+
+    def _raw_cells(self) -> Iterator[Cell]:
+        names = sorted(self.params)
+        if self.mode == "grid":
+            for values in itertools.product(*(_as_list(self.params[name]) for name in names)):
+                yield _normalise(dict(zip(names, values)))
+            return
+        rng = random.Random(self.random_seed)
+        for _ in range(self.samples):
+            yield _normalise({name: _sample(self.params[name], rng) for name in names})
+
+
+def _as_list(values: Any) -> List[Any]:
+    if isinstance(values, dict):
+        raise ValueError("Ranges like {'uniform': [...]} are only valid in random mode")
+    return list(values) if isinstance(values, (list, tuple)) else [values]
+
+
+def _sample(values: Any, rng: random.Random) -> Any:
+    if isinstance(values, dict) and "uniform" in values:
+        low, high = values["uniform"]
+        return rng.uniform(low, high)
+    return rng.choice(_as_list(values))
+
+
+def _normalise(cell: Cell) -> Cell:
+    return {name: _canonical(value) for name, value in cell.items()}
+
+
+def _canonical(value: Any) -> Any:
+    # Round floats so random draws and grid values that print the same dedupe together,
+    # and key integral numbers as ints so 1 and 1.0 are the same cell.
+    if not isinstance(value, float):
+        return value
+    value = round(value, 6)
+    return int(value) if value.is_integer() else value
+
+
+def cell_key(cell: Cell, spec: Optional[SweepSpec] = None) -> str:
+    """Stable digest of a cell (plus the run settings, when ``spec`` is given) for dedupe and memo files."""
+    payload: Dict[str, Any] = {"cell": cell}
+    if spec is not None:
+        payload["run"] = [
+            list(spec.prompts), spec.steps, spec.seeds, spec.seed_start,
+            spec.allow_interrupts, spec.prompt_budget, spec.track_cycles,
+        ]
+        payload["metrics"] = METRICS_VERSION
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+
+
+@dataclass
+class CellMetrics:
+    """Running aggregates for one cell; updated per step, never holding the steps themselves."""
+
+    runs: int = 0
+    steps: int = 0
+    moods: List[int] = field(default_factory=lambda: [0] * len(MOODS))
+    interrupts: int = 0
+    intrusive: int = 0
+    cycles: int = 0
+    cycle_onset_total: int = 0
+
+    def merge(self, other: "CellMetrics") -> None:
+        self.runs += other.runs
+        self.steps += other.steps
+        self.moods = [a + b for a, b in zip(self.moods, other.moods)]
+        self.interrupts += other.interrupts
+        self.intrusive += other.intrusive
+        self.cycles += other.cycles
+        self.cycle_onset_total += other.cycle_onset_total
+
+    def summary(self) -> Dict[str, Any]:
+        steps = self.steps or 1
+        return {
+            "runs": self.runs,
+            "steps": self.steps,
+            "mood_occupancy": {mood.value: round(count / steps, 6) for mood, count in zip(MOODS, self.moods)},
+            "interrupt_rate": round(self.interrupts / steps, 6),
+            "intrusive_rate": round(self.intrusive / steps, 6),
+            "cycle_rate": round(self.cycles / (self.runs or 1), 6),
+            "mean_cycle_onset": round(self.cycle_onset_total / self.cycles, 3) if self.cycles else None,
+        }
+
+
+def run_cell(cell: Cell, spec: SweepSpec) -> CellMetrics:
+    metrics = CellMetrics()
+    biases = {
+        name[len(BIAS_PREFIX):]: max(-1.0, min(1.0, value)) for name, value in cell.items() if name.startswith(BIAS_PREFIX)
+    }
+    for prompt in spec.prompts:
+        for seed in range(spec.seed_start, spec.seed_start + spec.seeds):
+            engine = RecursiveMindEngine(seed=seed, prompt_budget=spec.prompt_budget, detect_cycles=spec.track_cycles)
+            if "probability" in cell:
+                engine.interrupts.probability = cell["probability"]
+            if "cooldown" in cell:
+                engine.interrupts.cooldown = cell["cooldown"]
+            engine.begin(prompt, starting_mood=Mood(cell["mood"]) if cell.get("mood") else None)
+            engine.state.biases.traits.update(biases)
+            if "decay" in cell:
+                engine.state.memory.decay = cell["decay"]
+            onset = None
+            for step in engine.advance(spec.steps, allow_interrupts=spec.allow_interrupts):
+                metrics.steps += 1
+                metrics.moods[MOODS.index(step.mood)] += 1
+                metrics.interrupts += step.external is not None
+                metrics.intrusive += "intrusive" in engine.distortions.fired  # this step's pipeline record
+                cycles = engine.state.memory.cycles
+                if onset is None and cycles is not None and cycles.cycle is not None:
+                    onset = cycles.cycle.onset - 1  # thought iterations start at the seed thought
+            metrics.runs += 1
+            if onset is not None:
+                metrics.cycles += 1
+                metrics.cycle_onset_total += onset
+    return metrics
+
+
+@dataclass
+class CellResult:
+    cell: Cell
+    key: str
+    metrics: CellMetrics
+    cached: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, "cell": self.cell, "cached": self.cached, **self.metrics.summary()}
+
+
+class SweepMemo:
+    """One JSON file per finished cell, written atomically, so an interrupted sweep resumes where it stopped."""
+
+    def __init__(self, directory: Union[str, os.PathLike]) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[CellMetrics]:
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return CellMetrics(**data["metrics"])
+
+    def store(self, key: str, cell: Cell, metrics: CellMetrics) -> None:
+        path = self._path(key)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({"cell": cell, "metrics": metrics.__dict__}), encoding="utf-8")
+        os.replace(temporary, path)
+
+
+def run_sweep(
+    spec: SweepSpec,
+    workers: Optional[int] = None,
+    memo: Optional[SweepMemo] = None,
+    window: Optional[int] = None,
+) -> Iterator[CellResult]:
+    """
+    Run every distinct cell, yielding results in completion order.
+
+    Memoised cells are yielded first without running. At most ``window``
+    cells (default: two per worker) are in flight at once.
+    """
+    pending: List[tuple[Cell, str]] = []
+    for cell in spec.cells():
+        key = cell_key(cell, spec)
+        cached = memo.load(key) if memo is not None else None
+        if cached is not None:
+            yield CellResult(cell, key, cached, cached=True)
+        else:
+            pending.append((cell, key))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for cell, key in pending:
+            yield _finish(cell, key, run_cell(cell, spec), memo)
+        return
+    window = window or workers * 2
+    queue = iter(pending)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Dict[Future, tuple[Cell, str]] = {}
+        while True:
+            for cell, key in itertools.islice(queue, window - len(in_flight)):
+                in_flight[pool.submit(run_cell, cell, spec)] = (cell, key)
+            if not in_flight:
+                return
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                cell, key = in_flight.pop(future)
+                yield _finish(cell, key, future.result(), memo)
+
+
+def _finish(cell: Cell, key: str, metrics: CellMetrics, memo: Optional[SweepMemo]) -> CellResult:
+    if memo is not None:
+        memo.store(key, cell, metrics)
+    return CellResult(cell, key, metrics)
+
+
+def load_spec(path: Union[str, os.PathLike]) -> SweepSpec:
+    with open(path, "r", encoding="utf-8") as handle:
+        return SweepSpec.from_dict(json.load(handle))
+
+
+def best_cells(results: Iterable[CellResult], metric: str, top: int = 5, reverse: bool = True) -> List[CellResult]:
+    """Rank finished cells by a scalar summary field such as ``interrupt_rate``."""
+    scored = [result for result in results if result.metrics.summary().get(metric) is not None]
+    return sorted(scored, key=lambda result: result.metrics.summary()[metric], reverse=reverse)[:top]
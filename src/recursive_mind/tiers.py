@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .cycles import CycleDetector
+from .mood import MOOD_CODES, MOODS, Mood
+from .state import _WORD, Thought, ThoughtMemory
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+FRAGMENT_WORDS = 24
+SUMMARY_EXEMPLARS = 8
+SUMMARY_KEYWORDS = 8
+
+
+class Fragment:
+    """A consolidated clause in the warm tier, merged across every thought that contained it."""
+
+    __slots__ = ("text", "weight", "count", "mood", "last_seen")
+
+    def __init__(self, text: str, weight: float, count: int, mood: Mood, last_seen: int) -> None:
+        self.text = text
+        self.weight = weight
+        self.count = count
+        self.mood = mood
+        self.last_seen = last_seen
+
+    def copy(self) -> "Fragment":
+        return Fragment(self.text, self.weight, self.count, self.mood, self.last_seen)
+
+
+class Summary:
+    """A cold-tier summary: a few exemplar fragments compressed together, plus keywords and totals."""
+
+    __slots__ = ("blob", "keywords", "weight", "count", "first", "last")
+
+    def __init__(self, blob: bytes, keywords: tuple[str, ...], weight: float, count: int, first: int, last: int) -> None:
+        self.blob = blob
+        self.keywords = keywords
+        self.weight = weight
+        self.count = count
+        self.first = first
+        self.last = last
+
+    @classmethod
+    def build(cls, fragments: Sequence[Fragment]) -> "Summary":
+        ranked = sorted(fragments, key=lambda fragment: -fragment.weight)
+        words = Counter(word for fragment in fragments for word in _WORD.findall(fragment.text.lower()))
+        return cls(
+            blob=zlib.compress("\n".join(fragment.text for fragment in ranked[:SUMMARY_EXEMPLARS]).encode("utf-8")),
+            keywords=tuple(word for word, _ in words.most_common(SUMMARY_KEYWORDS)),
+            weight=sum(fragment.weight for fragment in fragments),
+            count=sum(fragment.count for fragment in fragments),
+            first=min(fragment.last_seen for fragment in fragments),
+            last=max(fragment.last_seen for fragment in fragments),
+        )
+
+    @property
+    def exemplars(self) -> List[str]:
+        return zlib.decompress(self.blob).decode("utf-8").split("\n")
+
+    def merged(self, other: "Summary") -> "Summary":
+        interleaved = [text for pair in zip(self.exemplars, other.exemplars) for text in pair]
+        longer = self.exemplars if len(self.exemplars) > len(other.exemplars) else other.exemplars
+        interleaved += longer[len(interleaved) // 2:]
+        keywords = tuple(dict.fromkeys(self.keywords + other.keywords))[:SUMMARY_KEYWORDS]
+        return Summary(
+            blob=zlib.compress("\n".join(interleaved[:SUMMARY_EXEMPLARS]).encode("utf-8")),
+            keywords=keywords,
+            weight=self.weight + other.weight,
+            count=self.count + other.count,
+            first=min(self.first, other.first),
+            last=max(self.last, other.last),
+        )
+
+
+def _fragments(text: str) -> Iterable[str]:
+    for sentence in _SENTENCE.split(text.strip()):
+        words = sentence.split()
+        if len(words) >= 3:
+            yield " ".join(words[:FRAGMENT_WORDS])
+
+
+class TieredMemory(ThoughtMemory):
+    """
+    Working memory backed by consolidated long-term tiers with a bounded footprint.
+
+    The hot tier is the regular decaying ring. Thoughts evicted from it are
+    queued and, every ``consolidate_every`` adds, split into sentence
+    fragments and merged into the warm tier, where repeated fragments
+    collapse into one entry whose weight counts its occurrences. Weights in
+    the lower tiers fade by ``tier_decay`` per consolidation. When the warm
+    tier outgrows ``warm_capacity`` its weakest quarter is compressed into a
+    single cold :class:`Summary`, and the two oldest summaries merge whenever
+    the cold tier exceeds ``cold_capacity``.
+
+    Recall and overload first choose a tier by ``tier_shares`` (renormalised
+    over the non-empty tiers), then draw within it by weight.
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 12,
+        decay: float = 0.82,
+        rng: Optional[random.Random] = None,
+        cycles: Optional[CycleDetector] = None,
+        recall_mode: str = "decay",
+        consolidate_every: int = 32,
+        warm_capacity: int = 256,
+        cold_capacity: int = 64,
+        tier_decay: float = 0.95,
+        tier_shares: tuple[float, float, float] = (0.7, 0.2, 0.1),
+    ) -> None:
+        if consolidate_every < 1:
+            raise ValueError("consolidate_every must be at least 1")
+        self.consolidate_every = consolidate_every
+        self.warm_capacity = warm_capacity
+        self.cold_capacity = cold_capacity
+        self.tier_decay = tier_decay
+        self.tier_shares = tier_shares
+        self._evicted: List[Thought] = []
+        self._warm: Dict[str, Fragment] = {}
+        self._cold: List[Summary] = []
+        self._since = 0
+        super().__init__(maxlen=maxlen, decay=decay, rng=rng, cycles=cycles, recall_mode=recall_mode)
+
+    def tier_sizes(self) -> tuple[int, int, int]:
+        return len(self), len(self._warm), len(self._cold)
+
+    def add(self, thought: Thought) -> None:
+        self._own()
+        victim = self._slots[self._clock % self.maxlen]
+        if victim is not None:
+            self._evicted.append(victim)
+        super().add(thought)
+        self._since += 1
+        if self._since >= self.consolidate_every:
+            self.consolidate()
+
+    def consolidate(self) -> None:
+        """Fold queued evictions into the warm tier and spill the overflow to cold storage."""
+        self._own()
+        self._since = 0
+        for fragment in self._warm.values():
+            fragment.weight *= self.tier_decay
+        for summary in self._cold:
+            summary.weight *= self.tier_decay
+        for thought in self._evicted:
+            for text in _fragments(thought.text):
+                key = " ".join(_WORD.findall(text.lower())) or text.lower()
+                fragment = self._warm.get(key)
+                if fragment is None:
+                    self._warm[key] = Fragment(text, 1.0, 1, thought.mood, thought.iteration)
+                else:
+                    fragment.weight += 1.0
+                    fragment.count += 1
+                    fragment.last_seen = thought.iteration
+        self._evicted = []
+        if len(self._warm) > self.warm_capacity:
+            self._demote()
+
+    def _demote(self) -> None:
+        keep = self.warm_capacity * 3 // 4
+        ranked = sorted(self._warm.items(), key=lambda item: (-item[1].weight, -item[1].last_seen))
+        spilled = [fragment for _, fragment in ranked[keep:]]
+        kept = {key for key, _ in ranked[:keep]}
+        self._warm = {key: fragment for key, fragment in self._warm.items() if key in kept}
+        self._cold.append(Summary.build(spilled))
+        while len(self._cold) > self.cold_capacity:
+            self._cold[0:2] = [self._cold[0].merged(self._cold[1])]
+
+    def recall_fragment(self, query: Optional[Iterable[str]] = None) -> Optional[str]:
+        if not self._count:
+            return None
+        tier = self._pick_tier()
+        if tier == 0:
+            return super().recall_fragment(query)
+        return self._mutate_fragment(self._tier_thought(tier))
+
+    def overload(self) -> str:
+        if not (self._warm or self._cold):
+            return super().overload()
+        snippets = []
+        for _ in range(min(3, self._count)):
+            tier = self._pick_tier()
+            if tier == 0:
+                thought = self._slots[self.rng.choice(list(self._ordered_slots()))]
+            else:
+                thought = self._tier_thought(tier)
+            snippets.append(self._mutate_fragment(thought))
+        return " / ".join(snippets)
+
+    def _pick_tier(self) -> int:
+        present = (True, bool(self._warm), bool(self._cold))
+        if not (present[1] or present[2]):
+            return 0
+        shares = [share if here else 0.0 for share, here in zip(self.tier_shares, present)]
+        pick = self.rng.uniform(0, sum(shares))
+        for tier, share in enumerate(shares):
+            pick -= share
+            if pick <= 0 and share:
+                return tier
+        return max(tier for tier, here in enumerate(present) if here)
+
+    def _tier_thought(self, tier: int) -> Thought:
+        items = list(self._warm.values()) if tier == 1 else self._cold
+        pick = self.rng.uniform(0, sum(item.weight for item in items))
+        chosen = items[-1]
+        for item in items:
+            pick -= item.weight
+            if pick <= 0:
+                chosen = item
+                break
+        if tier == 1:
+            return Thought(chosen.text, chosen.last_seen, chosen.mood, weight=chosen.weight)
+        text = self.rng.choice(chosen.exemplars)
+        return Thought(text, chosen.last, self.latest().mood, weight=chosen.weight)
+
+    def _own(self) -> None:
+        if self._shared:
+            self._evicted = list(self._evicted)
+            self._warm = {key: fragment.copy() for key, fragment in self._warm.items()}
+            # Summaries are immutable apart from their fading weight.
+            self._cold = [Summary(s.blob, s.keywords, s.weight, s.count, s.first, s.last) for s in self._cold]
+        super()._own()
+
+    def export_state(self) -> dict:
+        data = super().export_state()
+        data["tiers"] = {
+            "config": [
+                self.consolidate_every,
+                self.warm_capacity,
+                self.cold_capacity,
+                self.tier_decay,
+                list(self.tier_shares),
+            ],
+            "since": self._since,
+            "evicted": [(t.text, t.iteration, MOOD_CODES[t.mood], t.weight, t.tags) for t in self._evicted],
+            "warm": [
+                (key, f.text, f.weight, f.count, MOOD_CODES[f.mood], f.last_seen) for key, f in self._warm.items()
+            ],
+            "cold": [(s.blob, s.keywords, s.weight, s.count, s.first, s.last) for s in self._cold],
+        }
+        return data
+
+    @classmethod
+    def from_state(cls, data: dict, rng: Optional[random.Random] = None) -> "TieredMemory":
+        memory = super().from_state(data, rng)
+        tiers = data["tiers"]
+        every, warm_capacity, cold_capacity, tier_decay, shares = tiers["config"]
+        memory.consolidate_every = every
+        memory.warm_capacity = warm_capacity
+        memory.cold_capacity = cold_capacity
+        memory.tier_decay = tier_decay
+        memory.tier_shares = tuple(shares)
+        memory._since = tiers["since"]
+        memory._evicted = [
+            Thought(text, iteration, MOODS[mood], weight, tuple(tags))
+            for text, iteration, mood, weight, tags in tiers["evicted"]
+        ]
+        memory._warm = {
+            key: Fragment(text, weight, count, MOODS[mood], last) for key, text, weight, count, mood, last in tiers["warm"]
+        }
+        memory._cold = [Summary(bytes(blob), tuple(keywords), *rest) for blob, keywords, *rest in tiers["cold"]]
+        return memory
+
+
+def memory_from_state(data: dict, rng: Optional[random.Random] = None) -> ThoughtMemory:
+    """Rebuild whichever memory class produced ``data``."""
+    if "tiers" in data:
+        return TieredMemory.from_state(data, rng)
+    return ThoughtMemory.from_state(data, rng)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The package lives under src/ and is run with PYTHONPATH=src; mirror that here.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,74 @@
+import pytest
+
+from recursive_mind import checkpoint
+from recursive_mind.cli import main
+from recursive_mind.engine import RecursiveMindEngine
+
+PROMPT = "hope and memory loop"
+
+
+def _run(steps, allow_interrupts=True, seed=3):
+    engine = RecursiveMindEngine(seed=seed)
+    return list(engine.stream(PROMPT, steps=steps, allow_interrupts=allow_interrupts))
+
+
+def _checkpointed(directory, steps, every, allow_interrupts=True, seed=3):
+    engine = RecursiveMindEngine(seed=seed)
+    results = engine.stream(PROMPT, steps=steps, allow_interrupts=allow_interrupts)
+    return list(checkpoint.with_checkpoints(engine, results, directory, every, allow_interrupts))
+
+
+@pytest.mark.parametrize("allow_interrupts", [True, False])
+def test_save_load_resume_matches_uninterrupted_run(tmp_path, allow_interrupts):
+    full = _run(20, allow_interrupts)
+    engine = RecursiveMindEngine(seed=3)
+    head = list(engine.stream(PROMPT, steps=8, allow_interrupts=allow_interrupts))
+    path = checkpoint.save_checkpoint(engine, tmp_path / "run.rmck", allow_interrupts)
+
+    restored = RecursiveMindEngine()
+    tail = list(checkpoint.resume(restored, path, steps=12))
+
+    assert head + tail == full
+
+
+def test_restore_rejects_foreign_bytes():
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.restore(RecursiveMindEngine(), b"not a checkpoint at all")
+
+
+@pytest.mark.parametrize("allow_interrupts", [True, False])
+def test_seek_reproduces_step_and_returns_run_settings(tmp_path, allow_interrupts):
+    full = _checkpointed(tmp_path, 24, 5, allow_interrupts)
+
+    engine = RecursiveMindEngine()
+    target, info = checkpoint.seek(engine, tmp_path, 12)
+    rest = list(engine.advance(8, allow_interrupts=info.allow_interrupts))
+
+    assert info.allow_interrupts is allow_interrupts
+    assert [target] + rest == full[11:20]
+
+
+def test_seek_rejects_step_zero(tmp_path):
+    _checkpointed(tmp_path, 5, 1)
+    with pytest.raises(ValueError, match="numbered from 1"):
+        checkpoint.seek(RecursiveMindEngine(), tmp_path, 0)
+
+
+def test_cli_jump_to_continues_without_interrupts(tmp_path, capsys):
+    directory = str(tmp_path / "ckx")
+    main([PROMPT, "--steps", "24", "--seed", "3", "--no-interrupts", "--checkpoint-dir", directory, "--checkpoint-every", "5"])
+    original = capsys.readouterr().out
+    main(["--jump-to", "12", "--steps", "10", "--checkpoint-dir", directory])
+    jumped = capsys.readouterr().out
+
+    replayed = jumped[jumped.index("[12]"):].strip()
+    assert replayed in original
+    assert "external ->" not in jumped
+
+
+def test_cli_jump_to_zero_is_reported(tmp_path, capsys):
+    directory = str(tmp_path / "ckx")
+    main([PROMPT, "--steps", "3", "--seed", "3", "--checkpoint-dir", directory, "--checkpoint-every", "1"])
+    with pytest.raises(SystemExit):
+        main(["--jump-to", "0", "--checkpoint-dir", directory])
+    assert "numbered from 1" in capsys.readouterr().err
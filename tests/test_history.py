@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+from recursive_mind.engine import RecursiveMindEngine
+from recursive_mind.history import StepHistory
+
+
+@pytest.mark.parametrize("budget", [None, 24])
+def test_random_access_matches_live_run(budget):
+    live = list(RecursiveMindEngine(seed=11, prompt_budget=budget).stream("hope and memory loop", steps=300))
+    history = StepHistory(cache_size=4, keyframe_every=32)
+    history.extend(live)
+
+    assert len(history) == len(live)
+    order = list(range(len(live)))
+    random.Random(0).shuffle(order)
+    for index in order:
+        assert history[index] == live[index]
+    assert history[-1] == live[-1]
+    assert history[10:20] == live[10:20]
+    assert list(history) == live
+
+
+def test_index_out_of_range():
+    history = StepHistory(RecursiveMindEngine(seed=1).stream("hope", steps=3))
+    with pytest.raises(IndexError):
+        history[3]
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from recursive_mind import runlog
+from recursive_mind.engine import RecursiveMindEngine
+from recursive_mind.runlog import RECORD, RunLogReader, RunLogWriter
+
+_HEADER_SIZE = runlog._FILE_HEADER.size
+
+
+@pytest.fixture
+def steps():
+    return list(RecursiveMindEngine(seed=1).stream("hope and memory loop", steps=10))
+
+
+def _records(path):
+    return (os.path.getsize(f"{path}.idx") - _HEADER_SIZE) // RECORD.size
+
+
+def test_write_and_read_back(tmp_path, steps):
+    path = tmp_path / "runs.log"
+    with RunLogWriter(path, batch=3) as writer:
+        for step in steps:
+            writer.append(0, step)
+    assert sorted(os.listdir(tmp_path)) == ["runs.log.heap", "runs.log.idx"]
+    with RunLogReader(path) as reader:
+        assert [reader.step(index) for index in range(len(reader))] == steps
+
+
+def test_reopen_drops_torn_record(tmp_path, steps):
+    path = tmp_path / "runs"
+    with RunLogWriter(path) as writer:
+        for step in steps[:4]:
+            writer.append(0, step)
+    with open(f"{path}.idx", "ab") as index:
+        index.write(b"\x01" * (RECORD.size // 2))
+
+    with RunLogWriter(path) as writer:
+        assert writer.next_run_id() == 1
+        for step in steps[4:]:
+            writer.append(1, step)
+    with RunLogReader(path) as reader:
+        assert [reader.step(index) for index in range(len(reader))] == steps
+        assert list(reader.query(run_id=1)) == list(range(4, len(steps)))
+
+
+def test_reopen_drops_records_past_the_heap(tmp_path, steps):
+    path = tmp_path / "runs"
+    with RunLogWriter(path) as writer:
+        for step in steps[:5]:
+            writer.append(0, step)
+    heap = f"{path}.heap"
+    with open(heap, "r+b") as handle:
+        handle.truncate(os.path.getsize(heap) - 1)
+
+    with RunLogReader(path) as reader:
+        with pytest.raises(ValueError, match="past the end of the heap"):
+            reader.step(4)
+
+    RunLogWriter(path).close()
+    assert _records(path) == 4
+    with RunLogReader(path) as reader:
+        assert [reader.step(index) for index in range(len(reader))] == steps[:4]
+
+
+def test_query_without_numpy_is_lazy(tmp_path, steps, monkeypatch):
+    path = tmp_path / "runs"
+    with RunLogWriter(path) as writer:
+        for step in steps:
+            writer.append(step.iteration % 2, step)
+    expected = [index for index, step in enumerate(steps) if step.iteration % 2 == 1]
+    monkeypatch.setattr(runlog, "np", None)
+    with RunLogReader(path) as reader:
+        matches = reader.query(run_id=1)
+        assert not isinstance(matches, list)
+        assert list(matches) == expected
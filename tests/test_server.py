@@ -0,0 +1,76 @@
+import pytest
+
+from recursive_mind.engine import RecursiveMindEngine
+from recursive_mind.server import MindServer, Operation, SessionStore
+from recursive_mind.stats import RunStatistics
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(max_live=2, spill_dir=tmp_path)
+    yield store
+    store.close()
+
+
+def test_batch_runs_in_submission_order(store):
+    results = store.execute(
+        [
+            Operation("create", args={"prompt": "first", "id": "x"}),
+            Operation("delete", "x"),
+            Operation("create", args={"prompt": "second", "id": "x"}),
+            Operation("describe", "x"),
+        ]
+    )
+    assert not any(isinstance(result, Exception) for result in results)
+    assert results[3]["thought"] == "second"
+
+
+def test_interleaved_sessions_match_separate_engines(store):
+    operations = [Operation("create", args={"prompt": f"hope and memory loop {n}", "seed": n, "id": f"s{n}"}) for n in range(3)]
+    operations += [Operation("advance", f"s{n}", {"steps": 4}) for _ in range(3) for n in range(3)]
+    results = store.execute(operations)
+    assert store.stats()["spills"] > 0
+
+    for n in range(3):
+        thoughts = [step["thought"] for result in results[3 + n::3] for step in result["steps"]]
+        reference = RecursiveMindEngine(seed=n).stream(f"hope and memory loop {n}", steps=12)
+        assert thoughts == [step.thought for step in reference]
+
+
+def test_unclaimed_operations_are_skipped(store):
+    results = store.execute(
+        [Operation("create", args={"prompt": "kept", "id": "a"}), Operation("create", args={"prompt": "gone", "id": "b"})],
+        claim=lambda index: index == 0,
+    )
+    assert results[1] is None
+    assert "a" in store and "b" not in store
+
+
+def test_sessions_survive_restart(tmp_path):
+    store = SessionStore(spill_dir=tmp_path)
+    store.create("hope and memory loop", seed=5, session_id="kept")
+    head = store.advance("kept", 3)
+    store.close()
+
+    reopened = SessionStore(spill_dir=tmp_path)
+    tail = reopened.advance("kept", 3)
+    reopened.close()
+    assert head + tail == RecursiveMindEngine(seed=5).run("hope and memory loop", steps=6)
+
+
+def test_shared_engine_rejects_observers(tmp_path):
+    with pytest.raises(ValueError, match="stats or metrics"):
+        SessionStore(lambda: RecursiveMindEngine(stats=RunStatistics()), spill_dir=tmp_path)
+
+
+def test_cancelled_request_is_not_executed(store):
+    server = MindServer(store, port=0)
+    try:
+        future = server.submit(Operation("create", args={"prompt": "late", "id": "late"}))
+        assert future.cancel()
+        done = server.submit(Operation("stats"))
+        server._start_worker()
+        assert done.result(5)["live"] == 0
+        assert "late" not in store
+    finally:
+        server.close()